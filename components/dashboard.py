@@ -17,6 +17,9 @@ import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
+from components.downsampling import DEFAULT_MAX_POINTS, METHODS, downsample_frame
+from components.metrics_rollup import MetricRollup
+
 # Configuración de logging
 import logging
 logger = logging.getLogger(__name__)
@@ -32,6 +35,10 @@ class Dashboard:
         """Inicializa el dashboard y carga las métricas existentes."""
         self.metrics_file = METRICS_DIR / "runtime_metrics.json"
         self._ensure_metrics_file()
+        self.rollups = MetricRollup(METRICS_DIR / "runtime_rollups.json")
+        self._ensure_rollups()
+        self.max_points = DEFAULT_MAX_POINTS
+        self.downsample_method = "lttb"
     
     def _ensure_metrics_file(self):
         """Asegura que el archivo de métricas exista."""
@@ -39,6 +46,29 @@ class Dashboard:
             with open(self.metrics_file, "w") as f:
                 json.dump([], f)
     
+    def _ensure_rollups(self):
+        """
+        Pone los agregados al día con las métricas crudas: los reconstruye si
+        no existen y, si no, reaplica los eventos que no llegaron a guardarse
+        (los agregados se escriben de forma diferida).
+        """
+        try:
+            with open(self.metrics_file, "r") as f:
+                metrics = json.load(f)
+            if self.rollups.is_empty() or self.rollups.events > len(metrics):
+                if not metrics:
+                    return
+                self.rollups.rebuild(metrics)
+            elif self.rollups.events < len(metrics):
+                for m in metrics[self.rollups.events:]:
+                    self.rollups.add(m["type"], m["value"], datetime.fromisoformat(m["timestamp"]))
+                self.rollups.prune()
+            else:
+                return
+            self.rollups.save()
+        except Exception as e:
+            logger.error(f"Error al reconstruir agregados de métricas: {e}")
+    
     def log_metric(self, metric_type: str, value: float, metadata: Optional[Dict] = None):
         """
         Registra una nueva métrica.
@@ -54,8 +84,9 @@ class Dashboard:
                 metrics = json.load(f)
             
             # Agregar nueva métrica
+            now = datetime.utcnow()
             metric = {
-                "timestamp": datetime.utcnow().isoformat(),
+                "timestamp": now.isoformat(),
                 "type": metric_type,
                 "value": value,
                 "metadata": metadata or {}
@@ -65,6 +96,11 @@ class Dashboard:
             # Guardar actualización
             with open(self.metrics_file, "w") as f:
                 json.dump(metrics, f, indent=2)
+            
+            # Actualizar agregados por minuto y por hora; el fichero de
+            # agregados se escribe cada N eventos o segundos, no en cada evento
+            self.rollups.add(metric_type, value, now)
+            self.rollups.maybe_save(now)
                 
         except Exception as e:
             logger.error(f"Error al registrar métrica: {e}")
@@ -113,143 +149,201 @@ class Dashboard:
             value=24,
             format_func=lambda x: f"Últimas {x}h"
         )
+        self.max_points = st.sidebar.number_input(
+            "Puntos máximos por gráfico",
+            min_value=50,
+            max_value=5000,
+            value=self.max_points,
+            step=50,
+            help="Las series más largas se reducen antes de enviarse al navegador"
+        )
+        self.downsample_method = st.sidebar.selectbox(
+            "Reducción de puntos",
+            options=list(METHODS),
+            index=list(METHODS).index(self.downsample_method),
+            format_func=lambda m: {"lttb": "LTTB (forma)", "minmax": "Mín/Máx (picos)"}[m]
+        )
         
-        # Obtener métricas
-        metrics = self.get_metrics(hours=time_range)
+        # Tipos de métrica con datos en el rango (se leen de los agregados)
+        metric_types = [
+            t for t in self.rollups.metric_types()
+            if self.rollups.series(t, "hour", time_range)
+        ]
         
-        if not metrics:
+        if not metric_types:
             st.warning("No hay métricas disponibles para el rango seleccionado.")
             return
         
-        # Convertir a DataFrame para análisis
-        df = pd.DataFrame(metrics)
-        df["timestamp"] = pd.to_datetime(df["timestamp"])
-        
         # Métricas clave
-        self._render_key_metrics(df)
+        self._render_key_metrics(time_range)
         
         # Gráficos
         tab1, tab2, tab3 = st.tabs(["Uso de API", "Rendimiento", "Actividad"]) 
         
         with tab1:
-            self._render_api_metrics(df)
+            self._render_api_metrics(time_range)
             
         with tab2:
-            self._render_performance_metrics(df)
+            self._render_performance_metrics(time_range)
             
         with tab3:
-            self._render_activity_metrics(df)
+            self._render_activity_metrics(time_range, metric_types)
+    
+    def _downsample(self, df: pd.DataFrame, x: str, y: str, group: Optional[str] = None) -> pd.DataFrame:
+        """Reduce una serie al máximo de puntos configurado antes de graficarla."""
+        return downsample_frame(
+            df, x, y, max_points=self.max_points, method=self.downsample_method, group=group
+        )
+    
+    def _series_frame(self, metric_type: str, resolution: str, hours: int) -> pd.DataFrame:
+        """
+        Convierte las cubetas de un tipo de métrica en un DataFrame.
+        
+        Columnas: bucket, count, sum, mean, min, max, p50, p95.
+        """
+        rows = [
+            {
+                "bucket": start,
+                "count": b.count,
+                "sum": b.sum,
+                "mean": b.mean,
+                "min": b.min,
+                "max": b.max,
+                "p50": b.sketch.quantile(0.5),
+                "p95": b.sketch.quantile(0.95),
+            }
+            for start, b in self.rollups.series(metric_type, resolution, hours)
+        ]
+        return pd.DataFrame(
+            rows, columns=["bucket", "count", "sum", "mean", "min", "max", "p50", "p95"]
+        )
     
-    def _render_key_metrics(self, df: pd.DataFrame):
+    def _render_key_metrics(self, hours: int):
         """Renderiza las métricas clave en la parte superior."""
         col1, col2, col3, col4 = st.columns(4)
         
         # Total de solicitudes API
-        api_calls = len(df[df["type"] == "api_call"])
+        api_calls = self.rollups.summary("api_call", hours).count
         with col1:
             st.metric("Llamadas API", api_calls)
         
         # Tiempo promedio de generación
-        gen_times = df[df["type"] == "code_generation_time"]["value"]
-        avg_gen_time = gen_times.mean() if not gen_times.empty else 0
+        avg_gen_time = self.rollups.summary("code_generation_time", hours).mean
         with col2:
             st.metric("Tiempo Prom. Generación", f"{avg_gen_time:.2f}s")
         
         # Tokens utilizados
-        tokens_used = df[df["type"] == "tokens_used"]["value"].sum()
+        tokens_used = self.rollups.summary("tokens_used", hours).sum
         with col3:
-            st.metric("Tokens Utilizados", f"{tokens_used:,}")
+            st.metric("Tokens Utilizados", f"{tokens_used:,.0f}")
         
         # Proyectos generados
-        projects_created = len(df[df["type"] == "project_created"])
+        projects_created = self.rollups.summary("project_created", hours).count
         with col4:
             st.metric("Proyectos Generados", projects_created)
     
-    def _render_api_metrics(self, df: pd.DataFrame):
+    def _render_api_metrics(self, hours: int):
         """Renderiza las métricas de uso de API."""
         st.subheader("📈 Uso de API")
         
-        # Filtrar métricas de API
-        api_df = df[df["type"].isin(["api_call", "tokens_used"])].copy()
+        # Series horarias ya agregadas
+        calls_by_hour = self._series_frame("api_call", "hour", hours)
+        tokens_by_hour = self._series_frame("tokens_used", "hour", hours)
         
-        if api_df.empty:
+        if calls_by_hour.empty and tokens_by_hour.empty:
             st.info("No hay datos de uso de API disponibles.")
             return
         
-        # Agrupar por hora
-        api_df["hour"] = api_df["timestamp"].dt.floor("H")
-        
         # Gráfico de llamadas por hora
-        calls_by_hour = api_df[api_df["type"] == "api_call"].groupby("hour").size().reset_index(name="count")
-        
         if not calls_by_hour.empty:
             fig1 = px.line(
-                calls_by_hour, 
-                x="hour", 
+                self._downsample(calls_by_hour, "bucket", "count"), 
+                x="bucket", 
                 y="count",
                 title="Llamadas API por Hora",
-                labels={"hour": "Hora", "count": "Llamadas"}
+                labels={"bucket": "Hora", "count": "Llamadas"}
             )
             st.plotly_chart(fig1, use_container_width=True)
         
         # Gráfico de tokens por hora
-        tokens_by_hour = api_df[api_df["type"] == "tokens_used"].groupby("hour")["value"].sum().reset_index()
-        
         if not tokens_by_hour.empty:
             fig2 = px.area(
-                tokens_by_hour,
-                x="hour",
-                y="value",
+                self._downsample(tokens_by_hour, "bucket", "sum"),
+                x="bucket",
+                y="sum",
                 title="Tokens Utilizados por Hora",
-                labels={"hour": "Hora", "value": "Tokens"}
+                labels={"bucket": "Hora", "sum": "Tokens"}
             )
             st.plotly_chart(fig2, use_container_width=True)
     
-    def _render_performance_metrics(self, df: pd.DataFrame):
+    def _render_performance_metrics(self, hours: int):
         """Renderiza las métricas de rendimiento."""
         st.subheader("⚡ Rendimiento")
         
-        # Filtrar métricas de rendimiento
-        perf_df = df[df["type"].isin(["code_generation_time", "model_latency"])].copy()
-        
-        if perf_df.empty:
+        perf_types = ["code_generation_time", "model_latency"]
+        
+        # Estadísticas por tipo a partir de los agregados horarios
+        stats = []
+        for metric_type in perf_types:
+            summary = self.rollups.summary(metric_type, hours)
+            if summary.count:
+                stats.append({
+                    "type": metric_type,
+                    "mean": summary.mean,
+                    "min": summary.min,
+                    "max": summary.max,
+                    "p95": summary.sketch.quantile(0.95),
+                    "count": summary.count,
+                })
+        
+        if not stats:
             st.info("No hay datos de rendimiento disponibles.")
             return
         
-        # Agrupar por tipo y calcular estadísticas
-        perf_stats = perf_df.groupby("type")["value"].agg(["mean", "min", "max", "count"]).reset_index()
-        
         # Mostrar estadísticas
         st.dataframe(
-            perf_stats.rename(columns={
+            pd.DataFrame(stats).rename(columns={
                 "type": "Métrica",
                 "mean": "Promedio (s)",
                 "min": "Mínimo (s)",
                 "max": "Máximo (s)",
+                "p95": "P95 (s)",
                 "count": "Muestras"
             }),
             use_container_width=True
         )
         
-        # Gráfico de rendimiento a lo largo del tiempo
-        if not perf_df.empty:
+        # Gráfico de rendimiento a lo largo del tiempo (media por minuto)
+        frames = []
+        for metric_type in perf_types:
+            frame = self._series_frame(metric_type, "minute", hours)
+            if not frame.empty:
+                frame["type"] = metric_type
+                frames.append(frame)
+        
+        if frames:
+            perf_df = self._downsample(
+                pd.concat(frames, ignore_index=True), "bucket", "mean", group="type"
+            )
             fig = px.line(
                 perf_df, 
-                x="timestamp", 
-                y="value",
+                x="bucket", 
+                y="mean",
                 color="type",
                 title="Tiempo de Respuesta",
-                labels={"timestamp": "Hora", "value": "Tiempo (s)", "type": "Métrica"}
+                labels={"bucket": "Hora", "mean": "Tiempo (s)", "type": "Métrica"}
             )
             st.plotly_chart(fig, use_container_width=True)
     
-    def _render_activity_metrics(self, df: pd.DataFrame):
+    def _render_activity_metrics(self, hours: int, metric_types: List[str]):
         """Renderiza las métricas de actividad."""
         st.subheader("📊 Actividad")
         
         # Contar eventos por tipo
-        activity_counts = df["type"].value_counts().reset_index()
-        activity_counts.columns = ["Tipo de Evento", "Cantidad"]
+        activity_counts = pd.DataFrame(
+            [(t, self.rollups.summary(t, hours).count) for t in metric_types],
+            columns=["Tipo de Evento", "Cantidad"]
+        ).sort_values("Cantidad", ascending=False)
         
         # Gráfico de barras de actividad
         if not activity_counts.empty:
@@ -263,7 +357,17 @@ class Dashboard:
             st.plotly_chart(fig1, use_container_width=True)
         
         # Actividad a lo largo del tiempo
-        activity_over_time = df.groupby([df["timestamp"].dt.floor("H"), "type"]).size().unstack(fill_value=0)
+        activity_over_time = pd.DataFrame({
+            t: {start: b.count for start, b in self.rollups.series(t, "hour", hours)}
+            for t in metric_types
+        }).fillna(0).sort_index()
+        activity_over_time.index.name = "timestamp"
+        
+        # Reducir según el total de eventos para mantener alineadas las series apiladas
+        if len(activity_over_time) > self.max_points:
+            totals = activity_over_time.sum(axis=1).rename("total").reset_index()
+            keep = self._downsample(totals, "timestamp", "total")["timestamp"]
+            activity_over_time = activity_over_time.loc[keep]
         
         if not activity_over_time.empty:
             fig2 = px.area(
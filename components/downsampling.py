@@ -0,0 +1,146 @@
+"""
+Reducción visual de series temporales para los gráficos del panel.
+
+Selecciona un subconjunto de puntos representativo antes de enviarlos a
+Plotly, de forma que el tamaño del gráfico quede acotado por un número
+máximo de puntos y los picos sigan siendo visibles.
+"""
+
+from datetime import datetime
+from typing import List, Optional, Sequence
+
+import pandas as pd
+
+# Número máximo de puntos por serie por defecto
+DEFAULT_MAX_POINTS = 500
+
+METHODS = ("lttb", "minmax")
+
+
+def _as_number(x) -> float:
+    """Convierte marcas de tiempo a números para calcular áreas."""
+    if isinstance(x, (datetime, pd.Timestamp)):
+        return x.timestamp()
+    return float(x)
+
+
+def lttb_indices(xs: Sequence, ys: Sequence[float], threshold: int) -> List[int]:
+    """
+    Largest-Triangle-Three-Buckets: elige los índices que mejor preservan
+    la forma visual de la serie.
+
+    Args:
+        xs: Valores del eje X (números o fechas), ordenados
+        ys: Valores del eje Y
+        threshold: Número máximo de puntos a conservar (mínimo 3)
+
+    Returns:
+        Lista ordenada de índices seleccionados
+    """
+    n = len(xs)
+    if threshold >= n or threshold < 3:
+        return list(range(n))
+
+    x = [_as_number(v) for v in xs]
+    y = [float(v) for v in ys]
+    every = (n - 2) / (threshold - 2)
+
+    selected = [0]
+    a = 0
+    for i in range(threshold - 2):
+        # Promedio de la cubeta siguiente (punto C del triángulo)
+        next_start = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        span = next_end - next_start
+        avg_x = sum(x[next_start:next_end]) / span
+        avg_y = sum(y[next_start:next_end]) / span
+
+        # Punto de la cubeta actual con mayor área respecto a A y C
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            area = abs(
+                (x[a] - avg_x) * (y[j] - y[a]) - (x[a] - x[j]) * (avg_y - y[a])
+            )
+            if area > best_area:
+                best, best_area = j, area
+        selected.append(best)
+        a = best
+
+    selected.append(n - 1)
+    return selected
+
+
+def minmax_indices(ys: Sequence[float], threshold: int) -> List[int]:
+    """
+    Conserva el mínimo y el máximo de cada cubeta, garantizando que ningún
+    pico ni valle desaparezca.
+
+    Args:
+        ys: Valores del eje Y (ordenados por X)
+        threshold: Número máximo de puntos a conservar
+
+    Returns:
+        Lista ordenada de índices seleccionados
+    """
+    n = len(ys)
+    if threshold >= n or threshold < 4:
+        return list(range(n))
+
+    buckets = (threshold - 2) // 2
+    every = (n - 2) / buckets
+    selected = {0, n - 1}
+    for i in range(buckets):
+        start = int(i * every) + 1
+        end = min(int((i + 1) * every) + 1, n - 1)
+        if start >= end:
+            continue
+        window = range(start, end)
+        selected.add(min(window, key=lambda j: ys[j]))
+        selected.add(max(window, key=lambda j: ys[j]))
+    return sorted(selected)
+
+
+def downsample_frame(
+    df: pd.DataFrame,
+    x: str,
+    y: str,
+    max_points: int = DEFAULT_MAX_POINTS,
+    method: str = "lttb",
+    group: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    Reduce un DataFrame a como mucho ``max_points`` filas por serie.
+
+    Args:
+        df: Datos ordenados (o no) por ``x``
+        x: Columna del eje X
+        y: Columna del eje Y
+        max_points: Número máximo de puntos por serie
+        method: 'lttb' o 'minmax'
+        group: Columna que separa series (por ejemplo, 'type'); opcional
+
+    Returns:
+        DataFrame con las filas seleccionadas
+    """
+    if method not in METHODS:
+        raise ValueError(f"Método de reducción no soportado: {method}")
+
+    if group is not None:
+        parts = [
+            downsample_frame(part, x, y, max_points, method)
+            for _, part in df.groupby(group, sort=False)
+        ]
+        return pd.concat(parts, ignore_index=True) if parts else df
+
+    if len(df) <= max_points:
+        return df
+
+    df = df.sort_values(x).reset_index(drop=True)
+    ys = df[y].fillna(0).tolist()
+    if method == "lttb":
+        idx = lttb_indices(df[x].tolist(), ys, max_points)
+    else:
+        idx = minmax_indices(ys, max_points)
+    return df.iloc[idx].reset_index(drop=True)
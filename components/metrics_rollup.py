@@ -0,0 +1,355 @@
+"""
+Agregados incrementales de métricas para el panel de control.
+
+Mantiene, por tipo de métrica, cubetas por minuto y por hora con conteo,
+suma, mínimo, máximo y un sketch de cuantiles. Los agregados se actualizan
+cada vez que se registra una métrica, de modo que los gráficos leen series
+ya agregadas y su coste depende del número de cubetas, no de eventos.
+"""
+
+import json
+import math
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Resoluciones soportadas (segundos por cubeta) y retención de cada una
+RESOLUTIONS = {
+    "minute": 60,
+    "hour": 3600,
+}
+RETENTION = {
+    "minute": timedelta(hours=72),
+    "hour": timedelta(days=30),
+}
+
+# Escritura diferida: se guarda cada FLUSH_EVERY eventos o FLUSH_INTERVAL segundos
+FLUSH_EVERY = 100
+FLUSH_INTERVAL = 30.0
+
+
+def _to_epoch(ts: datetime) -> int:
+    """Convierte un datetime UTC (naive o aware) a segundos desde epoch."""
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return int(ts.timestamp())
+
+
+def _from_epoch(seconds: int) -> datetime:
+    """Convierte segundos desde epoch a un datetime UTC naive."""
+    return datetime.fromtimestamp(seconds, tz=timezone.utc).replace(tzinfo=None)
+
+
+class QuantileSketch:
+    """
+    Sketch de cuantiles con error relativo acotado (estilo DDSketch).
+
+    Los valores se asignan a cubetas logarítmicas de razón ``gamma``, por lo
+    que el tamaño depende del rango de valores y no del número de muestras.
+    Dos sketches con la misma precisión se pueden fusionar sumando cubetas.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.positive: Dict[int, int] = {}
+        self.negative: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def _index(self, value: float) -> int:
+        return int(math.ceil(math.log(value) / self._log_gamma))
+
+    def _value(self, index: int) -> float:
+        return 2 * self.gamma ** index / (self.gamma + 1)
+
+    def add(self, value: float) -> None:
+        """Añade un valor al sketch."""
+        if value > 0:
+            idx = self._index(value)
+            self.positive[idx] = self.positive.get(idx, 0) + 1
+        elif value < 0:
+            idx = self._index(-value)
+            self.negative[idx] = self.negative.get(idx, 0) + 1
+        else:
+            self.zero_count += 1
+        self.count += 1
+
+    def merge(self, other: "QuantileSketch") -> None:
+        """Fusiona otro sketch (con la misma precisión) en este."""
+        for idx, n in other.positive.items():
+            self.positive[idx] = self.positive.get(idx, 0) + n
+        for idx, n in other.negative.items():
+            self.negative[idx] = self.negative.get(idx, 0) + n
+        self.zero_count += other.zero_count
+        self.count += other.count
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estima el cuantil ``q`` (entre 0 y 1).
+
+        Returns:
+            Valor estimado o None si el sketch está vacío
+        """
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        seen = 0
+        # Negativos: de mayor magnitud a menor
+        for idx in sorted(self.negative, reverse=True):
+            seen += self.negative[idx]
+            if seen > rank:
+                return -self._value(idx)
+        seen += self.zero_count
+        if seen > rank:
+            return 0.0
+        for idx in sorted(self.positive):
+            seen += self.positive[idx]
+            if seen > rank:
+                return self._value(idx)
+        return self._value(max(self.positive)) if self.positive else 0.0
+
+    def to_dict(self) -> Dict:
+        return {
+            "p": {str(k): v for k, v in self.positive.items()},
+            "n": {str(k): v for k, v in self.negative.items()},
+            "z": self.zero_count,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict, relative_accuracy: float = 0.01) -> "QuantileSketch":
+        sketch = cls(relative_accuracy)
+        sketch.positive = {int(k): v for k, v in data.get("p", {}).items()}
+        sketch.negative = {int(k): v for k, v in data.get("n", {}).items()}
+        sketch.zero_count = data.get("z", 0)
+        sketch.count = (
+            sum(sketch.positive.values()) + sum(sketch.negative.values()) + sketch.zero_count
+        )
+        return sketch
+
+
+class Bucket:
+    """Agregado de una cubeta temporal: conteo, suma, mínimo, máximo y cuantiles."""
+
+    __slots__ = ("count", "sum", "min", "max", "sketch")
+
+    def __init__(self):
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.sketch = QuantileSketch()
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        self.sketch.add(value)
+
+    def merge(self, other: "Bucket") -> None:
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.sketch.merge(other.sketch)
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    def to_dict(self) -> Dict:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min,
+            "max": self.max,
+            "sketch": self.sketch.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Bucket":
+        bucket = cls()
+        bucket.count = data["count"]
+        bucket.sum = data["sum"]
+        bucket.min = data["min"]
+        bucket.max = data["max"]
+        bucket.sketch = QuantileSketch.from_dict(data.get("sketch", {}))
+        return bucket
+
+
+class MetricRollup:
+    """
+    Agregados por minuto y por hora para cada tipo de métrica.
+
+    Estructura interna: ``{resolución: {tipo: {inicio_cubeta: Bucket}}}``,
+    donde ``inicio_cubeta`` son segundos desde epoch alineados a la resolución.
+
+    ``add`` solo actualiza memoria; ``maybe_save`` escribe el fichero cuando
+    se acumulan ``flush_every`` eventos o pasan ``flush_interval`` segundos
+    desde la última escritura, y ``flush`` fuerza la escritura pendiente.
+    ``events`` cuenta los eventos incluidos, para que quien guarde los
+    eventos crudos pueda reaplicar los que no llegaron a escribirse.
+    """
+
+    def __init__(
+        self,
+        rollup_file: Optional[Path] = None,
+        flush_every: int = FLUSH_EVERY,
+        flush_interval: float = FLUSH_INTERVAL,
+    ):
+        self.rollup_file = Path(rollup_file) if rollup_file else None
+        self.buckets: Dict[str, Dict[str, Dict[int, Bucket]]] = {
+            res: {} for res in RESOLUTIONS
+        }
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.pending = 0
+        self.events = 0
+        self._last_save = time.monotonic()
+        if self.rollup_file and self.rollup_file.exists():
+            self._load()
+
+    def _load(self) -> None:
+        """Carga los agregados desde disco."""
+        try:
+            with open(self.rollup_file, "r") as f:
+                data = json.load(f)
+            if "events" not in data:
+                # Formato anterior sin contador: se deja vacío para reconstruirlo
+                return
+            self.events = data["events"]
+            for res in RESOLUTIONS:
+                for metric_type, buckets in data.get(res, {}).items():
+                    self.buckets[res][metric_type] = {
+                        int(start): Bucket.from_dict(b) for start, b in buckets.items()
+                    }
+        except Exception as e:
+            logger.error(f"Error al cargar agregados de métricas: {e}")
+
+    def save(self) -> None:
+        """Guarda los agregados en disco."""
+        if not self.rollup_file:
+            return
+        data = {
+            res: {
+                metric_type: {str(start): b.to_dict() for start, b in buckets.items()}
+                for metric_type, buckets in by_type.items()
+            }
+            for res, by_type in self.buckets.items()
+        }
+        data["events"] = self.events
+        with open(self.rollup_file, "w") as f:
+            json.dump(data, f)
+        self.pending = 0
+        self._last_save = time.monotonic()
+
+    def maybe_save(self, now: Optional[datetime] = None) -> bool:
+        """
+        Poda y guarda si hay suficientes eventos pendientes o ha pasado el
+        intervalo de escritura.
+
+        Returns:
+            True si se escribió el fichero
+        """
+        if not self.pending:
+            return False
+        if self.pending < self.flush_every and time.monotonic() - self._last_save < self.flush_interval:
+            return False
+        self.prune(now)
+        self.save()
+        return True
+
+    def flush(self, now: Optional[datetime] = None) -> None:
+        """Guarda los eventos pendientes (por ejemplo, al cerrar la aplicación)."""
+        if self.pending:
+            self.prune(now)
+            self.save()
+
+    def is_empty(self) -> bool:
+        return not any(self.buckets[res] for res in RESOLUTIONS)
+
+    def add(self, metric_type: str, value: float, timestamp: datetime) -> None:
+        """
+        Actualiza las cubetas de todas las resoluciones con una nueva métrica.
+
+        Args:
+            metric_type: Tipo de métrica
+            value: Valor numérico
+            timestamp: Momento del evento (UTC)
+        """
+        epoch = _to_epoch(timestamp)
+        for res, width in RESOLUTIONS.items():
+            start = epoch - epoch % width
+            by_type = self.buckets[res].setdefault(metric_type, {})
+            bucket = by_type.get(start)
+            if bucket is None:
+                bucket = by_type[start] = Bucket()
+            bucket.add(float(value))
+        self.pending += 1
+        self.events += 1
+
+    def rebuild(self, metrics: Iterable[Dict]) -> None:
+        """Reconstruye los agregados a partir de métricas crudas."""
+        self.buckets = {res: {} for res in RESOLUTIONS}
+        self.events = 0
+        for m in metrics:
+            self.add(m["type"], m["value"], datetime.fromisoformat(m["timestamp"]))
+        self.prune()
+
+    def prune(self, now: Optional[datetime] = None) -> None:
+        """Elimina cubetas fuera del periodo de retención de cada resolución."""
+        now_epoch = _to_epoch(now or datetime.utcnow())
+        for res, retention in RETENTION.items():
+            cutoff = now_epoch - int(retention.total_seconds())
+            for metric_type, by_start in self.buckets[res].items():
+                stale = [start for start in by_start if start < cutoff]
+                for start in stale:
+                    del by_start[start]
+
+    def metric_types(self, resolution: str = "hour") -> List[str]:
+        return sorted(t for t, b in self.buckets[resolution].items() if b)
+
+    def series(
+        self,
+        metric_type: str,
+        resolution: str = "hour",
+        hours: int = 24,
+        now: Optional[datetime] = None,
+    ) -> List[Tuple[datetime, Bucket]]:
+        """
+        Devuelve las cubetas de un tipo de métrica dentro de la ventana pedida.
+
+        Args:
+            metric_type: Tipo de métrica
+            resolution: 'minute' u 'hour'
+            hours: Número de horas hacia atrás
+            now: Momento de referencia (por defecto, ahora en UTC)
+
+        Returns:
+            Lista ordenada de (inicio de cubeta, Bucket)
+        """
+        width = RESOLUTIONS[resolution]
+        now_epoch = _to_epoch(now or datetime.utcnow())
+        cutoff = now_epoch - hours * 3600
+        cutoff -= cutoff % width
+        by_start = self.buckets[resolution].get(metric_type, {})
+        return [
+            (_from_epoch(start), by_start[start])
+            for start in sorted(by_start)
+            if start >= cutoff
+        ]
+
+    def summary(
+        self, metric_type: str, hours: int = 24, now: Optional[datetime] = None
+    ) -> Bucket:
+        """Fusiona las cubetas horarias de la ventana en un único agregado."""
+        total = Bucket()
+        for _, bucket in self.series(metric_type, "hour", hours, now):
+            total.merge(bucket)
+        return total
@@ -0,0 +1,164 @@
+import math
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Distancia en kilómetros entre dos puntos (lat/lon en grados)."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+class MarkerIndex:
+    """
+    Índice espacial en rejilla para marcadores GPS.
+
+    Divide el globo en celdas de ``cell_size`` grados y guarda en cada celda
+    las posiciones de los marcadores que contiene. Las consultas solo visitan
+    las celdas que pueden intersectar el área pedida.
+    """
+    def __init__(self, cell_size: float = 0.1):
+        self.cell_size = cell_size
+        self.cells = {}
+        self.points = []
+
+    def _cell(self, latitude: float, longitude: float):
+        return (
+            int(math.floor(latitude / self.cell_size)),
+            int(math.floor(longitude / self.cell_size)),
+        )
+
+    def __len__(self):
+        return len(self.points)
+
+    def insert(self, latitude: float, longitude: float) -> int:
+        """Añade un punto al índice y devuelve su posición."""
+        pos = len(self.points)
+        self.points.append((latitude, longitude))
+        self.cells.setdefault(self._cell(latitude, longitude), []).append(pos)
+        return pos
+
+    def build(self, coordinates):
+        """Reconstruye el índice a partir de una secuencia de (lat, lon)."""
+        self.cells = {}
+        self.points = []
+        for latitude, longitude in coordinates:
+            self.insert(latitude, longitude)
+
+    def _lon_ranges(self, min_lon: float, max_lon: float):
+        """Rangos de longitud, partiendo los que cruzan el antimeridiano."""
+        if max_lon - min_lon >= 360:
+            return [(-180.0, 180.0)]
+        min_lon = (min_lon + 180) % 360 - 180
+        max_lon = (max_lon + 180) % 360 - 180
+        if min_lon <= max_lon:
+            return [(min_lon, max_lon)]
+        return [(min_lon, 180.0), (-180.0, max_lon)]
+
+    def _candidates(self, min_lat, min_lon, max_lat, max_lon):
+        """Posiciones en las celdas que intersectan la caja (lon normalizada)."""
+        row_lo, col_lo = self._cell(min_lat, min_lon)
+        row_hi, col_hi = self._cell(max_lat, max_lon)
+        n_cells = (row_hi - row_lo + 1) * (col_hi - col_lo + 1)
+        if n_cells > len(self.cells):
+            # Caja más grande que las celdas ocupadas: recorrer solo estas
+            for (row, col), members in self.cells.items():
+                if row_lo <= row <= row_hi and col_lo <= col <= col_hi:
+                    yield from members
+            return
+        for row in range(row_lo, row_hi + 1):
+            for col in range(col_lo, col_hi + 1):
+                yield from self.cells.get((row, col), ())
+
+    def query_bbox(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float):
+        """
+        Posiciones de los puntos dentro de la caja (bordes incluidos).
+        Si ``min_lon > max_lon`` la caja cruza el antimeridiano.
+        """
+        if min_lon > max_lon:
+            lon_ranges = self._lon_ranges(min_lon, max_lon + 360)
+        else:
+            lon_ranges = self._lon_ranges(min_lon, max_lon)
+        result = []
+        for lo, hi in lon_ranges:
+            for pos in self._candidates(min_lat, lo, max_lat, hi):
+                lat, lon = self.points[pos]
+                if min_lat <= lat <= max_lat and lo <= lon <= hi:
+                    result.append(pos)
+        return sorted(set(result))
+
+    def query_radius(self, latitude: float, longitude: float, radius_km: float):
+        """
+        Puntos a menos de ``radius_km`` (distancia haversine).
+
+        Returns:
+            Lista de (distancia_km, posición) ordenada por distancia
+        """
+        angular = radius_km / EARTH_RADIUS_KM
+        if angular >= math.pi:
+            candidates = range(len(self.points))
+        else:
+            dlat = math.degrees(angular)
+            min_lat, max_lat = latitude - dlat, latitude + dlat
+            if min_lat <= -90 or max_lat >= 90:
+                # El círculo contiene un polo: todas las longitudes
+                min_lat, max_lat = max(min_lat, -90.0), min(max_lat, 90.0)
+                min_lon, max_lon = -180.0, 180.0
+            else:
+                ratio = math.sin(angular) / math.cos(math.radians(latitude))
+                dlon = 180.0 if ratio >= 1 else math.degrees(math.asin(ratio))
+                min_lon, max_lon = longitude - dlon, longitude + dlon
+            candidates = set()
+            for lo, hi in self._lon_ranges(min_lon, max_lon):
+                candidates.update(self._candidates(min_lat, lo, max_lat, hi))
+        hits = []
+        for pos in candidates:
+            lat, lon = self.points[pos]
+            distance = haversine_km(latitude, longitude, lat, lon)
+            if distance <= radius_km:
+                hits.append((distance, pos))
+        hits.sort()
+        return hits
+
+    def nearest(self, latitude: float, longitude: float, k: int = 1):
+        """
+        Los ``k`` puntos más cercanos (distancia haversine).
+
+        Amplía el radio de búsqueda hasta encontrar al menos ``k`` puntos; como
+        la búsqueda por radio es exacta, esos son los vecinos más cercanos.
+
+        Returns:
+            Lista de (distancia_km, posición) ordenada por distancia
+        """
+        if k <= 0 or not self.points:
+            return []
+        radius = self.cell_size * 111.2
+        max_radius = math.pi * EARTH_RADIUS_KM
+        while True:
+            hits = self.query_radius(latitude, longitude, radius)
+            if len(hits) >= k or radius >= max_radius:
+                return hits[:k]
+            radius = min(radius * 2, max_radius)
+
+    def aggregate(self, positions, cell_size: float):
+        """
+        Agrupa puntos en celdas de ``cell_size`` grados.
+
+        Returns:
+            Lista de (lat_media, lon_media, cantidad), una entrada por celda
+        """
+        bins = {}
+        for pos in positions:
+            lat, lon = self.points[pos]
+            key = (int(math.floor(lat / cell_size)), int(math.floor(lon / cell_size)))
+            acc = bins.get(key)
+            if acc is None:
+                bins[key] = [lat, lon, 1]
+            else:
+                acc[0] += lat
+                acc[1] += lon
+                acc[2] += 1
+        return [(lat / n, lon / n, n) for lat, lon, n in bins.values()]
@@ -1,5 +1,25 @@
+import html
 import folium
-import json
+from pathlib import Path
+from folium.plugins import FastMarkerCluster, HeatMap
+
+from gps_index import MarkerIndex
+from marker_store import MarkerStore
+
+# Hasta este número de marcadores se dibujan individualmente con popup
+MARKER_LIMIT = 500
+# Por encima de este número se sustituye el clúster por un mapa de calor agregado
+HEATMAP_THRESHOLD = 20000
+
+# Tooltip para los marcadores del clúster rápido (datos como [lat, lon, nombre]).
+# Leaflet interpreta el texto del tooltip como HTML: el nombre llega ya escapado
+_FAST_CLUSTER_CALLBACK = """
+function (row) {
+    var marker = L.marker(new L.LatLng(row[0], row[1]));
+    marker.bindTooltip(row[2]);
+    return marker;
+};
+"""
 
 class GPSLogic:
     """
@@ -7,35 +27,69 @@ class GPSLogic:
     """
     def __init__(self, markers_file="markers.json"):
         self.markers_file = markers_file
+        # Registro de solo anexado junto al markers.json antiguo
+        self.store = MarkerStore(Path(markers_file).with_suffix(".jsonl"), markers_file)
         self.markers = self._load_markers()
+        self.index = MarkerIndex()
+        self.index.build((m['latitude'], m['longitude']) for m in self.markers)
 
     def _load_markers(self):
-        """Carga los marcadores desde un archivo JSON."""
-        try:
-            with open(self.markers_file, 'r') as f:
-                return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            return []
-
-    def _save_markers(self):
-        """Guarda los marcadores en un archivo JSON."""
-        with open(self.markers_file, 'w') as f:
-            json.dump(self.markers, f, indent=4)
+        """Carga los marcadores del registro (migrando markers.json si hace falta)."""
+        return self.store.load()
 
     def add_marker(self, name: str, latitude: float, longitude: float, description: str = ""):
         """Añade un nuevo marcador a la lista."""
-        self.markers.append({
+        marker = {
             "name": name,
             "latitude": latitude,
             "longitude": longitude,
             "description": description
-        })
-        self._save_markers()
+        }
+        self.markers.append(marker)
+        self.index.insert(latitude, longitude)
+        self.store.append(marker)
+
+    def _add_imported(self, chunk):
+        for marker in chunk:
+            self.markers.append(marker)
+            self.index.insert(marker['latitude'], marker['longitude'])
+
+    def import_markers(self, path, fmt=None, chunk_size=10000):
+        """
+        Importa marcadores desde un CSV o GeoJSON por lotes, validando cada uno.
+        Devuelve el informe de importación (importados, rechazados y errores).
+        """
+        return self.store.import_file(path, fmt=fmt, chunk_size=chunk_size, on_chunk=self._add_imported)
+
+    def export_markers(self, path, fmt=None):
+        """Exporta los marcadores a CSV o GeoJSON sin construir el documento en memoria."""
+        fmt = (fmt or Path(path).suffix.lstrip(".")).lower()
+        if fmt == "csv":
+            MarkerStore.export_csv(self.markers, path)
+        elif fmt in ("geojson", "json"):
+            MarkerStore.export_geojson(self.markers, path)
+        else:
+            raise ValueError(f"Formato de exportación no soportado: {fmt}")
 
     def get_markers(self):
         """Devuelve la lista de marcadores."""
         return self.markers
 
+    def get_markers_in_bounds(self, south: float, west: float, north: float, east: float):
+        """
+        Devuelve los marcadores dentro de la vista (caja lat/lon).
+        Si ``west > east`` la vista cruza el antimeridiano.
+        """
+        return [self.markers[i] for i in self.index.query_bbox(south, west, north, east)]
+
+    def get_markers_within(self, latitude: float, longitude: float, radius_km: float):
+        """Devuelve los marcadores a menos de ``radius_km``, del más cercano al más lejano."""
+        return [self.markers[i] for _, i in self.index.query_radius(latitude, longitude, radius_km)]
+
+    def get_nearest_markers(self, latitude: float, longitude: float, k: int = 1):
+        """Devuelve los ``k`` marcadores más cercanos, ordenados por distancia."""
+        return [self.markers[i] for _, i in self.index.nearest(latitude, longitude, k)]
+
     def get_current_location(self):
         """
         Intenta obtener la ubicación actual del usuario.
@@ -44,17 +98,54 @@ class GPSLogic:
         """
         return None
 
-    def create_map(self, center: tuple[float, float], zoom_start=13):
-        """Crea un mapa de Folium con los marcadores actuales."""
+    def create_map(self, center: tuple[float, float], zoom_start=13, bounds=None,
+                   marker_limit=MARKER_LIMIT, heatmap_threshold=HEATMAP_THRESHOLD):
+        """
+        Crea un mapa de Folium con los marcadores actuales.
+
+        Si se indica ``bounds`` (sur, oeste, norte, este) solo se incluyen los
+        marcadores dentro de esa vista. Según la cantidad de marcadores:
+        - hasta ``marker_limit``: un marcador con popup por punto;
+        - hasta ``heatmap_threshold``: clúster en el navegador (FastMarkerCluster);
+        - por encima: mapa de calor con los puntos agregados por celdas.
+        """
         m = folium.Map(location=center, zoom_start=zoom_start)
 
-        for marker in self.markers:
-            folium.Marker(
-                location=[marker['latitude'], marker['longitude']],
-                popup=f"<b>{marker['name']}</b><br>{marker['description']}",
-                tooltip=marker['name']
+        if bounds is not None:
+            positions = self.index.query_bbox(*bounds)
+        else:
+            positions = range(len(self.markers))
+
+        if len(positions) <= marker_limit:
+            for i in positions:
+                marker = self.markers[i]
+                # Popup y tooltip se insertan como HTML: los textos del usuario se escapan
+                name = html.escape(marker['name'])
+                folium.Marker(
+                    location=[marker['latitude'], marker['longitude']],
+                    popup=f"<b>{name}</b><br>{html.escape(marker['description'])}",
+                    tooltip=name
+                ).add_to(m)
+        elif len(positions) <= heatmap_threshold:
+            data = [
+                [self.markers[i]['latitude'], self.markers[i]['longitude'], html.escape(self.markers[i]['name'])]
+                for i in positions
+            ]
+            FastMarkerCluster(data, callback=_FAST_CLUSTER_CALLBACK).add_to(m)
+        else:
+            # Celdas de ~1/256 del ancho del mundo visible en este zoom
+            cell_size = 360 / (256 * 2 ** max(zoom_start - 2, 0))
+            cells = self.index.aggregate(positions, cell_size)
+            peak = max(n for _, _, n in cells)
+            HeatMap(
+                [[lat, lon, n / peak] for lat, lon, n in cells],
+                radius=15,
             ).add_to(m)
-        
+
+        if bounds is not None:
+            south, west, north, east = bounds
+            m.fit_bounds([[south, west], [north, east]])
+
         # Añadir control de clics para obtener coordenadas
         m.add_child(folium.LatLngPopup())
 
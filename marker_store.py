@@ -0,0 +1,299 @@
+import csv
+import json
+import math
+import os
+from pathlib import Path
+
+# Tamaño de lote por defecto para importaciones masivas
+CHUNK_SIZE = 10000
+# Bytes leídos en cada paso al recorrer un GeoJSON
+_READ_SIZE = 1 << 16
+# Errores de validación que se guardan en el informe de importación
+MAX_REPORTED_ERRORS = 20
+
+CSV_FIELDS = ["name", "latitude", "longitude", "description"]
+_LAT_KEYS = ("latitude", "lat")
+_LON_KEYS = ("longitude", "lon", "lng")
+
+
+def validate_marker(data: dict) -> dict:
+    """
+    Valida y normaliza un marcador.
+
+    Raises:
+        ValueError: si falta el nombre o las coordenadas no son válidas
+    """
+    name = str(data.get("name") or "").strip()
+    if not name:
+        raise ValueError("el marcador no tiene nombre")
+    try:
+        latitude = float(data["latitude"])
+        longitude = float(data["longitude"])
+    except (KeyError, TypeError, ValueError):
+        raise ValueError(f"coordenadas no numéricas en '{name}'")
+    if not (math.isfinite(latitude) and -90 <= latitude <= 90):
+        raise ValueError(f"latitud fuera de rango en '{name}': {latitude}")
+    if not (math.isfinite(longitude) and -180 <= longitude <= 180):
+        raise ValueError(f"longitud fuera de rango en '{name}': {longitude}")
+    return {
+        "name": name,
+        "latitude": latitude,
+        "longitude": longitude,
+        "description": str(data.get("description") or ""),
+    }
+
+
+def _first(row: dict, keys):
+    for key in keys:
+        if row.get(key) not in (None, ""):
+            return row[key]
+    return None
+
+
+def _iter_csv(path):
+    """Filas de un CSV como marcadores sin validar (acepta lat/lon/lng)."""
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            row = {k.strip().lower(): v for k, v in row.items() if k}
+            yield {
+                "name": row.get("name"),
+                "latitude": _first(row, _LAT_KEYS),
+                "longitude": _first(row, _LON_KEYS),
+                "description": row.get("description"),
+            }
+
+
+def _feature_to_marker(feature: dict) -> dict:
+    """Convierte una Feature Point en marcador (sin validar)."""
+    geometry = feature.get("geometry") or {}
+    coordinates = geometry.get("coordinates") or []
+    if geometry.get("type") == "Point" and len(coordinates) >= 2:
+        longitude, latitude = coordinates[:2]
+    else:
+        # Geometrías no puntuales se rechazan al validar
+        longitude = latitude = None
+    properties = feature.get("properties") or {}
+    return {
+        "name": properties.get("name"),
+        "latitude": latitude,
+        "longitude": longitude,
+        "description": properties.get("description"),
+    }
+
+
+def _iter_geojsonl(path):
+    """Features de un GeoJSON delimitado por líneas (una Feature por línea)."""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _iter_feature_collection(path):
+    """
+    Recorre las Features de un FeatureCollection sin cargar el documento
+    completo: se decodifica Feature a Feature dentro del array ``features``.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8") as f:
+        buf, pos, eof = "", 0, False
+
+        def fill():
+            nonlocal buf, pos, eof
+            chunk = f.read(_READ_SIZE)
+            eof = not chunk
+            buf, pos = buf[pos:] + chunk, 0
+
+        # Localizar el inicio del array "features"
+        while True:
+            key = buf.find('"features"')
+            bracket = buf.find("[", key) if key != -1 else -1
+            if bracket != -1:
+                pos = bracket + 1
+                break
+            if eof:
+                raise ValueError(f"{path} no contiene un array 'features'")
+            fill()
+
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n,":
+                pos += 1
+            if pos >= len(buf):
+                if eof:
+                    raise ValueError(f"{path} termina antes de cerrar 'features'")
+                fill()
+                continue
+            if buf[pos] == "]":
+                return
+            try:
+                feature, pos = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                fill()
+                continue
+            yield feature
+
+
+class MarkerStore:
+    """
+    Almacén de marcadores en un registro JSONL de solo anexado.
+
+    Cada alta escribe una línea al final del fichero, de modo que añadir un
+    marcador cuesta O(1) sin reescribir los existentes. Si solo existe el
+    ``markers.json`` antiguo, se migra al registro en la primera carga.
+    """
+    def __init__(self, log_file="markers.jsonl", legacy_file="markers.json"):
+        self.log_file = Path(log_file)
+        self.legacy_file = Path(legacy_file) if legacy_file else None
+
+    def _migrate_legacy(self):
+        try:
+            with open(self.legacy_file, "r") as f:
+                legacy = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+        self.append_many(legacy)
+
+    def iter_markers(self):
+        """Recorre los marcadores guardados línea a línea."""
+        if not self.log_file.exists() and self.legacy_file and self.legacy_file.exists():
+            self._migrate_legacy()
+        try:
+            with open(self.log_file, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        # Última línea incompleta tras una escritura interrumpida
+                        continue
+        except FileNotFoundError:
+            return
+
+    def load(self) -> list:
+        """Carga todos los marcadores."""
+        return list(self.iter_markers())
+
+    def append(self, marker: dict):
+        """Añade un marcador al final del registro."""
+        self.append_many([marker])
+
+    def _truncate_torn_tail(self):
+        """
+        Elimina la última línea si quedó a medias por una escritura
+        interrumpida; si no, el siguiente anexado se pegaría a ella y se
+        perdería al cargar.
+        """
+        try:
+            f = open(self.log_file, "r+b")
+        except FileNotFoundError:
+            return
+        with f:
+            end = f.seek(0, os.SEEK_END)
+            if end == 0:
+                return
+            f.seek(end - 1)
+            if f.read(1) == b"\n":
+                return
+            # Buscar hacia atrás el último salto de línea completo
+            pos = end
+            while pos > 0:
+                step = min(_READ_SIZE, pos)
+                pos -= step
+                f.seek(pos)
+                newline = f.read(step).rfind(b"\n")
+                if newline != -1:
+                    f.truncate(pos + newline + 1)
+                    return
+            f.truncate(0)
+
+    def append_many(self, markers):
+        """Añade varios marcadores con una sola apertura y un único fsync."""
+        self._truncate_torn_tail()
+        with open(self.log_file, "a", encoding="utf-8") as f:
+            for marker in markers:
+                f.write(json.dumps(marker, ensure_ascii=False))
+                f.write("\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def import_file(self, path, fmt=None, chunk_size=CHUNK_SIZE, on_chunk=None) -> dict:
+        """
+        Importa marcadores desde un CSV o GeoJSON en lotes de ``chunk_size``.
+
+        Cada lote válido se anexa al registro y se pasa a ``on_chunk`` (si se
+        indica) antes de leer el siguiente, así que nunca hay más de un lote
+        en memoria además de lo que conserve el llamador.
+
+        Returns:
+            Informe con 'imported', 'rejected' y una muestra de 'errors'
+        """
+        fmt = (fmt or Path(path).suffix.lstrip(".")).lower()
+        if fmt == "csv":
+            rows = _iter_csv(path)
+        elif fmt in ("geojson", "json"):
+            rows = map(_feature_to_marker, _iter_feature_collection(path))
+        elif fmt in ("geojsonl", "ndjson", "jsonl"):
+            rows = map(_feature_to_marker, _iter_geojsonl(path))
+        else:
+            raise ValueError(f"Formato de importación no soportado: {fmt}")
+
+        report = {"imported": 0, "rejected": 0, "errors": []}
+        chunk = []
+        for record, row in enumerate(rows, start=1):
+            try:
+                chunk.append(validate_marker(row))
+            except ValueError as e:
+                report["rejected"] += 1
+                if len(report["errors"]) < MAX_REPORTED_ERRORS:
+                    report["errors"].append(f"registro {record}: {e}")
+                continue
+            if len(chunk) >= chunk_size:
+                self._flush_chunk(chunk, on_chunk, report)
+                chunk = []
+        self._flush_chunk(chunk, on_chunk, report)
+        return report
+
+    def _flush_chunk(self, chunk, on_chunk, report):
+        if not chunk:
+            return
+        self.append_many(chunk)
+        if on_chunk:
+            on_chunk(chunk)
+        report["imported"] += len(chunk)
+
+    @staticmethod
+    def export_csv(markers, path):
+        """Escribe los marcadores en CSV de forma incremental."""
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=CSV_FIELDS, extrasaction="ignore")
+            writer.writeheader()
+            for marker in markers:
+                writer.writerow(marker)
+
+    @staticmethod
+    def export_geojson(markers, path):
+        """Escribe los marcadores como FeatureCollection, una Feature cada vez."""
+        with open(path, "w", encoding="utf-8") as f:
+            f.write('{"type": "FeatureCollection", "features": [\n')
+            first = True
+            for marker in markers:
+                feature = {
+                    "type": "Feature",
+                    "geometry": {
+                        "type": "Point",
+                        "coordinates": [marker["longitude"], marker["latitude"]],
+                    },
+                    "properties": {
+                        "name": marker["name"],
+                        "description": marker.get("description", ""),
+                    },
+                }
+                if not first:
+                    f.write(",\n")
+                f.write(json.dumps(feature, ensure_ascii=False))
+                first = False
+            f.write("\n]}\n")
@@ -1,5 +1,8 @@
 from flask import Flask, request, jsonify, session
 
+from grading_service import REJECTED, GradingService, challenges_from_retos
+from retos import obtener_retos_iniciales
+
 app = Flask(__name__)
 app.secret_key = 'supersecretkey'
 
@@ -7,20 +10,25 @@ app.secret_key = 'supersecretkey'
 def authenticate_user(username, password):
     return username == 'testuser' and password == 'testpass'
 
-# Mock de obtención de retos
+# Servicio de corrección compartido (pool de procesos con sandbox por entrega)
+_grading_service = None
+
+def get_grading_service():
+    global _grading_service
+    if _grading_service is None:
+        _grading_service = GradingService(challenges_from_retos())
+    return _grading_service
+
 def get_next_challenge():
+    reto = obtener_retos_iniciales()[0]
     return {
-        'id': 1,
-        'description': 'SELECT * FROM users WHERE id=1;',
-        'expected_result': [{'id': 1, 'name': 'Alice'}]
+        'id': reto.nivel,
+        'description': reto.instrucciones,
+        'expected_result': reto.solucion_esperada
     }
 
-# Mock de evaluación de soluciones
 def evaluate_solution(challenge_id, sql):
-    if sql.strip().lower() == 'select * from users where id=1;':
-        return {'correct': True, 'feedback': '¡Correcto!'}
-    else:
-        return {'correct': False, 'feedback': 'Revisa tu consulta SQL.'}
+    return get_grading_service().grade_sync(challenge_id, sql, session.get('user')).to_dict()
 
 @app.route('/login', methods=['POST'])
 def login():
@@ -44,7 +52,9 @@ def submit_solution(challenge_id):
         return jsonify({'message': 'No autenticado'}), 401
     data = request.get_json()
     result = evaluate_solution(challenge_id, data['sql'])
-    return jsonify({'feedback': result['feedback']}), 200
+    if result['status'] == REJECTED:
+        return jsonify(result), 503
+    return jsonify(result), 200
 
 @app.route('/logout', methods=['POST'])
 def logout():
@@ -0,0 +1,98 @@
+"""
+Módulo: attempt_stats.py
+
+Consultas de estadísticas sobre los intentos de los jugadores.
+
+Los totales por reto salen de la tabla materializada ``challenge_stats``
+(mantenida por triggers, ver ``db_schema.create_tables``), así que la tasa
+de éxito es una búsqueda por clave. Las medianas recorren solo los intentos
+del reto a través del índice (challenge_id, attempt_time), y el progreso de
+un jugador usa el índice (user_id, attempt_time).
+"""
+
+import sqlite3
+from typing import Dict, List, Optional
+
+def challenge_stats(conn: sqlite3.Connection, challenge_id: int) -> Dict[str, object]:
+    """Totales materializados de un reto (ceros si aún no tiene intentos)."""
+    row = conn.execute(
+        "SELECT attempts, correct_attempts, last_attempt_time FROM challenge_stats WHERE challenge_id = ?",
+        (challenge_id,),
+    ).fetchone()
+    attempts, correct, last = row if row else (0, 0, None)
+    return {
+        "challenge_id": challenge_id,
+        "attempts": attempts,
+        "correct_attempts": correct,
+        "success_rate": correct / attempts if attempts else 0.0,
+        "last_attempt_time": last,
+    }
+
+def success_rate(conn: sqlite3.Connection, challenge_id: int) -> float:
+    """Proporción de intentos correctos de un reto."""
+    return challenge_stats(conn, challenge_id)["success_rate"]
+
+def all_challenge_stats(conn: sqlite3.Connection) -> Dict[int, Dict[str, int]]:
+    """aciertos/intentos de todos los retos, en el formato de DifficultyAdjuster."""
+    return {
+        challenge_id: {"aciertos": correct, "intentos": attempts}
+        for challenge_id, attempts, correct in conn.execute(
+            "SELECT challenge_id, attempts, correct_attempts FROM challenge_stats"
+        )
+    }
+
+# Por cada jugador que resolvió el reto: intentos hasta el primer acierto y
+# segundos desde su primer intento hasta ese acierto
+_SOLVES_SQL = """
+WITH ordered AS (
+    SELECT user_id, is_correct, attempt_time,
+           ROW_NUMBER() OVER (PARTITION BY user_id ORDER BY attempt_time, id) AS n,
+           MIN(attempt_time) OVER (PARTITION BY user_id) AS first_time
+    FROM user_attempts
+    WHERE challenge_id = ?
+),
+solves AS (
+    SELECT user_id,
+           MIN(n) AS tries,
+           (julianday(MIN(attempt_time)) - julianday(MIN(first_time))) * 86400.0 AS seconds
+    FROM ordered
+    WHERE is_correct = 1
+    GROUP BY user_id
+)
+"""
+
+def _median(conn: sqlite3.Connection, column: str, challenge_id: int) -> Optional[float]:
+    """Mediana de una columna de ``solves`` sin traer todas las filas a Python."""
+    count = conn.execute(_SOLVES_SQL + "SELECT COUNT(*) FROM solves", (challenge_id,)).fetchone()[0]
+    if not count:
+        return None
+    middle = conn.execute(
+        _SOLVES_SQL + f"SELECT {column} FROM solves ORDER BY {column} LIMIT ? OFFSET ?",
+        (challenge_id, 2 - count % 2, (count - 1) // 2),
+    ).fetchall()
+    return sum(value for (value,) in middle) / len(middle)
+
+def median_attempts_to_solve(conn: sqlite3.Connection, challenge_id: int) -> Optional[float]:
+    """Mediana de intentos hasta el primer acierto, entre los jugadores que resolvieron el reto."""
+    return _median(conn, "tries", challenge_id)
+
+def median_time_to_solve(conn: sqlite3.Connection, challenge_id: int) -> Optional[float]:
+    """Mediana de segundos entre el primer intento y el primer acierto de cada jugador."""
+    return _median(conn, "seconds", challenge_id)
+
+def user_progress(conn: sqlite3.Connection, user_id: int) -> List[Dict[str, object]]:
+    """Intentos, aciertos y fecha del último intento de un jugador por reto."""
+    rows = conn.execute(
+        """
+        SELECT challenge_id, COUNT(*), COALESCE(SUM(is_correct = 1), 0), MAX(attempt_time)
+        FROM user_attempts
+        WHERE user_id = ?
+        GROUP BY challenge_id
+        ORDER BY challenge_id
+        """,
+        (user_id,),
+    ).fetchall()
+    return [
+        {"challenge_id": c, "attempts": a, "correct_attempts": ok, "solved": ok > 0, "last_attempt_time": last}
+        for c, a, ok, last in rows
+    ]
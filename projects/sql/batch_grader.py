@@ -0,0 +1,267 @@
+"""
+Módulo: batch_grader.py
+
+Recalifica en lote los intentos guardados en ``user_attempts`` cuando cambia
+la solución o los datos de un reto. Los intentos se reparten entre un pool
+de procesos; cada proceso trabaja sobre su propia copia en memoria de la base
+de datos del reto y los resultados se escriben en transacciones por lotes.
+
+La copia de cada proceso se comparte entre todos sus intentos, así que cada
+intento pasa antes el control de seguridad de ``sql_executor.check_query``:
+lo que no es una consulta de lectura (incluido un PRAGMA que desactive
+``query_only``) se califica como incorrecto sin ejecutarse.
+
+Un intento es correcto si devuelve las mismas columnas (con el mismo nombre
+y orden) y el mismo multiconjunto de filas que la solución. Los resultados
+no se comparan truncados: un intento con más de ``max_rows`` filas es
+incorrecto, y una solución que las supera es un error de ese reto.
+
+Uso:
+    python batch_grader.py --attempts-db sqlgame.db --challenge-db retos.db \
+        --solutions soluciones.json --challenge 3 --workers 4
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from urllib.parse import quote
+
+from sql_executor import QueryBudget, check_query
+
+# Intentos enviados a cada proceso por tarea
+CHUNK_SIZE = 500
+# Actualizaciones por transacción al escribir los resultados
+WRITE_BATCH = 2000
+
+# Veredicto de los intentos de un reto cuya solución no se pudo ejecutar
+SOLUTION_ERROR = "solution_error"
+
+class SolutionError(Exception):
+    """La consulta de referencia de un reto falló o no es de solo lectura."""
+
+class TooManyRows(ValueError):
+    """El resultado de una consulta supera ``max_rows`` filas."""
+
+# Estado de cada proceso del pool (se inicializa en _init_worker)
+_worker_conn: Optional[sqlite3.Connection] = None
+_worker_solutions: Dict[int, str] = {}
+_worker_expected: Dict[int, Union[None, SolutionError, Tuple[List[str], Counter]]] = {}
+_worker_limits: Dict[str, float] = {}
+
+def _init_worker(challenge_db: str, solutions: Dict[int, str], limits: Dict[str, float]):
+    """Copia la base de datos del reto a memoria para uso exclusivo del proceso."""
+    global _worker_conn, _worker_solutions, _worker_expected, _worker_limits
+    source = sqlite3.connect(f"file:{quote(str(challenge_db))}?mode=ro", uri=True)
+    _worker_conn = sqlite3.connect(":memory:")
+    source.backup(_worker_conn)
+    source.close()
+    # La copia es de solo lectura: un intento con DELETE no altera los siguientes
+    _worker_conn.execute("PRAGMA query_only = ON")
+    _worker_solutions = solutions
+    _worker_expected = {}
+    _worker_limits = limits
+
+def _run(query: str) -> Tuple[List[str], Counter]:
+    """
+    Ejecuta una consulta con presupuesto y devuelve (columnas, multiconjunto
+    de filas). Lanza TooManyRows si el resultado supera ``max_rows`` filas.
+    """
+    budget = QueryBudget(_worker_limits["time_limit"], _worker_limits["max_instructions"])
+    _worker_conn.set_progress_handler(budget, budget.check_every)
+    max_rows = int(_worker_limits["max_rows"])
+    try:
+        cursor = _worker_conn.execute(query)
+        columns = [desc[0] for desc in cursor.description] if cursor.description else []
+        rows = cursor.fetchmany(max_rows + 1)
+        cursor.close()
+        if len(rows) > max_rows:
+            raise TooManyRows(f"el resultado supera {max_rows} filas")
+        return columns, Counter(rows)
+    finally:
+        _worker_conn.set_progress_handler(None, 0)
+
+def _expected(challenge_id: int) -> Union[None, SolutionError, Tuple[List[str], Counter]]:
+    """
+    Resultado de la solución del reto, calculado una vez por proceso.
+    None si el reto no tiene solución; SolutionError si la solución falla.
+    """
+    if challenge_id not in _worker_expected:
+        solution = _worker_solutions.get(challenge_id)
+        expected: Union[None, SolutionError, Tuple[List[str], Counter]] = None
+        if solution:
+            reason = check_query(solution)
+            if reason is not None:
+                expected = SolutionError(f"solución no permitida: {reason}")
+            else:
+                try:
+                    expected = _run(solution)
+                except (sqlite3.Error, sqlite3.Warning, ValueError) as e:
+                    expected = SolutionError(f"error en la solución: {e}")
+        _worker_expected[challenge_id] = expected
+    return _worker_expected[challenge_id]
+
+def _grade_chunk(attempts: List[Tuple[int, int, str]]) -> List[Tuple[int, int, Union[None, bool, str]]]:
+    """
+    Califica un bloque de intentos (id, challenge_id, consulta).
+    Devuelve (id, challenge_id, veredicto): correcto/incorrecto, None si el
+    reto no tiene solución o ``(SOLUTION_ERROR, mensaje)`` si la solución falla.
+    """
+    results = []
+    for attempt_id, challenge_id, query in attempts:
+        expected = _expected(challenge_id)
+        if expected is None:
+            results.append((attempt_id, challenge_id, None))
+            continue
+        if isinstance(expected, SolutionError):
+            results.append((attempt_id, challenge_id, (SOLUTION_ERROR, str(expected))))
+            continue
+        if check_query(query) is not None:
+            # Escrituras, PRAGMAs de configuración, varias sentencias...
+            results.append((attempt_id, challenge_id, False))
+            continue
+        try:
+            columns, rows = _run(query)
+            results.append((attempt_id, challenge_id, columns == expected[0] and rows == expected[1]))
+        except (sqlite3.Error, sqlite3.Warning, ValueError):
+            # Error de sintaxis, presupuesto agotado o demasiadas filas
+            results.append((attempt_id, challenge_id, False))
+    return results
+
+def _iter_attempts(conn: sqlite3.Connection, challenge_ids: Optional[Iterable[int]]) -> Iterator[Tuple[int, int, str]]:
+    sql = "SELECT id, challenge_id, submitted_query FROM user_attempts"
+    params: List[int] = []
+    if challenge_ids is not None:
+        challenge_ids = list(challenge_ids)
+        sql += f" WHERE challenge_id IN ({','.join('?' * len(challenge_ids))})"
+        params = challenge_ids
+    sql += " ORDER BY id"
+    yield from conn.execute(sql, params)
+
+def _chunks(items: Iterator, size: int) -> Iterator[List]:
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def regrade_attempts(
+    attempts_db: str,
+    challenge_db: str,
+    solutions: Dict[int, str],
+    challenge_ids: Optional[Iterable[int]] = None,
+    workers: Optional[int] = None,
+    chunk_size: int = CHUNK_SIZE,
+    write_batch: int = WRITE_BATCH,
+    time_limit: float = 2.0,
+    max_instructions: int = 50_000_000,
+    max_rows: int = 100_000,
+) -> Dict[str, Any]:
+    """
+    Recalifica los intentos guardados y actualiza ``is_correct``.
+
+    Si la solución de un reto falla, sus intentos no se modifican: se cuentan
+    en 'errors' y el motivo queda en 'solution_errors' por id de reto.
+
+    Args:
+        attempts_db: Base de datos con la tabla user_attempts
+        challenge_db: Base de datos con los datos de los retos
+        solutions: Consulta de referencia por id de reto
+        challenge_ids: Retos a recalificar (por defecto, todos)
+        workers: Número de procesos (por defecto, os.cpu_count())
+        chunk_size: Intentos por tarea enviada a cada proceso
+        write_batch: Actualizaciones por transacción
+
+    Returns:
+        Resumen con 'graded', 'correct', 'changed', 'skipped', 'errors' y
+        'solution_errors'
+    """
+    limits = {"time_limit": time_limit, "max_instructions": max_instructions, "max_rows": max_rows}
+    summary: Dict[str, Any] = {
+        "graded": 0, "correct": 0, "changed": 0, "skipped": 0, "errors": 0, "solution_errors": {},
+    }
+
+    reader = sqlite3.connect(attempts_db)
+    writer = sqlite3.connect(attempts_db, timeout=30)
+    writer.execute("PRAGMA journal_mode=WAL")
+    pending: List[Tuple[bool, int]] = []
+
+    def flush():
+        if pending:
+            with writer:
+                writer.executemany("UPDATE user_attempts SET is_correct = ? WHERE id = ?", pending)
+            pending.clear()
+
+    def collect(results):
+        ids = [attempt_id for attempt_id, _, _ in results]
+        previous = dict(reader.execute(
+            f"SELECT id, is_correct FROM user_attempts WHERE id IN ({','.join('?' * len(ids))})", ids
+        ).fetchall())
+        for attempt_id, challenge_id, correct in results:
+            if correct is None:
+                summary["skipped"] += 1
+                continue
+            if isinstance(correct, tuple):
+                summary["errors"] += 1
+                summary["solution_errors"][challenge_id] = correct[1]
+                continue
+            summary["graded"] += 1
+            summary["correct"] += int(correct)
+            if previous.get(attempt_id) is None or bool(previous[attempt_id]) != correct:
+                summary["changed"] += 1
+            pending.append((correct, attempt_id))
+        if len(pending) >= write_batch:
+            flush()
+
+    workers = workers or os.cpu_count() or 1
+    try:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(challenge_db, solutions, limits),
+        ) as pool:
+            # Como mucho dos bloques en vuelo por proceso: los intentos se leen en streaming
+            in_flight = deque()
+            for chunk in _chunks(_iter_attempts(reader, challenge_ids), chunk_size):
+                in_flight.append(pool.submit(_grade_chunk, chunk))
+                if len(in_flight) >= 2 * workers:
+                    collect(in_flight.popleft().result())
+            while in_flight:
+                collect(in_flight.popleft().result())
+        flush()
+    finally:
+        reader.close()
+        writer.close()
+    return summary
+
+def main():
+    parser = argparse.ArgumentParser(description="Recalifica en lote los intentos guardados.")
+    parser.add_argument("--attempts-db", required=True, help="Base de datos con user_attempts")
+    parser.add_argument("--challenge-db", required=True, help="Base de datos con los datos de los retos")
+    parser.add_argument("--solutions", required=True, help="JSON {id_reto: consulta_solución}")
+    parser.add_argument("--challenge", type=int, action="append", help="Reto a recalificar (repetible)")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    with open(args.solutions, "r", encoding="utf-8") as f:
+        solutions = {int(k): v for k, v in json.load(f).items()}
+    summary = regrade_attempts(
+        args.attempts_db, args.challenge_db, solutions,
+        challenge_ids=args.challenge, workers=args.workers,
+    )
+    print(
+        f"Intentos recalificados: {summary['graded']} "
+        f"(correctos: {summary['correct']}, cambiados: {summary['changed']}, "
+        f"sin solución: {summary['skipped']})"
+    )
+    for challenge_id, message in sorted(summary["solution_errors"].items()):
+        print(f"Reto {challenge_id} no recalificado: {message}")
+
+if __name__ == "__main__":
+    main()
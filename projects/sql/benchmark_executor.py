@@ -0,0 +1,85 @@
+"""
+Mide el rendimiento de SQLExecutor con N jugadores enviando consultas a la vez.
+
+Compara el pool de conexiones de solo lectura con abrir una conexión nueva
+por consulta (el comportamiento anterior).
+
+Uso:
+    python benchmark_executor.py --threads 1 4 16 --queries 2000
+"""
+
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from db_schema import create_tables, insert_sample_data
+from sql_executor import SQLExecutor
+
+QUERIES = [
+    "SELECT * FROM employees WHERE salary > 25000",
+    "SELECT d.name, COUNT(*) FROM employees e JOIN departments d ON e.department_id = d.id GROUP BY d.name",
+    "SELECT first_name, last_name FROM employees ORDER BY hire_date DESC LIMIT 3",
+]
+
+
+class FreshConnectionExecutor(SQLExecutor):
+    """Referencia: una conexión nueva por consulta, como antes del pool."""
+
+    def execute_query(self, query):
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute(query)
+            return {"success": True, "rows": cursor.fetchall()}
+
+
+def build_database(path):
+    conn = sqlite3.connect(path)
+    create_tables(conn)
+    insert_sample_data(conn)
+    conn.close()
+
+
+def run(executor, threads, total_queries):
+    """Devuelve consultas por segundo con ``threads`` remitentes concurrentes."""
+    def submit(i):
+        result = executor.execute_query(QUERIES[i % len(QUERIES)])
+        assert result["success"], result
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(submit, range(total_queries)))
+    return total_queries / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del pool de conexiones de SQLExecutor")
+    parser.add_argument("--db", help="Base de datos a usar (por defecto, una temporal con datos de ejemplo)")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+
+    tmpdir = None
+    db_path = args.db
+    if not db_path:
+        tmpdir = tempfile.TemporaryDirectory()
+        db_path = os.path.join(tmpdir.name, "bench.db")
+        build_database(db_path)
+
+    print(f"{'hilos':>6} {'sin pool (q/s)':>16} {'con pool (q/s)':>16} {'mejora':>8}")
+    for threads in args.threads:
+        baseline = run(FreshConnectionExecutor(db_path), threads, args.queries)
+        # Sin caché de resultados: con tan pocas consultas distintas mediría la caché, no el pool
+        pooled_executor = SQLExecutor(db_path, pool_size=threads, result_cache_size=0)
+        pooled = run(pooled_executor, threads, args.queries)
+        pooled_executor.close()
+        print(f"{threads:>6} {baseline:>16.0f} {pooled:>16.0f} {pooled / baseline:>7.1f}x")
+
+    if tmpdir:
+        tmpdir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Mide el rendimiento del Leaderboard con muchos jugadores.
+
+Compara la skip list indexable con la consulta SQL equivalente
+(COUNT(*) de jugadores por delante) para obtener la posición de un jugador.
+
+Uso:
+    python benchmark_leaderboard.py --players 1000000 --operations 100000
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from leaderboard import Leaderboard
+
+
+def timed(label, operations, func):
+    start = time.perf_counter()
+    for i in range(operations):
+        func(i)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {operations / elapsed:>12.0f} op/s {elapsed * 1e6 / operations:>10.1f} µs/op")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del Leaderboard")
+    parser.add_argument("--players", type=int, default=1_000_000)
+    parser.add_argument("--operations", type=int, default=100_000)
+    parser.add_argument("--sql-operations", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    usernames = [f"player{i}" for i in range(args.players)]
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        board = Leaderboard(os.path.join(tmpdir, "leaderboard.db"), batch_size=10_000)
+
+        start = time.perf_counter()
+        board.bulk_load((u, rng.randint(0, 100_000), rng.randint(1, 10)) for u in usernames)
+        print(f"Carga inicial de {len(board)} jugadores: {time.perf_counter() - start:.2f} s")
+
+        timed("update", args.operations,
+              lambda i: board.update(rng.choice(usernames), rng.randint(0, 100_000)))
+        board.flush()
+        timed("rank", args.operations, lambda i: board.rank(rng.choice(usernames)))
+        timed("top(10)", args.operations, lambda i: board.top(10))
+        timed("around(5)", args.operations, lambda i: board.around(rng.choice(usernames), 5))
+
+        conn = board._conn
+
+        def sql_rank(i):
+            username = rng.choice(usernames)
+            conn.execute(
+                """
+                SELECT COUNT(*) + 1 FROM leaderboard, (SELECT points AS p FROM leaderboard WHERE username = ?)
+                WHERE points > p OR (points = p AND username < ?)
+                """,
+                (username, username),
+            ).fetchone()
+
+        timed("rank (SQL COUNT)", args.sql_operations, sql_rank)
+        board.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+"""
+Módulo: challenge_catalog.py
+
+Catálogo único e inmutable de retos y tipos de ejercicio.
+
+Reúne los retos de ``levels``, ``retos``, los tipos de ``exercise_types`` y
+los retos de práctica de la interfaz PyQt en entradas compactas
+(``CatalogEntry``, una tupla con nombre) e índices por id, nivel,
+dificultad y palabra clave SQL, con búsqueda por prefijo del título.
+
+El catálogo se compila una vez y se guarda en ``__pycache__`` como JSON
+versionado; en el siguiente arranque se carga directamente si el formato y
+el contenido de los módulos de origen no han cambiado.
+"""
+
+import bisect
+import hashlib
+import json
+import os
+import unicodedata
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Optional, Tuple
+
+from sql_fingerprint import tokenize
+
+# Cambiar al modificar CatalogEntry o la forma de compilar el catálogo
+FORMAT_VERSION = 1
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+SOURCE_FILES = ("levels.py", "retos.py", "exercise_types.py", "challenge_catalog.py", "sql_fingerprint.py")
+COMPILED_PATH = os.path.join(_HERE, "__pycache__", f"challenge_catalog.v{FORMAT_VERSION}.json")
+
+# Retos de práctica de la interfaz PyQt (tablas users y products de ui/editor.py)
+PRACTICE_CHALLENGES = (
+    (1, "Selecciona todos los usuarios", "Escribe una consulta para seleccionar todos los usuarios de la tabla users."),
+    (2, "Cuenta los productos", "Cuenta cuántos productos hay en la tabla products."),
+    (3, "Filtra por edad", "Selecciona los usuarios mayores de 18 años de la tabla users."),
+)
+
+SQL_KEYWORDS = frozenset({
+    "SELECT", "WHERE", "AND", "OR", "NOT", "DISTINCT", "COUNT", "SUM", "AVG", "MIN", "MAX",
+    "HAVING", "LIMIT", "OFFSET", "JOIN", "ON", "IN", "LIKE", "BETWEEN", "UNION", "UPPER",
+    "LOWER", "CASE", "EXISTS", "DESC", "ASC", "WITH",
+})
+COMPOUND_KEYWORDS = frozenset({
+    "ORDER BY", "GROUP BY", "LEFT JOIN", "INNER JOIN", "RIGHT JOIN", "CROSS JOIN", "NOT IN",
+})
+
+class CatalogEntry(NamedTuple):
+    uid: str                      # "<origen>:<id>", único en todo el catálogo
+    source: str                   # levels, retos, tipos o practica
+    id: object
+    level: Optional[int]
+    difficulty: Optional[str]     # Fácil, Medio o Difícil (como la tabla challenges)
+    title: str
+    description: str
+    example: Optional[str]
+    keywords: Tuple[str, ...]
+    hints: Tuple[str, ...] = ()
+    setup: Tuple[str, ...] = ()
+
+    def as_dict(self) -> dict:
+        return self._asdict()
+
+def difficulty_for_level(level: Optional[int]) -> Optional[str]:
+    if level is None:
+        return None
+    if level <= 2:
+        return "Fácil"
+    return "Medio" if level == 3 else "Difícil"
+
+def extract_keywords(*texts: Optional[str]) -> Tuple[str, ...]:
+    """Palabras clave SQL que aparecen en los textos (incluye las compuestas, como GROUP BY)."""
+    found = set()
+    for text in texts:
+        if not text:
+            continue
+        previous = None
+        for kind, value in tokenize(text):
+            if kind != "word":
+                continue
+            word = value.upper()
+            if word in SQL_KEYWORDS:
+                found.add(word)
+            if previous and f"{previous} {word}" in COMPOUND_KEYWORDS:
+                found.add(f"{previous} {word}")
+            previous = word
+    return tuple(sorted(found))
+
+def _search_key(text: str) -> str:
+    """Minúsculas y sin tildes, para la búsqueda por prefijo."""
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+class ChallengeCatalog:
+    """
+    Catálogo inmutable con índices precalculados. Todas las consultas por
+    clave son O(1); la búsqueda por prefijo es O(log n + k).
+    """
+
+    def __init__(self, entries: Iterable[CatalogEntry]):
+        self._entries: Tuple[CatalogEntry, ...] = tuple(entries)
+        by_uid: Dict[str, CatalogEntry] = {}
+        by_source_id: Dict[Tuple[str, object], CatalogEntry] = {}
+        by_level: Dict[int, List[CatalogEntry]] = {}
+        by_difficulty: Dict[str, List[CatalogEntry]] = {}
+        by_keyword: Dict[str, List[CatalogEntry]] = {}
+        by_source: Dict[str, List[CatalogEntry]] = {}
+        for entry in self._entries:
+            by_uid[entry.uid] = entry
+            by_source_id[(entry.source, entry.id)] = entry
+            by_source.setdefault(entry.source, []).append(entry)
+            if entry.level is not None:
+                by_level.setdefault(entry.level, []).append(entry)
+            if entry.difficulty is not None:
+                by_difficulty.setdefault(entry.difficulty, []).append(entry)
+            for keyword in entry.keywords:
+                by_keyword.setdefault(keyword, []).append(entry)
+
+        def freeze(index):
+            return MappingProxyType({k: tuple(v) for k, v in index.items()})
+
+        self.by_uid: Mapping[str, CatalogEntry] = MappingProxyType(by_uid)
+        self._by_source_id = MappingProxyType(by_source_id)
+        self.by_level = freeze(by_level)
+        self.by_difficulty = freeze(by_difficulty)
+        self.by_keyword = freeze(by_keyword)
+        self.by_source = freeze(by_source)
+        self._titles = tuple(sorted((_search_key(e.title), e.uid) for e in self._entries))
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __iter__(self):
+        return iter(self._entries)
+
+    def get(self, source: str, id) -> Optional[CatalogEntry]:
+        """Entrada por origen e id (el id de cada módulo de origen)."""
+        return self._by_source_id.get((source, id))
+
+    def level(self, level: int) -> Tuple[CatalogEntry, ...]:
+        return self.by_level.get(level, ())
+
+    def difficulty(self, difficulty: str) -> Tuple[CatalogEntry, ...]:
+        return self.by_difficulty.get(difficulty, ())
+
+    def keyword(self, keyword: str) -> Tuple[CatalogEntry, ...]:
+        return self.by_keyword.get(keyword.upper(), ())
+
+    def source(self, source: str) -> Tuple[CatalogEntry, ...]:
+        return self.by_source.get(source, ())
+
+    def search(self, prefix: str, limit: Optional[int] = None) -> List[CatalogEntry]:
+        """Entradas cuyo título empieza por ``prefix`` (sin distinguir mayúsculas ni tildes)."""
+        key = _search_key(prefix)
+        start = bisect.bisect_left(self._titles, (key, ""))
+        results = []
+        for title, uid in self._titles[start:]:
+            if not title.startswith(key) or (limit is not None and len(results) >= limit):
+                break
+            results.append(self.by_uid[uid])
+        return results
+
+    def to_json(self, source_hash: str) -> str:
+        return json.dumps(
+            {"version": FORMAT_VERSION, "source_hash": source_hash, "entries": [list(e) for e in self._entries]},
+            ensure_ascii=False,
+        )
+
+    @classmethod
+    def from_json(cls, text: str, source_hash: str) -> Optional["ChallengeCatalog"]:
+        """Catálogo compilado, o None si es de otra versión o de otras fuentes."""
+        data = json.loads(text)
+        if data.get("version") != FORMAT_VERSION or data.get("source_hash") != source_hash:
+            return None
+        return cls(
+            CatalogEntry(*fields[:8], tuple(fields[8]), tuple(fields[9]), tuple(fields[10]))
+            for fields in data["entries"]
+        )
+
+def build_entries() -> List[CatalogEntry]:
+    """Lee todos los módulos de origen y construye las entradas del catálogo."""
+    from exercise_types import EXERCISE_TYPES
+    from levels import get_sql_levels
+    from retos import obtener_retos_iniciales
+
+    entries = []
+    for level in get_sql_levels():
+        for challenge in level.challenges:
+            entries.append(CatalogEntry(
+                uid=f"levels:{challenge.id}",
+                source="levels",
+                id=challenge.id,
+                level=level.level,
+                difficulty=difficulty_for_level(level.level),
+                title=challenge.title,
+                description=challenge.description,
+                example=challenge.example_query,
+                keywords=tuple(sorted(set(challenge.required_sql) | set(extract_keywords(challenge.example_query)))),
+                hints=tuple(challenge.hints),
+            ))
+    for reto in obtener_retos_iniciales():
+        title = reto.instrucciones.split("\n", 1)[0]
+        entries.append(CatalogEntry(
+            uid=f"retos:{reto.nivel}",
+            source="retos",
+            id=reto.nivel,
+            level=reto.nivel,
+            difficulty=difficulty_for_level(reto.nivel),
+            title=title,
+            description=reto.instrucciones,
+            example=None,
+            keywords=extract_keywords(reto.instrucciones),
+            setup=tuple(reto.datos_iniciales),
+        ))
+    for tipo in EXERCISE_TYPES:
+        entries.append(CatalogEntry(
+            uid=f"tipos:{tipo['nombre']}",
+            source="tipos",
+            id=tipo["nombre"],
+            level=None,
+            difficulty=None,
+            title=tipo["nombre"],
+            description=tipo["descripcion"],
+            example=tipo["ejemplo"],
+            keywords=extract_keywords(tipo["ejemplo"]),
+        ))
+    for challenge_id, title, description in PRACTICE_CHALLENGES:
+        entries.append(CatalogEntry(
+            uid=f"practica:{challenge_id}",
+            source="practica",
+            id=challenge_id,
+            level=None,
+            difficulty=None,
+            title=title,
+            description=description,
+            example=None,
+            keywords=(),
+        ))
+    return entries
+
+def source_hash() -> str:
+    """Huella del contenido de los módulos de origen."""
+    digest = hashlib.blake2b(digest_size=16)
+    for name in SOURCE_FILES:
+        with open(os.path.join(_HERE, name), "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+def load_catalog(compiled_path: Optional[str] = COMPILED_PATH) -> ChallengeCatalog:
+    """
+    Carga el catálogo compilado si sigue vigente; si no, lo construye desde
+    los módulos de origen y guarda la versión compilada.
+    """
+    current_hash = source_hash()
+    if compiled_path:
+        try:
+            with open(compiled_path, "r", encoding="utf-8") as f:
+                catalog = ChallengeCatalog.from_json(f.read(), current_hash)
+            if catalog is not None:
+                return catalog
+        except (OSError, ValueError, TypeError, KeyError):
+            pass
+    catalog = ChallengeCatalog(build_entries())
+    if compiled_path:
+        try:
+            os.makedirs(os.path.dirname(compiled_path), exist_ok=True)
+            tmp_path = f"{compiled_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(catalog.to_json(current_hash))
+            os.replace(tmp_path, compiled_path)
+        except OSError:
+            pass
+    return catalog
+
+@lru_cache(maxsize=1)
+def get_catalog() -> ChallengeCatalog:
+    """Catálogo compartido del proceso (se carga una sola vez)."""
+    return load_catalog()
@@ -0,0 +1,257 @@
+"""
+Módulo: data_generator.py
+
+Generador determinista de datos sintéticos a gran escala para las tablas de
+ejemplo del juego (employees, departments, projects y employee_projects).
+
+Con la misma semilla se obtienen siempre las mismas filas. Las distribuciones
+tienen sesgo realista: unos pocos departamentos concentran la mayoría de
+empleados, unos pocos proyectos la mayoría de asignaciones y los salarios
+siguen una log-normal distinta por departamento.
+
+Las filas se insertan con executemany por lotes dentro de una transacción por
+tabla y con PRAGMAs de carga masiva; los índices se crean al final.
+
+Uso:
+    python data_generator.py --db retos_grandes.db --employees 1000000 --seed 42
+"""
+
+import argparse
+import itertools
+import math
+import random
+import sqlite3
+import time
+from contextlib import contextmanager
+from datetime import date, timedelta
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+from db_schema import create_tables
+
+FIRST_NAMES = [
+    "Ana", "Luis", "María", "Carlos", "Elena", "Javier", "Lucía", "Pablo", "Sofía", "Diego",
+    "Carmen", "Jorge", "Laura", "Miguel", "Paula", "Andrés", "Marta", "Raúl", "Sara", "David",
+    "Isabel", "Alberto", "Cristina", "Fernando", "Beatriz", "Sergio", "Rocío", "Hugo", "Irene", "Álvaro",
+]
+LAST_NAMES = [
+    "García", "Pérez", "López", "Sánchez", "Martínez", "González", "Rodríguez", "Fernández",
+    "Gómez", "Díaz", "Moreno", "Álvarez", "Romero", "Alonso", "Gutiérrez", "Navarro", "Torres",
+    "Domínguez", "Vázquez", "Ramos", "Gil", "Ramírez", "Serrano", "Blanco", "Molina", "Morales",
+]
+DEPARTMENT_AREAS = [
+    "Tecnología", "Ventas", "Marketing", "Recursos Humanos", "Finanzas", "Operaciones",
+    "Logística", "Atención al Cliente", "Legal", "Compras", "Calidad", "I+D",
+]
+PROJECT_KINDS = [
+    "Migración", "Campaña", "Implementación", "Auditoría", "Rediseño", "Automatización",
+    "Expansión", "Integración", "Formación", "Optimización",
+]
+
+BATCH_SIZE = 50_000
+START_DATE = date(2000, 1, 1)
+END_DATE = date(2024, 12, 31)
+
+BULK_LOAD_PRAGMAS = {
+    "synchronous": "OFF",
+    "journal_mode": "MEMORY",
+    "temp_store": "MEMORY",
+    "cache_size": "-200000",
+}
+
+INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_employees_department ON employees(department_id)",
+    "CREATE INDEX IF NOT EXISTS idx_employee_projects_employee ON employee_projects(employee_id)",
+    "CREATE INDEX IF NOT EXISTS idx_employee_projects_project ON employee_projects(project_id)",
+]
+
+@contextmanager
+def bulk_load_pragmas(conn: sqlite3.Connection):
+    """Aplica BULK_LOAD_PRAGMAS durante el bloque y restaura los valores anteriores."""
+    previous = {}
+    for pragma, value in BULK_LOAD_PRAGMAS.items():
+        previous[pragma] = conn.execute(f"PRAGMA {pragma}").fetchone()[0]
+        conn.execute(f"PRAGMA {pragma} = {value}")
+    try:
+        yield
+    finally:
+        for pragma, value in previous.items():
+            conn.execute(f"PRAGMA {pragma} = {value}")
+
+def zipf_cum_weights(n: int, s: float) -> List[float]:
+    """Pesos acumulados de una distribución de Zipf con exponente ``s`` sobre n elementos."""
+    return list(itertools.accumulate(1.0 / (k ** s) for k in range(1, n + 1)))
+
+def _iso(day_offset: int) -> str:
+    return (START_DATE + timedelta(days=day_offset)).isoformat()
+
+def _next_id(conn: sqlite3.Connection, table: str) -> int:
+    return (conn.execute(f"SELECT COALESCE(MAX(id), 0) FROM {table}").fetchone()[0]) + 1
+
+def _batched(rows: Iterator[Tuple], size: int) -> Iterator[List[Tuple]]:
+    while True:
+        batch = list(itertools.islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+def _insert(conn: sqlite3.Connection, sql: str, rows: Iterator[Tuple], batch_size: int) -> int:
+    """Inserta todas las filas en una sola transacción, por lotes de executemany."""
+    count = 0
+    with conn:
+        for batch in _batched(rows, batch_size):
+            conn.executemany(sql, batch)
+            count += len(batch)
+    return count
+
+def _departments(rng: random.Random, first_id: int, n: int) -> Iterator[Tuple]:
+    for i in range(n):
+        area = DEPARTMENT_AREAS[i % len(DEPARTMENT_AREAS)]
+        suffix = f" {i // len(DEPARTMENT_AREAS) + 1}" if n > len(DEPARTMENT_AREAS) else ""
+        yield (first_id + i, f"{area}{suffix}")
+
+def _employees(rng: random.Random, first_id: int, n: int, dept_ids: Sequence[int], skew: float) -> Iterator[Tuple]:
+    cum = zipf_cum_weights(len(dept_ids), skew)
+    # Salario base por departamento: algunos departamentos pagan mucho más que otros
+    base_salary = {d: rng.uniform(20_000, 45_000) for d in dept_ids}
+    total_days = (END_DATE - START_DATE).days
+    for i in range(n):
+        dept = rng.choices(dept_ids, cum_weights=cum)[0]
+        # ~1% de empleados sin departamento, útil para retos de LEFT JOIN
+        department_id = None if rng.random() < 0.01 else dept
+        # Más contrataciones recientes que antiguas
+        hire_offset = int(total_days * math.sqrt(rng.random()))
+        salary = round(base_salary[dept] * rng.lognormvariate(0, 0.35), 2)
+        yield (
+            first_id + i,
+            rng.choice(FIRST_NAMES),
+            rng.choice(LAST_NAMES),
+            department_id,
+            _iso(hire_offset),
+            salary,
+        )
+
+def _projects(rng: random.Random, first_id: int, n: int) -> Iterator[Tuple]:
+    total_days = (END_DATE - START_DATE).days
+    for i in range(n):
+        start = rng.randrange(total_days)
+        # ~20% de proyectos siguen abiertos (end_date NULL)
+        end = None if rng.random() < 0.2 else _iso(min(start + int(rng.expovariate(1 / 180)) + 1, total_days))
+        yield (first_id + i, f"{rng.choice(PROJECT_KINDS)} {first_id + i}", _iso(start), end)
+
+def _assignments(
+    rng: random.Random, first_id: int, employee_ids: range, project_ids: Sequence[int],
+    per_employee: float, skew: float,
+) -> Iterator[Tuple]:
+    cum = zipf_cum_weights(len(project_ids), skew)
+    total_days = (END_DATE - START_DATE).days
+    next_id = first_id
+    for employee_id in employee_ids:
+        # Número de proyectos por empleado con distribución geométrica de media per_employee
+        k = int(math.log(1 - rng.random()) / math.log(per_employee / (per_employee + 1))) if per_employee > 0 else 0
+        for project_id in set(rng.choices(project_ids, cum_weights=cum, k=k)):
+            yield (next_id, employee_id, project_id, _iso(rng.randrange(total_days)))
+            next_id += 1
+
+def generate_dataset(
+    conn: sqlite3.Connection,
+    employees: int = 100_000,
+    departments: int = 50,
+    projects: int = 2_000,
+    assignments_per_employee: float = 2.0,
+    skew: float = 1.1,
+    seed: int = 42,
+    batch_size: int = BATCH_SIZE,
+    create_indexes: bool = True,
+) -> Dict[str, int]:
+    """
+    Añade datos sintéticos a las tablas de ejemplo (creándolas si no existen).
+
+    Args:
+        conn: Conexión SQLite de destino
+        employees, departments, projects: Filas a generar por tabla
+        assignments_per_employee: Media de proyectos por empleado
+        skew: Exponente de Zipf para el reparto por departamento y proyecto
+        seed: Semilla; la misma semilla produce los mismos datos
+        batch_size: Filas por llamada a executemany
+        create_indexes: Crear los índices de claves foráneas tras la carga
+
+    Returns:
+        Filas insertadas por tabla
+    """
+    rng = random.Random(seed)
+    create_tables(conn)
+    with bulk_load_pragmas(conn):
+        first_dept = _next_id(conn, "departments")
+        first_emp = _next_id(conn, "employees")
+        first_proj = _next_id(conn, "projects")
+        first_assignment = _next_id(conn, "employee_projects")
+        dept_ids = range(first_dept, first_dept + departments)
+        project_ids = range(first_proj, first_proj + projects)
+
+        counts = {
+            "departments": _insert(
+                conn, "INSERT INTO departments (id, name) VALUES (?, ?)",
+                _departments(rng, first_dept, departments), batch_size,
+            ),
+            "employees": _insert(
+                conn,
+                "INSERT INTO employees (id, first_name, last_name, department_id, hire_date, salary) VALUES (?, ?, ?, ?, ?, ?)",
+                _employees(rng, first_emp, employees, dept_ids, skew), batch_size,
+            ) if departments else 0,
+            "projects": _insert(
+                conn, "INSERT INTO projects (id, name, start_date, end_date) VALUES (?, ?, ?, ?)",
+                _projects(rng, first_proj, projects), batch_size,
+            ),
+        }
+        counts["employee_projects"] = _insert(
+            conn,
+            "INSERT INTO employee_projects (id, employee_id, project_id, assigned_date) VALUES (?, ?, ?, ?)",
+            _assignments(
+                rng, first_assignment, range(first_emp, first_emp + counts["employees"]),
+                project_ids, assignments_per_employee, skew,
+            ),
+            batch_size,
+        ) if projects else 0
+
+        if create_indexes:
+            with conn:
+                for statement in INDEXES:
+                    conn.execute(statement)
+            conn.execute("ANALYZE")
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera datos sintéticos para los retos SQL.")
+    parser.add_argument("--db", required=True, help="Base de datos SQLite de destino")
+    parser.add_argument("--employees", type=int, default=100_000)
+    parser.add_argument("--departments", type=int, default=50)
+    parser.add_argument("--projects", type=int, default=2_000)
+    parser.add_argument("--assignments-per-employee", type=float, default=2.0)
+    parser.add_argument("--skew", type=float, default=1.1, help="Exponente de Zipf (0 = uniforme)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--no-indexes", action="store_true", help="No crear índices tras la carga")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    start = time.perf_counter()
+    counts = generate_dataset(
+        conn,
+        employees=args.employees,
+        departments=args.departments,
+        projects=args.projects,
+        assignments_per_employee=args.assignments_per_employee,
+        skew=args.skew,
+        seed=args.seed,
+        batch_size=args.batch_size,
+        create_indexes=not args.no_indexes,
+    )
+    elapsed = time.perf_counter() - start
+    conn.close()
+    total = sum(counts.values())
+    for table, count in counts.items():
+        print(f"{table:<18} {count:>12,}")
+    print(f"{total:,} filas en {elapsed:.1f} s ({total / elapsed:,.0f} filas/s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+"""
+Módulo: dataset_loader.py
+
+Carga de conjuntos de datos reales (CSV y, opcionalmente, Parquet) en las
+tablas de los retos.
+
+Los ficheros se leen en streaming, sin cargarlos enteros en memoria. Si la
+tabla de destino ya existe (por ejemplo ``employees`` de ``db_schema``) se
+respetan sus columnas y tipos; si no, se crea con los tipos inferidos de las
+primeras filas. La conversión de texto a número la hace SQLite por afinidad
+de tipo, así que en Python solo se traducen las celdas vacías a NULL.
+
+Cada fichero se inserta con executemany por lotes dentro de una única
+transacción, con los PRAGMAs de carga masiva de ``data_generator``. Los
+índices de la tabla se eliminan antes de insertar y se recrean al final
+(construir un índice de una vez es mucho más rápido que mantenerlo fila a
+fila); si la carga falla, la transacción se deshace con los índices.
+
+Uso:
+    python dataset_loader.py --db retos.db datos/employees.csv datos/projects.parquet
+"""
+
+import argparse
+import csv
+import itertools
+import os
+import re
+import sqlite3
+import time
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from data_generator import bulk_load_pragmas
+from db_schema import create_tables
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+BATCH_SIZE = 50_000
+INFER_ROWS = 1_000
+
+# Formatos numéricos que SQLite convierte por afinidad; int()/float() de
+# Python aceptan además "1_000", "nan", "inf" o espacios, que quedarían como texto
+_INT_RE = re.compile(r"[+-]?\d+")
+_REAL_RE = re.compile(r"[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?")
+
+class LoadReport(NamedTuple):
+    """Resultado de cargar un fichero."""
+    table: str
+    rows: int
+    seconds: float
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def __str__(self):
+        return f"{self.table}: {self.rows:,} filas en {self.seconds:.2f} s ({self.rows_per_second:,.0f} filas/s)"
+
+def _quote(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
+
+def _has_leading_zero(value: str) -> bool:
+    # Códigos postales, DNI... se conservan como texto para no perder los ceros
+    digits = value.lstrip("+-")
+    return len(digits) > 1 and digits[0] == "0" and digits[1].isdigit()
+
+def _is_int(value: str) -> bool:
+    return _INT_RE.fullmatch(value) is not None
+
+def _is_real(value: str) -> bool:
+    return _REAL_RE.fullmatch(value) is not None
+
+def infer_type(values: Iterable[str]) -> str:
+    """Tipo SQLite (INTEGER, REAL o TEXT) que admite todos los valores no vacíos."""
+    kind = None
+    for value in values:
+        if value == "":
+            continue
+        if _has_leading_zero(value):
+            return "TEXT"
+        if kind in (None, "INTEGER") and _is_int(value):
+            kind = "INTEGER"
+        elif kind != "TEXT" and _is_real(value):
+            kind = "REAL"
+        else:
+            return "TEXT"
+    return kind or "TEXT"
+
+def table_columns(conn: sqlite3.Connection, table: str) -> List[str]:
+    """Columnas de una tabla existente (lista vacía si no existe)."""
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({_quote(table)})")]
+
+def _match_columns(conn: sqlite3.Connection, table: str, columns: Sequence[str]) -> List[str]:
+    """Nombres de columna de la tabla para las del fichero (sin distinguir mayúsculas)."""
+    existing = {name.lower(): name for name in table_columns(conn, table)}
+    unknown = [c for c in columns if c.lower() not in existing]
+    if unknown:
+        raise ValueError(f"La tabla {table} no tiene las columnas: {', '.join(unknown)}")
+    return [existing[c.lower()] for c in columns]
+
+def _detach_indexes(conn: sqlite3.Connection, table: str) -> List[str]:
+    """Elimina los índices explícitos de la tabla y devuelve su SQL para recrearlos."""
+    indexes = conn.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL",
+        (table,),
+    ).fetchall()
+    for name, _ in indexes:
+        conn.execute(f"DROP INDEX {_quote(name)}")
+    return [sql for _, sql in indexes]
+
+def _null_empty(rows: Iterable[Sequence]) -> Iterator[Sequence]:
+    for row in rows:
+        yield tuple(None if v == "" else v for v in row) if "" in row else row
+
+def load_rows(
+    conn: sqlite3.Connection,
+    table: str,
+    columns: Sequence[str],
+    rows: Iterable[Sequence],
+    column_types: Optional[Sequence[str]] = None,
+    batch_size: int = BATCH_SIZE,
+    defer_indexes: bool = True,
+    indexes: Sequence[str] = (),
+) -> LoadReport:
+    """
+    Inserta filas en ``table`` en una sola transacción.
+
+    Args:
+        conn: Conexión SQLite de destino
+        table: Tabla de destino; se crea con ``column_types`` si no existe
+        columns: Nombres de columna, en el orden de cada fila
+        rows: Iterable de filas (se consume en lotes de ``batch_size``)
+        column_types: Tipos para crear la tabla (por defecto, sin tipo)
+        defer_indexes: Eliminar los índices existentes y recrearlos al final
+        indexes: Sentencias CREATE INDEX adicionales a ejecutar tras la carga
+
+    Returns:
+        LoadReport con filas insertadas, segundos y filas por segundo
+    """
+    if len(set(c.lower() for c in columns)) != len(columns):
+        raise ValueError(f"Columnas repetidas en los datos para {table}")
+    start = time.perf_counter()
+    count = 0
+    with bulk_load_pragmas(conn):
+        with conn:
+            # BEGIN explícito: sqlite3 no abre transacción antes de CREATE/DROP
+            if not conn.in_transaction:
+                conn.execute("BEGIN")
+            if table_columns(conn, table):
+                columns = _match_columns(conn, table, columns)
+            else:
+                types = column_types or [""] * len(columns)
+                definition = ", ".join(f"{_quote(c)} {t}".rstrip() for c, t in zip(columns, types))
+                conn.execute(f"CREATE TABLE {_quote(table)} ({definition})")
+            deferred = _detach_indexes(conn, table) if defer_indexes else []
+            sql = (
+                f"INSERT INTO {_quote(table)} ({', '.join(_quote(c) for c in columns)}) "
+                f"VALUES ({', '.join('?' * len(columns))})"
+            )
+            rows = iter(rows)
+            while True:
+                batch = list(itertools.islice(rows, batch_size))
+                if not batch:
+                    break
+                conn.executemany(sql, batch)
+                count += len(batch)
+            for statement in itertools.chain(deferred, indexes):
+                conn.execute(statement)
+        if deferred or indexes:
+            conn.execute(f"ANALYZE {_quote(table)}")
+    return LoadReport(table, count, time.perf_counter() - start)
+
+def _table_name(path: str) -> str:
+    return os.path.splitext(os.path.basename(path))[0]
+
+def load_csv(
+    conn: sqlite3.Connection,
+    path: str,
+    table: Optional[str] = None,
+    delimiter: str = ",",
+    encoding: str = "utf-8",
+    infer_rows: int = INFER_ROWS,
+    **options,
+) -> LoadReport:
+    """
+    Carga un CSV con cabecera. La tabla por defecto es el nombre del fichero;
+    las celdas vacías se guardan como NULL. El resto de opciones son las de
+    ``load_rows``.
+    """
+    table = table or _table_name(path)
+    with open(path, newline="", encoding=encoding) as f:
+        reader = csv.reader(f, delimiter=delimiter)
+        try:
+            columns = [name.strip() for name in next(reader)]
+        except StopIteration:
+            raise ValueError(f"El fichero {path} está vacío") from None
+        column_types = None
+        rows: Iterable[Sequence] = reader
+        if not table_columns(conn, table):
+            sample = list(itertools.islice(reader, infer_rows))
+            column_types = [infer_type(values) for values in zip(*sample)] or ["TEXT"] * len(columns)
+            rows = itertools.chain(sample, reader)
+        return load_rows(conn, table, columns, _null_empty(rows), column_types, **options)
+
+def _arrow_type(arrow_type) -> str:
+    if pa.types.is_integer(arrow_type) or pa.types.is_boolean(arrow_type):
+        return "INTEGER"
+    if pa.types.is_floating(arrow_type) or pa.types.is_decimal(arrow_type):
+        return "REAL"
+    if pa.types.is_binary(arrow_type) or pa.types.is_large_binary(arrow_type):
+        return "BLOB"
+    return "TEXT"
+
+def _parquet_rows(parquet_file, batch_size: int) -> Iterator[Tuple]:
+    for batch in parquet_file.iter_batches(batch_size=batch_size):
+        # Fechas, horas y decimales se pasan como texto ISO / número, que sqlite3 sabe enlazar
+        columns = []
+        for column in batch.columns:
+            if pa.types.is_temporal(column.type):
+                column = column.cast(pa.string())
+            elif pa.types.is_decimal(column.type):
+                column = column.cast(pa.float64())
+            columns.append(column.to_pylist())
+        yield from zip(*columns)
+
+def load_parquet(
+    conn: sqlite3.Connection,
+    path: str,
+    table: Optional[str] = None,
+    batch_size: int = BATCH_SIZE,
+    **options,
+) -> LoadReport:
+    """Carga un fichero Parquet por lotes de filas (requiere pyarrow)."""
+    if not PARQUET_AVAILABLE:
+        raise ImportError("Para cargar ficheros Parquet instala pyarrow: pip install pyarrow")
+    parquet_file = pq.ParquetFile(path)
+    schema = parquet_file.schema_arrow
+    return load_rows(
+        conn,
+        table or _table_name(path),
+        schema.names,
+        _parquet_rows(parquet_file, batch_size),
+        [_arrow_type(field.type) for field in schema],
+        batch_size=batch_size,
+        **options,
+    )
+
+LOADERS = {".csv": load_csv, ".tsv": load_csv, ".parquet": load_parquet, ".pq": load_parquet}
+
+def load_file(conn: sqlite3.Connection, path: str, **options) -> LoadReport:
+    """Carga un fichero eligiendo el lector por su extensión."""
+    extension = os.path.splitext(path)[1].lower()
+    loader = LOADERS.get(extension)
+    if loader is None:
+        raise ValueError(f"Formato no soportado: {extension or path}")
+    if extension == ".tsv":
+        options.setdefault("delimiter", "\t")
+    return loader(conn, path, **options)
+
+def main():
+    parser = argparse.ArgumentParser(description="Carga ficheros CSV o Parquet en la base de datos de los retos.")
+    parser.add_argument("files", nargs="+", help="Ficheros a cargar; la tabla es el nombre del fichero")
+    parser.add_argument("--db", required=True, help="Base de datos SQLite de destino")
+    parser.add_argument("--table", help="Tabla de destino (solo con un fichero)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--keep-indexes", action="store_true", help="Mantener los índices durante la carga")
+    args = parser.parse_args()
+    if args.table and len(args.files) > 1:
+        parser.error("--table solo se puede usar con un único fichero")
+
+    conn = sqlite3.connect(args.db)
+    create_tables(conn)
+    reports: Dict[str, LoadReport] = {}
+    try:
+        for path in args.files:
+            report = load_file(
+                conn, path, table=args.table, batch_size=args.batch_size, defer_indexes=not args.keep_indexes,
+            )
+            reports[path] = report
+            print(report)
+    finally:
+        conn.close()
+    total = sum(r.rows for r in reports.values())
+    seconds = sum(r.seconds for r in reports.values())
+    if len(reports) > 1:
+        print(f"Total: {total:,} filas en {seconds:.2f} s ({total / seconds if seconds else 0:,.0f} filas/s)")
+
+if __name__ == "__main__":
+    main()
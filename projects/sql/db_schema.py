@@ -48,6 +48,65 @@ def create_tables(conn):
     );
     """)
 
+    # Índices para consultas por reto y por usuario ordenadas por fecha
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_user_attempts_challenge_time ON user_attempts (challenge_id, attempt_time);")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_user_attempts_user_time ON user_attempts (user_id, attempt_time);")
+
+    # Estadísticas materializadas por reto, mantenidas por triggers
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS challenge_stats (
+        challenge_id INTEGER PRIMARY KEY,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        correct_attempts INTEGER NOT NULL DEFAULT 0,
+        last_attempt_time DATETIME
+    );
+    """)
+    cursor.execute("""
+    CREATE TRIGGER IF NOT EXISTS trg_user_attempts_insert AFTER INSERT ON user_attempts
+    BEGIN
+        INSERT INTO challenge_stats (challenge_id, attempts, correct_attempts, last_attempt_time)
+        VALUES (NEW.challenge_id, 1, COALESCE(NEW.is_correct = 1, 0), NEW.attempt_time)
+        ON CONFLICT(challenge_id) DO UPDATE SET
+            attempts = attempts + 1,
+            correct_attempts = correct_attempts + excluded.correct_attempts,
+            last_attempt_time = MAX(COALESCE(last_attempt_time, excluded.last_attempt_time), excluded.last_attempt_time);
+    END;
+    """)
+    cursor.execute("""
+    CREATE TRIGGER IF NOT EXISTS trg_user_attempts_update
+    AFTER UPDATE OF is_correct, challenge_id, attempt_time ON user_attempts
+    BEGIN
+        UPDATE challenge_stats
+        SET attempts = attempts - 1, correct_attempts = correct_attempts - COALESCE(OLD.is_correct = 1, 0)
+        WHERE challenge_id = OLD.challenge_id;
+        INSERT INTO challenge_stats (challenge_id, attempts, correct_attempts, last_attempt_time)
+        VALUES (NEW.challenge_id, 1, COALESCE(NEW.is_correct = 1, 0), NEW.attempt_time)
+        ON CONFLICT(challenge_id) DO UPDATE SET
+            attempts = attempts + 1,
+            correct_attempts = correct_attempts + excluded.correct_attempts;
+        -- El intento puede haber sido el último del reto de origen o pasar a serlo en el de destino
+        UPDATE challenge_stats
+        SET last_attempt_time = (
+            SELECT MAX(attempt_time) FROM user_attempts WHERE challenge_id = challenge_stats.challenge_id
+        )
+        WHERE challenge_id IN (OLD.challenge_id, NEW.challenge_id);
+    END;
+    """)
+    cursor.execute("""
+    CREATE TRIGGER IF NOT EXISTS trg_user_attempts_delete AFTER DELETE ON user_attempts
+    BEGIN
+        UPDATE challenge_stats
+        SET attempts = attempts - 1,
+            correct_attempts = correct_attempts - COALESCE(OLD.is_correct = 1, 0),
+            last_attempt_time = (SELECT MAX(attempt_time) FROM user_attempts WHERE challenge_id = OLD.challenge_id)
+        WHERE challenge_id = OLD.challenge_id;
+    END;
+    """)
+    # Bases de datos anteriores a challenge_stats: se calcula una vez
+    if cursor.execute("SELECT 1 FROM user_attempts LIMIT 1").fetchone() and not \
+            cursor.execute("SELECT 1 FROM challenge_stats LIMIT 1").fetchone():
+        refresh_challenge_stats(conn)
+
     # Tabla de datos de ejemplo: empleados
     cursor.execute("""
     CREATE TABLE IF NOT EXISTS employees (
@@ -94,6 +153,21 @@ def create_tables(conn):
     conn.commit()
     print("Tablas creadas correctamente.")
 
+def refresh_challenge_stats(conn):
+    """
+    Recalcula challenge_stats desde user_attempts con una única agregación.
+    Útil tras cargas masivas hechas con los triggers desactivados o para
+    reparar la tabla; en uso normal los triggers la mantienen al día.
+    """
+    with conn:
+        conn.execute("DELETE FROM challenge_stats")
+        conn.execute("""
+        INSERT INTO challenge_stats (challenge_id, attempts, correct_attempts, last_attempt_time)
+        SELECT challenge_id, COUNT(*), COALESCE(SUM(is_correct = 1), 0), MAX(attempt_time)
+        FROM user_attempts
+        GROUP BY challenge_id
+        """)
+
 def insert_sample_data(conn):
     """Inserta datos de ejemplo en las tablas employees, departments y projects."""
     cursor = conn.cursor()
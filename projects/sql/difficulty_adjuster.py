@@ -1,8 +1,16 @@
+import bisect
 import random
 
+from attempt_stats import all_challenge_stats
+
 class DifficultyAdjuster:
     """
     Ajusta la dificultad de los retos SQL según los resultados de las pruebas iniciales de los jugadores.
+
+    Los retos se indexan en cubetas por dificultad para seleccionar en tiempo
+    constante (si no hay cubeta del nivel pedido, la más cercana se busca en
+    tiempo logarítmico y se recorre solo esa cubeta), y los
+    contadores de aciertos/intentos se actualizan por cada intento registrado.
     """
 
     def __init__(self, retos):
@@ -10,21 +18,85 @@ class DifficultyAdjuster:
         retos: lista de diccionarios, cada uno con información del reto, incluyendo 'id', 'dificultad', 'aciertos', 'intentos'
         """
         self.retos = retos
+        self._por_id = {r['id']: r for r in retos}
+        self._orden = {r['id']: i for i, r in enumerate(retos)}  # posición en la lista original
+        self._cubetas = {}       # dificultad -> lista de retos
+        self._posicion = {}      # id de reto -> posición en su cubeta
+        self._niveles = []       # dificultades con retos, ordenadas
+        for reto in retos:
+            self._indexar(reto)
+        # Retos con intentos nuevos desde el último ajuste
+        self._pendientes = set(self._por_id)
+
+    def _indexar(self, reto):
+        cubeta = self._cubetas.get(reto['dificultad'])
+        if cubeta is None:
+            cubeta = self._cubetas[reto['dificultad']] = []
+            bisect.insort(self._niveles, reto['dificultad'])
+        self._posicion[reto['id']] = len(cubeta)
+        cubeta.append(reto)
+
+    def _desindexar(self, reto):
+        cubeta = self._cubetas[reto['dificultad']]
+        pos = self._posicion.pop(reto['id'])
+        ultimo = cubeta.pop()
+        if ultimo is not reto:
+            cubeta[pos] = ultimo
+            self._posicion[ultimo['id']] = pos
+        if not cubeta:
+            del self._cubetas[reto['dificultad']]
+            self._niveles.pop(bisect.bisect_left(self._niveles, reto['dificultad']))
+
+    def _cambiar_dificultad(self, reto, dificultad):
+        self._desindexar(reto)
+        reto['dificultad'] = dificultad
+        self._indexar(reto)
+
+    def registrar_intento(self, reto_id, correcto: bool):
+        """
+        Actualiza los contadores de un reto tras un intento.
+        """
+        reto = self._por_id[reto_id]
+        reto['intentos'] += 1
+        if correcto:
+            reto['aciertos'] += 1
+        self._pendientes.add(reto_id)
 
     def ajustar_dificultad(self):
         """
         Ajusta la dificultad de cada reto en función de la tasa de éxito de los jugadores.
+
+        Solo se revisan los retos con intentos nuevos desde el último ajuste
+        (registrados con ``registrar_intento`` o cargados con
+        ``recalibrar_desde_bd``); la primera llamada revisa todos. Cambiar a
+        mano 'aciertos' o 'intentos' en los diccionarios no marca el reto, así
+        que un reto ya ajustado no se vuelve a evaluar hasta que tenga
+        intentos nuevos.
         """
-        for reto in self.retos:
+        for reto_id in self._pendientes:
+            reto = self._por_id[reto_id]
             tasa_exito = reto['aciertos'] / reto['intentos'] if reto['intentos'] > 0 else 0
 
             # Lógica de ajuste:
             # Si la tasa de éxito es muy alta, subir dificultad; si es muy baja, bajarla.
             if tasa_exito > 0.85 and reto['dificultad'] < 5:
-                reto['dificultad'] += 1
+                self._cambiar_dificultad(reto, reto['dificultad'] + 1)
             elif tasa_exito < 0.4 and reto['dificultad'] > 1:
-                reto['dificultad'] -= 1
+                self._cambiar_dificultad(reto, reto['dificultad'] - 1)
             # Si está en el rango medio, no cambiar dificultad
+        self._pendientes.clear()
+
+    def recalibrar_desde_bd(self, conn):
+        """
+        Carga aciertos/intentos de todos los retos desde la tabla
+        materializada challenge_stats y vuelve a ajustar la dificultad.
+        """
+        for reto_id, totales in all_challenge_stats(conn).items():
+            reto = self._por_id.get(reto_id)
+            if reto is not None:
+                reto.update(totales)
+                self._pendientes.add(reto_id)
+        self.ajustar_dificultad()
 
     def obtener_retos(self):
         return self.retos
@@ -33,8 +105,18 @@ class DifficultyAdjuster:
         """
         Selecciona un reto adecuado al nivel del jugador.
         """
-        retos_filtrados = [r for r in self.retos if r['dificultad'] == nivel_jugador]
+        retos_filtrados = self._cubetas.get(nivel_jugador)
         if retos_filtrados:
             return random.choice(retos_filtrados)
-        # Si no hay retos exactos, buscar el más cercano
-        return min(self.retos, key=lambda r: abs(r['dificultad'] - nivel_jugador))
\ No newline at end of file
+        if not self._niveles:
+            raise ValueError("No hay retos disponibles")
+        # Si no hay retos exactos, buscar la cubeta más cercana. Como antes,
+        # se devuelve el primer reto de la lista entre los más cercanos (con
+        # empate entre el nivel inferior y el superior, el que aparezca antes)
+        i = bisect.bisect_left(self._niveles, nivel_jugador)
+        candidatos = self._niveles[max(i - 1, 0):i + 1]
+        distancia = min(abs(d - nivel_jugador) for d in candidatos)
+        return min(
+            (reto for d in candidatos if abs(d - nivel_jugador) == distancia for reto in self._cubetas[d]),
+            key=lambda reto: self._orden[reto['id']],
+        )
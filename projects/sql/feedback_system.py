@@ -1,12 +1,19 @@
+from sql_fingerprint import fingerprint
+
 class FeedbackSystem:
     def __init__(self, correct_answer, hints=None, explanations=None):
         self.correct_answer = correct_answer
+        self._correct_fingerprint = fingerprint(correct_answer)
         self.hints = hints if hints else []
         self.explanations = explanations if explanations else {}
 
     def check_answer(self, user_answer):
-        """Compara la respuesta del usuario con la correcta y devuelve feedback."""
-        is_correct = user_answer.strip().lower() == self.correct_answer.strip().lower()
+        """
+        Compara la respuesta del usuario con la correcta y devuelve feedback.
+        Se comparan las huellas normalizadas, así que espacios, mayúsculas de
+        las palabras clave, comentarios y el ';' final no influyen.
+        """
+        is_correct = fingerprint(user_answer) == self._correct_fingerprint
         feedback = {
             "correct": is_correct,
             "hint": self._get_hint(is_correct),
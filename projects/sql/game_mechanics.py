@@ -31,21 +31,31 @@ class GameLevel:
 class Player:
     """
     Representa a un jugador y su progreso.
+
+    Si se indica un ``leaderboard``, cada cambio de puntos o de nivel se
+    publica en la clasificación.
     """
-    def __init__(self, username: str):
+    def __init__(self, username: str, leaderboard=None):
         self.username = username
         self.current_level = 1
         self.points = 0
         self.rewards: List[RewardType] = []
+        self.leaderboard = leaderboard
+
+    def _publish(self):
+        if self.leaderboard is not None:
+            self.leaderboard.update(self.username, self.points, self.current_level)
 
     def add_points(self, amount: int):
         self.points += amount
+        self._publish()
 
     def add_reward(self, reward: RewardType):
         self.rewards.append(reward)
 
     def level_up(self):
         self.current_level += 1
+        self._publish()
 
 class GameMechanics:
     """
@@ -0,0 +1,56 @@
+"""
+Servidor HTTP asíncrono del servicio de corrección.
+
+El bucle de eventos solo recibe las entregas y espera sus resultados; la
+ejecución de las consultas ocurre en el pool de procesos de GradingService.
+Cuando la cola está llena se responde 503 con Retry-After.
+
+Uso:
+    uvicorn grading_server:app --host 0.0.0.0 --port 8000
+    (variables de entorno GRADER_WORKERS y GRADER_MAX_QUEUE opcionales)
+"""
+
+import os
+from typing import Optional
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from grading_service import REJECTED, UNKNOWN_CHALLENGE, GradingService, challenges_from_retos
+
+app = FastAPI(title="SQL Game - Corrección")
+service: Optional[GradingService] = None
+
+class Submission(BaseModel):
+    sql: str
+    session_id: Optional[str] = None
+
+@app.on_event("startup")
+def start_service():
+    global service
+    workers = os.environ.get("GRADER_WORKERS")
+    max_queue = os.environ.get("GRADER_MAX_QUEUE")
+    service = GradingService(
+        challenges_from_retos(),
+        workers=int(workers) if workers else None,
+        max_queue=int(max_queue) if max_queue else None,
+    )
+
+@app.on_event("shutdown")
+def stop_service():
+    if service is not None:
+        service.close()
+
+@app.post("/challenge/{challenge_id}/submit")
+async def submit(challenge_id: int, submission: Submission):
+    result = await service.grade(challenge_id, submission.sql, submission.session_id)
+    if result.status == REJECTED:
+        return JSONResponse(result.to_dict(), status_code=503, headers={"Retry-After": "1"})
+    if result.status == UNKNOWN_CHALLENGE:
+        return JSONResponse(result.to_dict(), status_code=404)
+    return result.to_dict()
+
+@app.get("/stats")
+async def stats():
+    return service.stats()
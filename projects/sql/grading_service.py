@@ -0,0 +1,296 @@
+"""
+Módulo: grading_service.py
+
+Servicio de corrección concurrente para muchos jugadores a la vez.
+
+Las entregas se ejecutan en un pool de procesos. Cada entrega se corrige en
+su propia base de datos en memoria, clonada de la plantilla del reto
+(``sandbox``), en modo solo lectura y con presupuesto de tiempo,
+instrucciones y filas. El resultado se compara en streaming con la firma
+del resultado esperado (``result_signature``).
+
+Antes de encolar, cada entrega pasa el control de seguridad del lexer
+(``sql_executor.check_query``): lo que no es una consulta de lectura se
+rechaza sin ejecutarse.
+
+La cola está acotada: si hay ``max_queue`` entregas pendientes, las nuevas
+se rechazan al momento con estado ``rejected`` (control de admisión) en
+lugar de acumular latencia. Las entregas equivalentes a una ya corregida
+(misma huella) se responden desde la caché de veredictos sin tocar el pool.
+
+Se puede usar de forma síncrona (``submit``/``grade_sync``) o desde asyncio
+(``grade``); ``grading_server.py`` expone el servicio por HTTP.
+"""
+
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Dict, Hashable, List, Mapping, NamedTuple, Optional, Tuple
+
+from result_signature import ResultSignature
+from sandbox import template_for
+from sql_executor import QueryBudget, SQLExecutor, check_query
+from sql_fingerprint import VerdictCache, result_fingerprint
+
+FETCH_SIZE = 256
+
+# Estados de una entrega
+CORRECT = "correct"
+INCORRECT = "incorrect"
+ERROR = "error"
+LIMIT = "limit"
+REJECTED = "rejected"
+UNKNOWN_CHALLENGE = "unknown_challenge"
+
+# Estados deterministas: se pueden reutilizar para entregas equivalentes
+CACHEABLE = frozenset({CORRECT, INCORRECT, ERROR})
+
+FEEDBACK = {
+    CORRECT: "¡Correcto!",
+    INCORRECT: "El resultado no coincide con el esperado. Revisa tu consulta SQL.",
+    REJECTED: "El servidor está ocupado. Vuelve a enviar tu consulta en unos segundos.",
+    UNKNOWN_CHALLENGE: "El reto no existe.",
+}
+
+class ChallengeSpec(NamedTuple):
+    """Definición de un reto para el servicio (debe poder enviarse a otro proceso)."""
+    setup_sql: Tuple[str, ...]
+    solution_query: Optional[str] = None
+    expected_rows: Optional[Tuple[tuple, ...]] = None
+    ordered: bool = False
+
+@dataclass
+class GradingResult:
+    """Resultado estructurado de una entrega."""
+    challenge_id: Hashable
+    status: str
+    correct: bool
+    feedback: str
+    session_id: Optional[str] = None
+    columns: List[str] = field(default_factory=list)
+    rows_read: int = 0
+    vm_steps: int = 0
+    exec_ms: float = 0.0
+    total_ms: float = 0.0
+    cached: bool = False
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+# Estado de cada proceso del pool (se inicializa en _init_worker)
+_worker_challenges: Dict[Hashable, ChallengeSpec] = {}
+_worker_expected: Dict[Hashable, ResultSignature] = {}
+_worker_limits: Dict[str, float] = {}
+
+def _init_worker(challenges: Dict[Hashable, ChallengeSpec], limits: Dict[str, float]):
+    global _worker_challenges, _worker_expected, _worker_limits
+    _worker_challenges = challenges
+    _worker_expected = {}
+    _worker_limits = limits
+
+def _expected(challenge_id: Hashable, spec: ChallengeSpec) -> ResultSignature:
+    """Firma del resultado esperado, calculada una vez por proceso."""
+    signature = _worker_expected.get(challenge_id)
+    if signature is None:
+        if spec.expected_rows is not None:
+            rows = spec.expected_rows
+        else:
+            conn = template_for(spec.setup_sql).clone()
+            try:
+                rows = conn.execute(spec.solution_query).fetchall()
+            finally:
+                conn.close()
+        signature = _worker_expected[challenge_id] = ResultSignature.from_rows(rows, ordered=spec.ordered)
+    return signature
+
+def _grade_submission(challenge_id: Hashable, query: str) -> dict:
+    """Corrige una entrega en una copia privada de la base de datos del reto."""
+    started = time.perf_counter()
+    spec = _worker_challenges.get(challenge_id)
+    if spec is None:
+        return {"status": UNKNOWN_CHALLENGE}
+    matcher = _expected(challenge_id, spec).matcher()
+    conn = template_for(spec.setup_sql).clone()
+    conn.execute("PRAGMA query_only = ON")
+    budget = QueryBudget(_worker_limits["time_limit"], _worker_limits["max_instructions"])
+    conn.set_progress_handler(budget, budget.check_every)
+    columns: List[str] = []
+    rows_read = 0
+    try:
+        cursor = conn.execute(query)
+        columns = [desc[0] for desc in cursor.description] if cursor.description else []
+        matches = True
+        while matches:
+            batch = cursor.fetchmany(FETCH_SIZE)
+            if not batch:
+                break
+            for row in batch:
+                rows_read += 1
+                if rows_read > _worker_limits["max_rows"] or not matcher.feed(row):
+                    matches = False
+                    break
+        status = CORRECT if matches and matcher.finish() else INCORRECT
+        feedback = FEEDBACK[status]
+    except (sqlite3.Error, sqlite3.Warning, ValueError) as e:
+        if budget.exceeded:
+            status = LIMIT
+            feedback = SQLExecutor.LIMIT_MESSAGES[budget.exceeded].format(**_worker_limits)
+        else:
+            status = ERROR
+            feedback = f"Error al ejecutar la consulta: {e}"
+    finally:
+        conn.close()
+    return {
+        "status": status,
+        "feedback": feedback,
+        "columns": columns,
+        "rows_read": rows_read,
+        "vm_steps": budget.steps,
+        "exec_ms": (time.perf_counter() - started) * 1000,
+    }
+
+def challenges_from_retos() -> Dict[int, ChallengeSpec]:
+    """Retos de ``retos.obtener_retos_iniciales`` como especificaciones del servicio."""
+    from retos import obtener_retos_iniciales
+    return {
+        reto.nivel: ChallengeSpec(
+            setup_sql=tuple(reto.datos_iniciales),
+            expected_rows=tuple(tuple(fila.values()) for fila in reto.solucion_esperada),
+            ordered=False,
+        )
+        for reto in obtener_retos_iniciales()
+    }
+
+class GradingService:
+    """
+    Servicio de corrección con pool de trabajadores y cola acotada.
+
+    Args:
+        challenges: Especificación de cada reto por id
+        workers: Procesos (o hilos) del pool; por defecto os.cpu_count()
+        max_queue: Entregas pendientes (en cola o en ejecución) antes de rechazar
+        use_processes: Pool de procesos (por defecto) o de hilos
+    """
+
+    def __init__(
+        self,
+        challenges: Mapping[Hashable, ChallengeSpec],
+        workers: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        time_limit: float = 2.0,
+        max_instructions: int = 50_000_000,
+        max_rows: int = 10_000,
+        cache_size: int = 1024,
+        use_processes: bool = True,
+    ):
+        self.challenges = dict(challenges)
+        self.workers = workers or os.cpu_count() or 1
+        self.max_queue = max_queue or 8 * self.workers
+        self.limits = {"time_limit": time_limit, "max_instructions": max_instructions, "max_rows": max_rows}
+        executor = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+        self._pool = executor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(self.challenges, self.limits),
+        )
+        self.verdicts = VerdictCache(cache_size, key=result_fingerprint) if cache_size else None
+        self._pending = 0
+        self._lock = threading.Lock()
+        self.metrics = {"submitted": 0, "graded": 0, "cached": 0, "rejected": 0, "refused": 0}
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def _count(self, key: str):
+        with self._lock:
+            self.metrics[key] += 1
+
+    def _admit(self) -> bool:
+        with self._lock:
+            if self._pending >= self.max_queue:
+                return False
+            self._pending += 1
+            return True
+
+    def _release(self):
+        with self._lock:
+            self._pending -= 1
+
+    def submit(self, challenge_id: Hashable, query: str, session_id: Optional[str] = None) -> "Future[GradingResult]":
+        """Encola una entrega y devuelve un Future con su GradingResult."""
+        started = time.perf_counter()
+        self._count("submitted")
+        future: "Future[GradingResult]" = Future()
+
+        def finish(status: str, feedback: Optional[str] = None, cached: bool = False, **details):
+            future.set_result(GradingResult(
+                challenge_id=challenge_id,
+                status=status,
+                correct=status == CORRECT,
+                feedback=feedback or FEEDBACK[status],
+                session_id=session_id,
+                total_ms=(time.perf_counter() - started) * 1000,
+                cached=cached,
+                **details,
+            ))
+
+        if challenge_id not in self.challenges:
+            finish(UNKNOWN_CHALLENGE)
+            return future
+        # Las consultas que no son de lectura se rechazan sin llegar al pool;
+        # el análisis del lexer se reutiliza después para la huella de la caché
+        reason = check_query(query)
+        if reason is not None:
+            self._count("refused")
+            finish(ERROR, f"Consulta no permitida: {reason}")
+            return future
+        if self.verdicts is not None:
+            verdict = self.verdicts.get(query, challenge_id)
+            if verdict is not None:
+                self._count("cached")
+                finish(cached=True, **verdict)
+                return future
+        if not self._admit():
+            self._count("rejected")
+            finish(REJECTED)
+            return future
+
+        def done(work: Future):
+            self._release()
+            try:
+                outcome = work.result()
+            except Exception as e:  # el proceso del pool terminó de forma inesperada
+                finish(ERROR, f"Error interno al corregir la consulta: {e}")
+                return
+            self._count("graded")
+            if self.verdicts is not None and outcome["status"] in CACHEABLE:
+                self.verdicts.put(query, outcome, challenge_id)
+            finish(**outcome)
+
+        try:
+            self._pool.submit(_grade_submission, challenge_id, query).add_done_callback(done)
+        except RuntimeError as e:  # pool cerrado
+            self._release()
+            finish(ERROR, f"Error interno al corregir la consulta: {e}")
+        return future
+
+    def grade_sync(self, challenge_id: Hashable, query: str, session_id: Optional[str] = None) -> GradingResult:
+        return self.submit(challenge_id, query, session_id).result()
+
+    async def grade(self, challenge_id: Hashable, query: str, session_id: Optional[str] = None) -> GradingResult:
+        """Versión asyncio de ``submit``: no bloquea el bucle de eventos."""
+        return await asyncio.wrap_future(self.submit(challenge_id, query, session_id))
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self.metrics)
+            stats.update(pending=self._pending, max_queue=self.max_queue, workers=self.workers)
+        return stats
+
+    def close(self):
+        self._pool.shutdown(wait=True, cancel_futures=True)
@@ -1,6 +1,8 @@
 import sqlite3
 import random
 
+from sandbox import DatabaseTemplate
+
 # Función para crear una conexión a la base de datos
 def crear_conexion(db_name):
     """Crea una conexión a una base de datos SQLite."""
@@ -33,6 +35,17 @@ def insertar_datos(conn):
     cursor.execute("INSERT INTO empleados (nombre, edad) VALUES ('Pedro', 40)")
     conn.commit()
 
+def _poblar_plantilla(conn):
+    crear_tabla(conn)
+    insertar_datos(conn)
+
+# Plantilla con la tabla y los datos del juego, construida una sola vez
+PLANTILLA = DatabaseTemplate(builder=_poblar_plantilla)
+
+def crear_sesion():
+    """Devuelve una base de datos en memoria privada para una partida."""
+    return PLANTILLA.clone()
+
 # Función para generar preguntas SQL
 def generar_pregunta(conn):
     """Genera una pregunta SQL aleatoria."""
@@ -61,15 +74,8 @@ def evaluar_respuesta(conn, pregunta, respuesta_usuario):
 
 # Función principal del juego
 def jugar_juego():
-    db_name = "juego_sql.db"
-    conn = crear_conexion(db_name)
-    
-    if conn is None:
-        print("No se pudo conectar a la base de datos.")
-        return
-    
-    crear_tabla(conn)
-    insertar_datos(conn)
+    # Cada partida juega sobre su propia copia de los datos
+    conn = crear_sesion()
     
     while True:
         pregunta, texto_pregunta = generar_pregunta(conn)
@@ -0,0 +1,270 @@
+"""
+Módulo: leaderboard.py
+
+Clasificación de jugadores con consultas de posición, top-k y "jugadores a
+mi alrededor" en tiempo logarítmico. Internamente usa una skip list
+indexable (cada enlace guarda cuántos elementos salta) y persiste las
+puntuaciones en SQLite con escrituras por lotes.
+"""
+
+import random
+import sqlite3
+import threading
+from typing import Iterable, List, Optional, Tuple
+
+class _Node:
+    __slots__ = ("key", "next", "width")
+
+    def __init__(self, key, level):
+        self.key = key
+        self.next = [None] * level
+        self.width = [0] * level
+
+class RankedSkipList:
+    """
+    Skip list indexable: inserción, borrado, posición de una clave y acceso por
+    posición en O(log n) esperado.
+    """
+
+    def __init__(self, max_level: int = 20, p: float = 0.25, seed: Optional[int] = None):
+        self.max_level = max_level
+        self.p = p
+        self._random = random.Random(seed)
+        self._nil = _Node(None, 0)
+        self.head = _Node(None, max_level)
+        self.head.next = [self._nil] * max_level
+        self.head.width = [1] * max_level
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def _random_level(self) -> int:
+        level = 1
+        while level < self.max_level and self._random.random() < self.p:
+            level += 1
+        return level
+
+    def insert(self, key):
+        """Inserta una clave (no se comprueban duplicados)."""
+        nil = self._nil
+        update = [None] * self.max_level
+        steps_at_level = [0] * self.max_level
+        node = self.head
+        for level in reversed(range(self.max_level)):
+            while node.next[level] is not nil and node.next[level].key < key:
+                steps_at_level[level] += node.width[level]
+                node = node.next[level]
+            update[level] = node
+
+        new_level = self._random_level()
+        new = _Node(key, new_level)
+        steps = 0
+        for level in range(new_level):
+            prev = update[level]
+            new.next[level] = prev.next[level]
+            prev.next[level] = new
+            new.width[level] = prev.width[level] - steps
+            prev.width[level] = steps + 1
+            steps += steps_at_level[level]
+        for level in range(new_level, self.max_level):
+            update[level].width[level] += 1
+        self.size += 1
+
+    def remove(self, key):
+        """Elimina una clave; lanza KeyError si no existe."""
+        nil = self._nil
+        chain = [None] * self.max_level
+        node = self.head
+        for level in reversed(range(self.max_level)):
+            while node.next[level] is not nil and node.next[level].key < key:
+                node = node.next[level]
+            chain[level] = node
+        target = chain[0].next[0]
+        if target is nil or target.key != key:
+            raise KeyError(key)
+        for level in range(len(target.next)):
+            prev = chain[level]
+            prev.width[level] += target.width[level] - 1
+            prev.next[level] = target.next[level]
+        for level in range(len(target.next), self.max_level):
+            chain[level].width[level] -= 1
+        self.size -= 1
+
+    def rank(self, key) -> int:
+        """Posición (desde 0) de una clave; lanza KeyError si no existe."""
+        nil = self._nil
+        node = self.head
+        position = 0
+        for level in reversed(range(self.max_level)):
+            while node.next[level] is not nil and node.next[level].key < key:
+                position += node.width[level]
+                node = node.next[level]
+        target = node.next[0]
+        if target is nil or target.key != key:
+            raise KeyError(key)
+        return position
+
+    def _node_at(self, index: int) -> _Node:
+        if not 0 <= index < self.size:
+            raise IndexError(index)
+        node = self.head
+        remaining = index + 1
+        for level in reversed(range(self.max_level)):
+            while node.width[level] <= remaining:
+                remaining -= node.width[level]
+                node = node.next[level]
+        return node
+
+    def __getitem__(self, index: int):
+        return self._node_at(index).key
+
+    def slice(self, start: int, stop: int) -> list:
+        """Claves en las posiciones [start, stop): O(log n + k)."""
+        start, stop = max(start, 0), min(stop, self.size)
+        if start >= stop:
+            return []
+        node = self._node_at(start)
+        keys = []
+        for _ in range(stop - start):
+            keys.append(node.key)
+            node = node.next[0]
+        return keys
+
+    @classmethod
+    def from_sorted(cls, keys: Iterable, **kwargs) -> "RankedSkipList":
+        """Construye la lista en O(n) a partir de claves ya ordenadas."""
+        skiplist = cls(**kwargs)
+        last = [skiplist.head] * skiplist.max_level
+        last_pos = [0] * skiplist.max_level
+        position = 0
+        for key in keys:
+            position += 1
+            node = _Node(key, skiplist._random_level())
+            for level in range(len(node.next)):
+                last[level].next[level] = node
+                last[level].width[level] = position - last_pos[level]
+                last[level] = node
+                last_pos[level] = position
+        for level in range(skiplist.max_level):
+            last[level].next[level] = skiplist._nil
+            last[level].width[level] = position + 1 - last_pos[level]
+        skiplist.size = position
+        return skiplist
+
+class Leaderboard:
+    """
+    Clasificación persistente de jugadores.
+
+    Orden: más puntos primero; a igualdad de puntos, por nombre de usuario.
+    Las posiciones devueltas empiezan en 1.
+    """
+
+    def __init__(self, db_path: str = "leaderboard.db", batch_size: int = 1000):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+        CREATE TABLE IF NOT EXISTS leaderboard (
+            username TEXT PRIMARY KEY,
+            points INTEGER NOT NULL,
+            level INTEGER NOT NULL DEFAULT 1
+        )
+        """)
+        self._conn.commit()
+        self._dirty = set()
+        self._load()
+
+    @staticmethod
+    def _key(username: str, points: int) -> Tuple[int, str]:
+        return (-points, username)
+
+    def _load(self):
+        rows = self._conn.execute(
+            "SELECT username, points, level FROM leaderboard ORDER BY points DESC, username"
+        ).fetchall()
+        self._players = {username: (points, level) for username, points, level in rows}
+        self._ranking = RankedSkipList.from_sorted(self._key(u, p) for u, p, _ in rows)
+
+    def __len__(self):
+        return len(self._ranking)
+
+    def bulk_load(self, players: Iterable[Tuple[str, int, int]]):
+        """Sustituye la clasificación por (usuario, puntos, nivel) en una sola transacción."""
+        with self._lock:
+            rows = list(players)
+            with self._conn:
+                self._conn.execute("DELETE FROM leaderboard")
+                self._conn.executemany(
+                    "INSERT INTO leaderboard (username, points, level) VALUES (?, ?, ?)", rows
+                )
+            self._dirty.clear()
+            rows.sort(key=lambda r: self._key(r[0], r[1]))
+            self._players = {username: (points, level) for username, points, level in rows}
+            self._ranking = RankedSkipList.from_sorted(self._key(u, p) for u, p, _ in rows)
+
+    def update(self, username: str, points: int, level: Optional[int] = None):
+        """Registra la puntuación actual de un jugador."""
+        with self._lock:
+            previous = self._players.get(username)
+            if previous is not None:
+                if level is None:
+                    level = previous[1]
+                if previous[0] != points:
+                    self._ranking.remove(self._key(username, previous[0]))
+                    self._ranking.insert(self._key(username, points))
+            else:
+                self._ranking.insert(self._key(username, points))
+            self._players[username] = (points, level if level is not None else 1)
+            self._dirty.add(username)
+            if len(self._dirty) >= self.batch_size:
+                self.flush()
+
+    def rank(self, username: str) -> Optional[int]:
+        """Posición del jugador (desde 1) o None si no está clasificado."""
+        with self._lock:
+            entry = self._players.get(username)
+            if entry is None:
+                return None
+            return self._ranking.rank(self._key(username, entry[0])) + 1
+
+    def _entries(self, start: int, stop: int) -> List[dict]:
+        return [
+            {"rank": start + i + 1, "username": username, "points": -neg_points,
+             "level": self._players[username][1]}
+            for i, (neg_points, username) in enumerate(self._ranking.slice(start, stop))
+        ]
+
+    def top(self, k: int = 10) -> List[dict]:
+        """Los k primeros jugadores."""
+        with self._lock:
+            return self._entries(0, k)
+
+    def around(self, username: str, window: int = 5) -> List[dict]:
+        """El jugador y hasta ``window`` jugadores por encima y por debajo."""
+        with self._lock:
+            rank = self.rank(username)
+            if rank is None:
+                return []
+            return self._entries(rank - 1 - window, rank + window)
+
+    def flush(self):
+        """Guarda en SQLite las puntuaciones modificadas."""
+        with self._lock:
+            if not self._dirty:
+                return
+            with self._conn:
+                self._conn.executemany(
+                    """
+                    INSERT INTO leaderboard (username, points, level) VALUES (?, ?, ?)
+                    ON CONFLICT(username) DO UPDATE SET points = excluded.points, level = excluded.level
+                    """,
+                    [(u, *self._players[u]) for u in self._dirty],
+                )
+            self._dirty.clear()
+
+    def close(self):
+        self.flush()
+        self._conn.close()
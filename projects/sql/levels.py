@@ -1,145 +1,163 @@
-from dataclasses import dataclass, field
-from typing import List, Dict, Optional
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List, Dict, Optional, Tuple
 
-@dataclass
+from query_cost import grade_query_cost
+
+@dataclass(frozen=True)
 class SQLChallenge:
     id: int
     title: str
     description: str
-    objectives: List[str]
-    required_sql: List[str]
+    objectives: Tuple[str, ...]
+    required_sql: Tuple[str, ...]
     example_query: Optional[str] = None
-    hints: List[str] = field(default_factory=list)
+    hints: Tuple[str, ...] = ()
+    efficiency_points: int = 5
+
+    def score_efficiency(self, conn, user_query: str) -> dict:
+        """
+        Puntúa el coste de una consulta correcta frente a ``example_query``
+        (plan de ejecución e instrucciones de la VM de SQLite).
+        """
+        if not self.example_query:
+            raise ValueError(f"El reto {self.id} no tiene consulta de referencia")
+        return grade_query_cost(conn, user_query, self.example_query, self.efficiency_points)
 
-@dataclass
+@dataclass(frozen=True)
 class SQLLevel:
     level: int
     name: str
-    challenges: List[SQLChallenge]
+    challenges: Tuple[SQLChallenge, ...]
 
 def get_sql_levels() -> List[SQLLevel]:
     """
     Devuelve la estructura progresiva de niveles y retos para el juego de aprendizaje de SQL.
+    Los niveles son inmutables y se construyen una sola vez por proceso.
     """
-    return [
+    return list(_build_levels())
+
+@lru_cache(maxsize=1)
+def _build_levels():
+    return (
         SQLLevel(
             level=1,
             name="Consultas Básicas",
-            challenges=[
+            challenges=(
                 SQLChallenge(
                     id=1,
                     title="Primer SELECT",
                     description="Realiza una consulta SELECT para mostrar todos los datos de la tabla 'usuarios'.",
-                    objectives=["Aprender la sintaxis básica de SELECT", "Obtener todas las columnas"],
-                    required_sql=["SELECT"],
+                    objectives=("Aprender la sintaxis básica de SELECT", "Obtener todas las columnas"),
+                    required_sql=("SELECT",),
                     example_query="SELECT * FROM usuarios;",
-                    hints=["Recuerda usar * para seleccionar todas las columnas."]
+                    hints=("Recuerda usar * para seleccionar todas las columnas.",)
                 ),
                 SQLChallenge(
                     id=2,
                     title="Filtrar con WHERE",
                     description="Selecciona los usuarios cuyo país sea 'España'.",
-                    objectives=["Filtrar filas con WHERE"],
-                    required_sql=["SELECT", "WHERE"],
+                    objectives=("Filtrar filas con WHERE",),
+                    required_sql=("SELECT", "WHERE"),
                     example_query="SELECT * FROM usuarios WHERE pais = 'España';",
-                    hints=["WHERE sirve para filtrar filas según una condición."]
+                    hints=("WHERE sirve para filtrar filas según una condición.",)
                 ),
-            ]
+            )
         ),
         SQLLevel(
             level=2,
             name="Consultas Intermedias",
-            challenges=[
+            challenges=(
                 SQLChallenge(
                     id=3,
                     title="Ordenar resultados",
                     description="Muestra todos los productos ordenados por precio de mayor a menor.",
-                    objectives=["Ordenar resultados con ORDER BY"],
-                    required_sql=["ORDER BY", "DESC"],
+                    objectives=("Ordenar resultados con ORDER BY",),
+                    required_sql=("ORDER BY", "DESC"),
                     example_query="SELECT * FROM productos ORDER BY precio DESC;",
-                    hints=["ORDER BY permite ordenar los resultados.", "DESC es para descendente."]
+                    hints=("ORDER BY permite ordenar los resultados.", "DESC es para descendente.")
                 ),
                 SQLChallenge(
                     id=4,
                     title="Limitar resultados",
                     description="Muestra los 5 usuarios más recientes.",
-                    objectives=["Limitar resultados con LIMIT"],
-                    required_sql=["LIMIT", "ORDER BY"],
+                    objectives=("Limitar resultados con LIMIT",),
+                    required_sql=("LIMIT", "ORDER BY"),
                     example_query="SELECT * FROM usuarios ORDER BY fecha_registro DESC LIMIT 5;",
-                    hints=["LIMIT restringe la cantidad de filas devueltas."]
+                    hints=("LIMIT restringe la cantidad de filas devueltas.",)
                 ),
-            ]
+            )
         ),
         SQLLevel(
             level=3,
             name="Agregaciones y Agrupaciones",
-            challenges=[
+            challenges=(
                 SQLChallenge(
                     id=5,
                     title="Contar filas",
                     description="Cuenta cuántos usuarios hay en la tabla.",
-                    objectives=["Usar funciones de agregación (COUNT)"],
-                    required_sql=["COUNT"],
+                    objectives=("Usar funciones de agregación (COUNT)",),
+                    required_sql=("COUNT",),
                     example_query="SELECT COUNT(*) FROM usuarios;",
-                    hints=["COUNT(*) cuenta todas las filas."]
+                    hints=("COUNT(*) cuenta todas las filas.",)
                 ),
                 SQLChallenge(
                     id=6,
                     title="Agrupar por columna",
                     description="Muestra cuántos usuarios hay por país.",
-                    objectives=["Agrupar resultados con GROUP BY"],
-                    required_sql=["GROUP BY", "COUNT"],
+                    objectives=("Agrupar resultados con GROUP BY",),
+                    required_sql=("GROUP BY", "COUNT"),
                     example_query="SELECT pais, COUNT(*) FROM usuarios GROUP BY pais;",
-                    hints=["GROUP BY agrupa los resultados por el valor de una columna."]
+                    hints=("GROUP BY agrupa los resultados por el valor de una columna.",)
                 ),
-            ]
+            )
         ),
         SQLLevel(
             level=4,
             name="Consultas Avanzadas: JOIN",
-            challenges=[
+            challenges=(
                 SQLChallenge(
                     id=7,
                     title="JOIN básico",
                     description="Muestra el nombre del usuario y el nombre de su país usando JOIN entre 'usuarios' y 'paises'.",
-                    objectives=["Unir tablas con INNER JOIN"],
-                    required_sql=["JOIN", "ON"],
+                    objectives=("Unir tablas con INNER JOIN",),
+                    required_sql=("JOIN", "ON"),
                     example_query="SELECT usuarios.nombre, paises.nombre FROM usuarios JOIN paises ON usuarios.pais_id = paises.id;",
-                    hints=["JOIN permite combinar filas de dos tablas."]
+                    hints=("JOIN permite combinar filas de dos tablas.",)
                 ),
                 SQLChallenge(
                     id=8,
                     title="LEFT JOIN",
                     description="Muestra todos los usuarios y, si existe, el nombre de su país.",
-                    objectives=["Entender LEFT JOIN"],
-                    required_sql=["LEFT JOIN"],
+                    objectives=("Entender LEFT JOIN",),
+                    required_sql=("LEFT JOIN",),
                     example_query="SELECT usuarios.nombre, paises.nombre FROM usuarios LEFT JOIN paises ON usuarios.pais_id = paises.id;",
-                    hints=["LEFT JOIN devuelve todas las filas de la tabla izquierda."]
+                    hints=("LEFT JOIN devuelve todas las filas de la tabla izquierda.",)
                 ),
-            ]
+            )
         ),
         SQLLevel(
             level=5,
             name="Consultas Avanzadas: Subconsultas y Funciones",
-            challenges=[
+            challenges=(
                 SQLChallenge(
                     id=9,
                     title="Subconsulta en WHERE",
                     description="Muestra los productos cuyo precio es mayor que el precio medio.",
-                    objectives=["Usar subconsultas en WHERE"],
-                    required_sql=["SELECT", "WHERE", "AVG"],
+                    objectives=("Usar subconsultas en WHERE",),
+                    required_sql=("SELECT", "WHERE", "AVG"),
                     example_query="SELECT * FROM productos WHERE precio > (SELECT AVG(precio) FROM productos);",
-                    hints=["Puedes usar una consulta SELECT dentro de WHERE."]
+                    hints=("Puedes usar una consulta SELECT dentro de WHERE.",)
                 ),
                 SQLChallenge(
                     id=10,
                     title="Funciones de cadena",
                     description="Muestra los nombres de usuario en mayúsculas.",
-                    objectives=["Aplicar funciones de cadena como UPPER"],
-                    required_sql=["UPPER"],
+                    objectives=("Aplicar funciones de cadena como UPPER",),
+                    required_sql=("UPPER",),
                     example_query="SELECT UPPER(nombre) FROM usuarios;",
-                    hints=["UPPER convierte texto a mayúsculas."]
+                    hints=("UPPER convierte texto a mayúsculas.",)
                 ),
-            ]
+            )
         ),
-    ]
\ No newline at end of file
+    )
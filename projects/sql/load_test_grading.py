@@ -0,0 +1,96 @@
+"""
+Prueba de carga del servicio de corrección.
+
+Simula ``--players`` jugadores que envían ``--submissions`` consultas cada
+uno, todos a la vez, y muestra entregas por segundo y latencias p50/p99.
+Por defecto usa el servicio en el mismo proceso; con ``--url`` envía las
+entregas por HTTP a un grading_server en marcha.
+
+Uso:
+    python load_test_grading.py --players 200 --submissions 20 --workers 4
+    python load_test_grading.py --url http://localhost:8000 --players 100
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+
+from grading_service import GradingService, challenges_from_retos
+
+# Consultas del reto 2 (canciones con más de 160 reproducciones); el umbral
+# variable hace que las huellas sean distintas y no se sirvan desde la caché
+QUERIES = [
+    "SELECT titulo, reproducciones FROM Canciones WHERE reproducciones > {n}",
+    "SELECT * FROM Canciones WHERE reproducciones > {n} ORDER BY titulo",
+    "SELECT titulo FROM Canciones WHERE reproducciones > {n}",
+    "SELECT titulo, reproducciones FROM Canciones c1 WHERE reproducciones > (SELECT {n})",
+]
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+def make_query(rng, distinct):
+    n = rng.randint(100, 170) if distinct else 160
+    return rng.choice(QUERIES).format(n=n)
+
+def post(url, challenge_id, query, session_id):
+    body = json.dumps({"sql": query, "session_id": session_id}).encode()
+    request = urllib.request.Request(
+        f"{url}/challenge/{challenge_id}/submit", data=body, headers={"Content-Type": "application/json"}
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=30) as response:
+            return json.load(response)["status"]
+    except urllib.error.HTTPError as e:
+        return json.load(e)["status"]
+
+async def player(index, args, service, latencies, statuses):
+    rng = random.Random(args.seed + index)
+    session_id = f"jugador{index}"
+    for _ in range(args.submissions):
+        query = make_query(rng, not args.repeat)
+        started = time.perf_counter()
+        if service is not None:
+            status = (await service.grade(2, query, session_id)).status
+        else:
+            status = await asyncio.to_thread(post, args.url, 2, query, session_id)
+        latencies.append((time.perf_counter() - started) * 1000)
+        statuses[status] += 1
+
+async def run(args):
+    service = None
+    if not args.url:
+        service = GradingService(challenges_from_retos(), workers=args.workers, max_queue=args.max_queue)
+        # Calentamiento: arranca los procesos y construye las plantillas
+        await asyncio.gather(*(service.grade(2, f"SELECT {i}") for i in range(service.workers)))
+    latencies, statuses = [], Counter()
+    started = time.perf_counter()
+    await asyncio.gather(*(player(i, args, service, latencies, statuses) for i in range(args.players)))
+    elapsed = time.perf_counter() - started
+    if service is not None:
+        service.close()
+    total = len(latencies)
+    print(f"Entregas: {total} en {elapsed:.2f} s -> {total / elapsed:.0f} entregas/s")
+    print(f"Latencia p50: {percentile(latencies, 0.50):.1f} ms  p99: {percentile(latencies, 0.99):.1f} ms")
+    print("Estados: " + ", ".join(f"{k}={v}" for k, v in sorted(statuses.items())))
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga del servicio de corrección")
+    parser.add_argument("--url", help="URL de un grading_server (por defecto, servicio en proceso)")
+    parser.add_argument("--players", type=int, default=100)
+    parser.add_argument("--submissions", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--max-queue", type=int, default=None)
+    parser.add_argument("--repeat", action="store_true", help="Enviar siempre la misma consulta (mide la caché)")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
@@ -7,29 +7,74 @@ Incluye la estructura de retos, niveles y validación de consultas SQL.
 
 from typing import List, Dict, Any, Optional
 
+from result_signature import ResultSignature, row_hash
+from sandbox import template_for
+from sql_fingerprint import VerdictCache
+
 class SQLChallenge:
     """
     Representa un reto individual que el jugador debe resolver escribiendo una consulta SQL.
     """
-    def __init__(self, description: str, solution_query: str, test_cases: List[Dict[str, Any]], hint: Optional[str] = None):
+    # Filas leídas del cursor en cada bloque al comprobar una solución
+    FETCH_SIZE = 256
+
+    def __init__(self, description: str, solution_query: str, test_cases: List[Dict[str, Any]], hint: Optional[str] = None,
+                 setup_sql: Optional[List[str]] = None):
         self.description = description
         self.solution_query = solution_query
-        self.test_cases = test_cases  # Cada test_case tiene 'input' y 'expected_output'
+        self.test_cases = test_cases  # Cada test_case tiene 'input', 'expected_output' y opcionalmente 'ordered'
+        # Firmas de los resultados esperados, compiladas una sola vez
+        self.signatures = [
+            ResultSignature.from_rows(case['expected_output'], ordered=case.get('ordered', True))
+            for case in test_cases
+        ]
         self.hint = hint
+        self.setup_sql = setup_sql or []  # Scripts que crean los datos del reto
+        # Veredictos por huella de consulta (solo para sesiones propias del reto)
+        self.verdicts = VerdictCache()
+
+    def new_session(self):
+        """
+        Devuelve una conexión en memoria, privada para el jugador, clonada de la
+        plantilla del reto (los scripts de setup_sql se ejecutan una sola vez).
+        """
+        return template_for(self.setup_sql).clone()
 
-    def check_solution(self, user_query: str, db_connection) -> bool:
+    def check_solution(self, user_query: str, db_connection=None) -> bool:
         """
         Ejecuta la consulta del usuario y compara con los resultados esperados.
+        Si no se indica conexión, se usa una sesión aislada del reto y el
+        veredicto se guarda por huella, de modo que los reenvíos equivalentes
+        no vuelven a ejecutarse.
         """
+        if db_connection is None:
+            return self.verdicts.get_or_grade(user_query, self._check_in_new_session)
+        return self._check(user_query, db_connection)
+
+    def _check_in_new_session(self, user_query: str) -> bool:
+        db_connection = self.new_session()
+        try:
+            return self._check(user_query, db_connection)
+        finally:
+            db_connection.close()
+
+    def _check(self, user_query: str, db_connection) -> bool:
         try:
             cursor = db_connection.cursor()
             cursor.execute(user_query)
-            user_result = cursor.fetchall()
-            # Compara con todos los casos de prueba
-            for case in self.test_cases:
-                if user_result != case['expected_output']:
-                    return False
-            return True
+            # Las filas se comparan en streaming contra las firmas de todos los
+            # casos de prueba; se para en la primera discrepancia
+            matchers = [signature.matcher() for signature in self.signatures]
+            while True:
+                batch = cursor.fetchmany(self.FETCH_SIZE)
+                if not batch:
+                    break
+                for row in batch:
+                    h = row_hash(row)
+                    for matcher in matchers:
+                        if not matcher.feed(row, h):
+                            return False
+            return all(matcher.finish() for matcher in matchers)
         except Exception as e:
             print(f"Error al ejecutar la consulta: {e}")
             return False
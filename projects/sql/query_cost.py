@@ -0,0 +1,182 @@
+"""
+Módulo: query_cost.py
+
+Evaluación del coste de las consultas de los jugadores.
+
+Para cada consulta se obtiene el plan con ``EXPLAIN QUERY PLAN`` y se cuentan
+las instrucciones de la VM de SQLite que ejecuta (con el progress handler).
+Ambos se comparan con la solución de referencia del reto para otorgar
+puntos de eficiencia y señalar recorridos completos de tablas, B-trees
+temporales y subconsultas correlacionadas que la referencia no necesita.
+
+Las consultas pasan antes el control de seguridad de
+``sql_executor.check_query`` y se ejecutan sobre la conexión recibida con
+``PRAGMA query_only`` activado mientras dura la medición (sin copiar la
+base de datos, que en los niveles con muchos datos sería lo más caro).
+"""
+
+import re
+import sqlite3
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Set
+
+from sql_executor import QueryBudget, check_query
+
+# Granularidad del contador de instrucciones
+CHECK_EVERY = 100
+
+FULL_SCAN = "full_scan"
+TEMP_BTREE = "temp_btree"
+CORRELATED_SUBQUERY = "correlated_subquery"
+AUTOMATIC_INDEX = "automatic_index"
+
+FLAG_MESSAGES = {
+    FULL_SCAN: "Recorre la tabla completa '{detail}'; un filtro sobre una columna indexada evitaría leer todas las filas.",
+    TEMP_BTREE: "Necesita un B-tree temporal para {detail}; ordenar o agrupar por una columna indexada lo evita.",
+    CORRELATED_SUBQUERY: "Usa una subconsulta correlacionada, que se ejecuta una vez por fila; prueba con un JOIN o una subconsulta independiente.",
+    AUTOMATIC_INDEX: "SQLite tiene que crear un índice temporal sobre '{detail}' para resolver la consulta.",
+}
+
+# Proporción de instrucciones respecto a la referencia -> fracción de los puntos
+EFFICIENCY_TIERS = [(1.25, 1.0), (2.0, 0.6), (5.0, 0.3)]
+
+_SCAN_RE = re.compile(r"^SCAN (?:TABLE )?(\S+)(.*)$")
+# SELECT sin FROM o VALUES: no recorre ninguna tabla
+_CONSTANT_ROWS_RE = re.compile(r"^SCAN (?:\d+ )?CONSTANT ROWS?$")
+_TEMP_BTREE_RE = re.compile(r"USE TEMP B-TREE FOR (.+)$")
+_AUTO_INDEX_RE = re.compile(r"AUTOMATIC (?:COVERING |PARTIAL )*INDEX ON (\S+)")
+
+@dataclass
+class QueryProfile:
+    """Plan y coste medido de una consulta."""
+    plan: List[str]
+    vm_steps: int
+    rows: int
+    flags: Dict[str, List[str]] = field(default_factory=dict)
+
+    @property
+    def flag_names(self) -> Set[str]:
+        return set(self.flags)
+
+def analyze_plan(plan: List[str]) -> Dict[str, List[str]]:
+    """Devuelve las señales de coste encontradas en las líneas del plan."""
+    flags: Dict[str, List[str]] = {}
+    for detail in plan:
+        scan = None if _CONSTANT_ROWS_RE.match(detail) else _SCAN_RE.match(detail)
+        if scan and "INDEX" not in scan.group(2) and "VIRTUAL TABLE" not in scan.group(2):
+            # SCAN de una subconsulta o CTE materializada no es un recorrido de tabla
+            if not scan.group(1).startswith("("):
+                flags.setdefault(FULL_SCAN, []).append(scan.group(1))
+        temp = _TEMP_BTREE_RE.search(detail)
+        if temp:
+            flags.setdefault(TEMP_BTREE, []).append(temp.group(1))
+        if "CORRELATED" in detail:
+            flags.setdefault(CORRELATED_SUBQUERY, []).append(detail)
+        auto = _AUTO_INDEX_RE.search(detail)
+        if auto:
+            flags.setdefault(AUTOMATIC_INDEX, []).append(auto.group(1))
+    return flags
+
+def explain(conn: sqlite3.Connection, query: str) -> List[str]:
+    """Líneas de detalle de ``EXPLAIN QUERY PLAN``."""
+    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {query.strip().rstrip(';')}")]
+
+def _check(query: str):
+    reason = check_query(query)
+    if reason is not None:
+        raise ValueError(f"Consulta no permitida: {reason}")
+
+@contextmanager
+def _read_only(conn: sqlite3.Connection) -> Iterator[sqlite3.Connection]:
+    """Activa ``query_only`` en ``conn`` y restaura el valor anterior al salir."""
+    previous = conn.execute("PRAGMA query_only").fetchone()[0]
+    conn.execute("PRAGMA query_only = ON")
+    try:
+        yield conn
+    finally:
+        conn.execute(f"PRAGMA query_only = {int(previous)}")
+
+def profile_query(conn: sqlite3.Connection, query: str, time_limit: float = 2.0,
+                  max_instructions: int = 50_000_000) -> QueryProfile:
+    """
+    Obtiene el plan y ejecuta la consulta completa contando instrucciones,
+    con ``conn`` en modo de solo lectura. Lanza ValueError si la consulta no
+    es de lectura y sqlite3.OperationalError si se agota el presupuesto.
+    """
+    _check(query)
+    with _read_only(conn):
+        return _profile(conn, query, time_limit, max_instructions)
+
+def _profile(conn: sqlite3.Connection, query: str, time_limit: float, max_instructions: int) -> QueryProfile:
+    plan = explain(conn, query)
+    budget = QueryBudget(time_limit, max_instructions, check_every=CHECK_EVERY)
+    conn.set_progress_handler(budget, budget.check_every)
+    try:
+        cursor = conn.execute(query)
+        rows = 0
+        while True:
+            batch = cursor.fetchmany(500)
+            if not batch:
+                break
+            rows += len(batch)
+        cursor.close()
+    finally:
+        conn.set_progress_handler(None, 0)
+    return QueryProfile(plan=plan, vm_steps=budget.steps, rows=rows, flags=analyze_plan(plan))
+
+def score_efficiency(user: QueryProfile, reference: QueryProfile, max_points: int = 5) -> dict:
+    """
+    Compara el perfil del jugador con el de la referencia.
+
+    Los puntos dependen de la proporción de instrucciones ejecutadas; cada
+    señal de coste que la referencia no tiene resta un punto.
+
+    Returns:
+        Diccionario con 'points', 'max_points', 'ratio', 'flags' y 'messages'
+    """
+    ratio = user.vm_steps / max(reference.vm_steps, CHECK_EVERY)
+    fraction = next((f for limit, f in EFFICIENCY_TIERS if ratio <= limit), 0.0)
+    new_flags = {name: details for name, details in user.flags.items() if name not in reference.flags}
+    points = max(round(max_points * fraction) - len(new_flags), 0)
+    messages = [
+        FLAG_MESSAGES[name].format(detail=", ".join(details))
+        for name, details in sorted(new_flags.items())
+    ]
+    if ratio > EFFICIENCY_TIERS[0][0]:
+        messages.insert(0, f"Tu consulta ejecuta {ratio:.1f} veces más instrucciones que la solución de referencia.")
+    return {
+        "points": points,
+        "max_points": max_points,
+        "ratio": ratio,
+        "flags": sorted(new_flags),
+        "messages": messages,
+        "plan": user.plan,
+        "vm_steps": user.vm_steps,
+        "reference_vm_steps": reference.vm_steps,
+    }
+
+def grade_query_cost(conn: sqlite3.Connection, user_query: str, reference_query: str, max_points: int = 5,
+                     time_limit: float = 2.0, max_instructions: int = 50_000_000) -> dict:
+    """
+    Perfila la consulta del jugador y la de referencia con ``conn`` en modo
+    de solo lectura y puntúa la eficiencia. Una consulta del jugador que no
+    es de lectura obtiene 0 puntos sin ejecutarse.
+    """
+    _check(reference_query)
+    reason = check_query(user_query)
+    if reason is not None:
+        return {
+            "points": 0,
+            "max_points": max_points,
+            "ratio": None,
+            "flags": [],
+            "messages": [f"Consulta no permitida: {reason}"],
+            "plan": [],
+            "vm_steps": 0,
+            "reference_vm_steps": None,
+        }
+    with _read_only(conn):
+        user = _profile(conn, user_query, time_limit, max_instructions)
+        reference = _profile(conn, reference_query, time_limit, max_instructions)
+    return score_efficiency(user, reference, max_points)
@@ -0,0 +1,100 @@
+"""
+Módulo: result_pager.py
+
+Resultados de consultas leídos bajo demanda para las vistas de resultados.
+
+``LazyResult`` envuelve un cursor abierto y solo trae filas con ``fetchmany``
+cuando la vista las necesita (al desplazarse o cambiar de página), en lugar
+de cargar el resultado completo con ``fetchall``. Lo usan el modelo de tabla
+de la interfaz PyQt y la vista paginada del editor Tk.
+"""
+
+from typing import Iterable, Iterator, List, Optional, Sequence
+
+PAGE_SIZE = 200
+
+class LazyResult:
+    """
+    Resultado de una consulta que se va leyendo por páginas.
+
+    Las filas ya leídas se conservan (un cursor de SQLite solo avanza), de
+    modo que volver a páginas anteriores no repite la consulta.
+    """
+
+    def __init__(self, cursor, page_size: int = PAGE_SIZE, columns: Optional[Sequence[str]] = None):
+        self._cursor = cursor
+        self.page_size = page_size
+        if columns is None:
+            columns = [desc[0] for desc in cursor.description] if cursor.description else []
+        self.columns = list(columns)
+        self.rows: List[tuple] = []
+        self.exhausted = False
+
+    @classmethod
+    def from_rows(cls, columns: Sequence[str], rows: Iterable[Sequence], page_size: int = PAGE_SIZE) -> "LazyResult":
+        """Resultado sobre filas ya disponibles (lista o iterador)."""
+        return cls(_IteratorCursor(rows), page_size, columns)
+
+    def __len__(self):
+        """Filas leídas hasta ahora."""
+        return len(self.rows)
+
+    def read_batch(self, count: Optional[int] = None) -> List[tuple]:
+        """
+        Lee hasta ``count`` filas del cursor (por defecto una página) sin
+        añadirlas todavía a ``rows``; permite avisar a la vista antes.
+        """
+        if self.exhausted:
+            return []
+        count = count or self.page_size
+        batch = self._cursor.fetchmany(count)
+        if len(batch) < count:
+            self.close()
+        return batch
+
+    def fetch_more(self, count: Optional[int] = None) -> int:
+        """Lee hasta ``count`` filas más (por defecto una página). Devuelve cuántas llegaron."""
+        batch = self.read_batch(count)
+        self.rows.extend(batch)
+        return len(batch)
+
+    def ensure(self, n: int) -> int:
+        """Lee filas hasta tener al menos ``n`` (o agotar el cursor). Devuelve las disponibles."""
+        while len(self.rows) < n and not self.exhausted:
+            self.fetch_more(max(self.page_size, n - len(self.rows)))
+        return len(self.rows)
+
+    def window(self, start: int, stop: int) -> List[tuple]:
+        """Filas en [start, stop), leyendo del cursor solo lo necesario."""
+        self.ensure(stop)
+        return self.rows[start:stop]
+
+    def page(self, number: int) -> List[tuple]:
+        """Filas de la página ``number`` (desde 0)."""
+        return self.window(number * self.page_size, (number + 1) * self.page_size)
+
+    def has_page(self, number: int) -> bool:
+        return self.ensure(number * self.page_size + 1) > number * self.page_size
+
+    def close(self):
+        """Marca el resultado como completo y libera el cursor."""
+        self.exhausted = True
+        if self._cursor is not None:
+            close = getattr(self._cursor, "close", None)
+            if close:
+                close()
+            self._cursor = None
+
+class _IteratorCursor:
+    """Adaptador con ``fetchmany`` sobre un iterable de filas."""
+
+    def __init__(self, rows: Iterable[Sequence]):
+        self._rows: Iterator[Sequence] = iter(rows)
+
+    def fetchmany(self, size: int) -> List[tuple]:
+        batch = []
+        for row in self._rows:
+            batch.append(tuple(row))
+            if len(batch) >= size:
+                break
+        return batch
@@ -0,0 +1,156 @@
+"""
+Módulo: result_signature.py
+
+Firmas compactas de resultados esperados.
+
+Una firma guarda el número de filas, la clase de valor de cada columna
+(nulo, número, texto o binario) y un hash del resultado: ordenado (hash
+encadenado con puntos de control cada ``CHECKPOINT_EVERY`` filas) o
+independiente del orden (suma de los hashes de fila). Las filas del jugador
+se van pasando a un ``SignatureMatcher`` según llegan del cursor y la
+comparación termina en cuanto aparece una discrepancia, sin materializar
+ni el resultado esperado ni el del jugador.
+
+La igualdad respeta la de Python: 1, 1.0 y True se consideran iguales.
+"""
+
+import hashlib
+import struct
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+CHECKPOINT_EVERY = 128
+_MASK = (1 << 64) - 1
+_MULTIPLIER = 0x100000001B3
+
+NULL, NUMBER, TEXT, BLOB = "null", "number", "text", "blob"
+
+def _value_class(value) -> str:
+    if value is None:
+        return NULL
+    if isinstance(value, (int, float)):
+        return NUMBER
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return BLOB
+    return TEXT
+
+def _encode_value(value) -> bytes:
+    if value is None:
+        return b"n"
+    if isinstance(value, (int, float)):
+        if isinstance(value, float) and not value.is_integer():
+            return b"f" + struct.pack("<d", value)
+        return b"i" + str(int(value)).encode() + b";"
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        data = bytes(value)
+        return b"b" + str(len(data)).encode() + b":" + data
+    text = str(value).encode("utf-8", "surrogatepass")
+    return b"t" + str(len(text)).encode() + b":" + text
+
+def row_hash(row: Sequence) -> int:
+    """Hash de 64 bits de una fila."""
+    h = hashlib.blake2b(digest_size=8)
+    for value in row:
+        h.update(_encode_value(value))
+    return int.from_bytes(h.digest(), "little")
+
+def _chain(state: int, h: int) -> int:
+    return ((state * _MULTIPLIER) ^ h) & _MASK
+
+class ResultSignature:
+    """Firma de un resultado esperado."""
+
+    __slots__ = ("row_count", "column_count", "column_classes", "ordered", "digest", "checkpoints")
+
+    def __init__(self, row_count: int, column_count: Optional[int], column_classes: Tuple[frozenset, ...],
+                 ordered: bool, digest: int, checkpoints: Tuple[int, ...] = ()):
+        self.row_count = row_count
+        self.column_count = column_count
+        self.column_classes = column_classes
+        self.ordered = ordered
+        self.digest = digest
+        self.checkpoints = checkpoints
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Sequence], ordered: bool = True) -> "ResultSignature":
+        """Compila la firma recorriendo las filas una sola vez."""
+        count = 0
+        column_count = None
+        classes: List[set] = []
+        state = 0
+        checkpoints = []
+        for row in rows:
+            if column_count is None:
+                column_count = len(row)
+                classes = [set() for _ in range(column_count)]
+            elif len(row) != column_count:
+                # Filas de distinta longitud: no se restringe por columna
+                column_count = -1
+            if column_count != -1:
+                for i, value in enumerate(row):
+                    classes[i].add(_value_class(value))
+            h = row_hash(row)
+            count += 1
+            if ordered:
+                state = _chain(state, h)
+                if count % CHECKPOINT_EVERY == 0:
+                    checkpoints.append(state)
+            else:
+                state = (state + h) & _MASK
+        column_classes = tuple(frozenset(c) for c in classes) if column_count not in (None, -1) else ()
+        return cls(count, None if column_count == -1 else column_count, column_classes,
+                   ordered, state, tuple(checkpoints))
+
+    def matcher(self) -> "SignatureMatcher":
+        return SignatureMatcher(self)
+
+    def matches(self, rows: Iterable[Sequence]) -> bool:
+        """Compara un resultado completo con la firma (con salida temprana)."""
+        matcher = self.matcher()
+        for row in rows:
+            if not matcher.feed(row):
+                return False
+        return matcher.finish()
+
+class SignatureMatcher:
+    """Comparador incremental de un resultado contra una firma."""
+
+    __slots__ = ("signature", "count", "state", "failed")
+
+    def __init__(self, signature: ResultSignature):
+        self.signature = signature
+        self.count = 0
+        self.state = 0
+        self.failed = False
+
+    def feed(self, row: Sequence, h: Optional[int] = None) -> bool:
+        """
+        Añade una fila (``h`` es su ``row_hash`` si ya se calculó). Devuelve
+        False en cuanto el resultado ya no puede coincidir con la firma.
+        """
+        if self.failed:
+            return False
+        sig = self.signature
+        self.count += 1
+        if self.count > sig.row_count:
+            self.failed = True
+            return False
+        if sig.column_classes:
+            if len(row) != sig.column_count or any(
+                _value_class(value) not in allowed for value, allowed in zip(row, sig.column_classes)
+            ):
+                self.failed = True
+                return False
+        if h is None:
+            h = row_hash(row)
+        if sig.ordered:
+            self.state = _chain(self.state, h)
+            if self.count % CHECKPOINT_EVERY == 0 and self.state != sig.checkpoints[self.count // CHECKPOINT_EVERY - 1]:
+                self.failed = True
+                return False
+        else:
+            self.state = (self.state + h) & _MASK
+        return True
+
+    def finish(self) -> bool:
+        """True si el resultado completo coincide con la firma."""
+        return not self.failed and self.count == self.signature.row_count and self.state == self.signature.digest
@@ -1,7 +1,10 @@
 # retos.py
 
+import sqlite3
 from typing import List, Dict
 
+from sandbox import template_for
+
 class SQLChallenge:
     def __init__(self, nivel: int, instrucciones: str, datos_iniciales: List[str], solucion_esperada: List[Dict]):
         self.nivel = nivel
@@ -9,6 +12,14 @@ class SQLChallenge:
         self.datos_iniciales = datos_iniciales
         self.solucion_esperada = solucion_esperada
 
+    def crear_sesion(self) -> sqlite3.Connection:
+        """
+        Devuelve una base de datos en memoria, privada para el jugador, con los
+        datos iniciales del reto. Los scripts se ejecutan una sola vez para
+        construir la plantilla; cada sesión es una copia de esa plantilla.
+        """
+        return template_for(self.datos_iniciales).clone()
+
 def obtener_retos_iniciales() -> List[SQLChallenge]:
     """
     Devuelve una lista con los primeros retos del juego SQL.
@@ -0,0 +1,77 @@
+"""
+Módulo: sandbox.py
+
+Bases de datos plantilla para los retos. El conjunto de datos de cada reto se
+construye una sola vez en memoria; cada sesión de juego recibe después una
+copia privada en memoria mediante serialize/deserialize de SQLite (o la API
+de backup si la versión de Python no los ofrece), sin volver a ejecutar los
+scripts CREATE/INSERT y sin compartir datos entre jugadores.
+"""
+
+import sqlite3
+import threading
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+_HAS_SERIALIZE = hasattr(sqlite3.Connection, "serialize")
+
+class DatabaseTemplate:
+    """
+    Plantilla de base de datos construida una vez y clonada por sesión.
+
+    Se puede crear a partir de una lista de sentencias SQL o de una función
+    que reciba una conexión y cargue los datos.
+    """
+
+    def __init__(self, setup_scripts: Iterable[str] = (), builder: Optional[Callable[[sqlite3.Connection], None]] = None):
+        self.setup_scripts = tuple(setup_scripts)
+        self.builder = builder
+        self._image: Optional[bytes] = None
+        self._source: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _build(self):
+        conn = sqlite3.connect(":memory:", check_same_thread=False)
+        for script in self.setup_scripts:
+            conn.executescript(script)
+        if self.builder:
+            self.builder(conn)
+        conn.commit()
+        if _HAS_SERIALIZE:
+            self._image = conn.serialize()
+            conn.close()
+        else:
+            self._source = conn
+
+    def _ensure_built(self):
+        if self._image is None and self._source is None:
+            with self._lock:
+                if self._image is None and self._source is None:
+                    self._build()
+
+    def clone(self) -> sqlite3.Connection:
+        """Devuelve una conexión nueva con una copia privada en memoria de los datos."""
+        self._ensure_built()
+        conn = sqlite3.connect(":memory:")
+        if self._image is not None:
+            conn.deserialize(self._image)
+        else:
+            with self._lock:
+                self._source.backup(conn)
+        return conn
+
+_templates: Dict[Tuple[str, ...], DatabaseTemplate] = {}
+_templates_lock = threading.Lock()
+
+def template_for(setup_scripts: Iterable[str]) -> DatabaseTemplate:
+    """Plantilla compartida para un conjunto de scripts (se construye una vez por proceso)."""
+    key = tuple(setup_scripts)
+    with _templates_lock:
+        template = _templates.get(key)
+        if template is None:
+            template = _templates[key] = DatabaseTemplate(key)
+        return template
+
+def clear_templates():
+    """Olvida las plantillas construidas (por ejemplo, tras cambiar los datos de un reto)."""
+    with _templates_lock:
+        _templates.clear()
@@ -2,13 +2,19 @@ import sqlite3
 import tkinter as tk
 from tkinter import scrolledtext, messagebox
 
+from result_pager import LazyResult
+
+# Filas que se formatean y muestran a la vez en el área de resultados
+PAGE_SIZE = 100
+
 class SQLEditor(tk.Frame):
     def __init__(self, master, db_path):
         super().__init__(master)
         self.master = master
         self.db_path = db_path
         self.connection = sqlite3.connect(self.db_path)
-        self.cursor = self.connection.cursor()
+        self.result = None
+        self.page = 0
         self.create_widgets()
     
     def create_widgets(self):
@@ -22,7 +28,17 @@ class SQLEditor(tk.Frame):
 
         # Área de resultados
         self.result_area = scrolledtext.ScrolledText(self, height=15, width=80, font=("Consolas", 12), state='disabled')
-        self.result_area.pack(padx=10, pady=10)
+        self.result_area.pack(padx=10, pady=(10, 0))
+
+        # Navegación entre páginas de resultados
+        nav = tk.Frame(self)
+        nav.pack(pady=(0, 10))
+        self.prev_button = tk.Button(nav, text="< Anterior", command=lambda: self.show_page(self.page - 1), state='disabled')
+        self.prev_button.pack(side="left")
+        self.page_label = tk.Label(nav, text="")
+        self.page_label.pack(side="left", padx=10)
+        self.next_button = tk.Button(nav, text="Siguiente >", command=lambda: self.show_page(self.page + 1), state='disabled')
+        self.next_button.pack(side="left")
 
     def execute_query(self):
         query = self.query_editor.get("1.0", tk.END).strip()
@@ -30,36 +46,75 @@ class SQLEditor(tk.Frame):
             messagebox.showwarning("Advertencia", "Por favor, escribe una consulta SQL.")
             return
 
+        if self.result is not None:
+            self.result.close()
+            self.result = None
         try:
-            self.cursor.execute(query)
-            if query.lower().startswith("select"):
-                rows = self.cursor.fetchall()
-                columns = [desc[0] for desc in self.cursor.description]
-                result = self.format_results(columns, rows)
-            else:
-                self.connection.commit()
-                result = "Consulta ejecutada correctamente."
+            cursor = self.connection.cursor()
+            cursor.execute(query)
+            if cursor.description is not None:
+                # El cursor queda abierto: solo se leen las páginas que se muestran
+                self.result = LazyResult(cursor, page_size=PAGE_SIZE)
+                self.show_page(0)
+                return
+            self.connection.commit()
+            result = "Consulta ejecutada correctamente."
         except sqlite3.Error as e:
             result = f"Error: {e}"
+        self._set_text(result)
+        self._update_navigation()
+
+    def show_page(self, page):
+        """Muestra una página del resultado actual, leyendo del cursor solo lo necesario."""
+        if self.result is None or page < 0:
+            return
+        rows = self.result.page(page)
+        if not rows and page > 0:
+            return
+        self.page = page
+        self._set_text(self.format_results(self.result.columns, rows))
+        self._update_navigation()
+
+    def _update_navigation(self):
+        if self.result is None:
+            self.page_label.config(text="")
+            self.prev_button.config(state='disabled')
+            self.next_button.config(state='disabled')
+            return
+        start = self.page * PAGE_SIZE
+        shown = len(self.result.rows[start:start + PAGE_SIZE])
+        more = self.result.has_page(self.page + 1)
+        total = "" if not self.result.exhausted else f" de {len(self.result)}"
+        self.page_label.config(text=f"Filas {start + 1 if shown else 0}-{start + shown}{total}")
+        self.prev_button.config(state='normal' if self.page > 0 else 'disabled')
+        self.next_button.config(state='normal' if more else 'disabled')
 
+    def _set_text(self, text):
         self.result_area.config(state='normal')
         self.result_area.delete("1.0", tk.END)
-        self.result_area.insert(tk.END, result)
+        self.result_area.insert(tk.END, text)
         self.result_area.config(state='disabled')
 
     def format_results(self, columns, rows):
+        """Formatea como tabla de texto las filas de una página (anchos calculados en una pasada)."""
         if not rows:
             return "Sin resultados."
         col_widths = [max(len(str(col)), 12) for col in columns]
+        lines = []
         for row in rows:
-            for i, val in enumerate(row):
-                col_widths[i] = max(col_widths[i], len(str(val)))
+            cells = [str(val) for val in row]
+            for i, cell in enumerate(cells):
+                if len(cell) > col_widths[i]:
+                    col_widths[i] = len(cell)
+            lines.append(cells)
         header = " | ".join(col.ljust(col_widths[i]) for i, col in enumerate(columns))
         separator = "-+-".join("-" * w for w in col_widths)
-        data = "\n".join(" | ".join(str(val).ljust(col_widths[i]) for i, val in enumerate(row)) for row in rows)
+        data = "\n".join(" | ".join(cell.ljust(col_widths[i]) for i, cell in enumerate(cells)) for cells in lines)
         return f"{header}\n{separator}\n{data}"
 
     def close(self):
+        if self.result is not None:
+            self.result.close()
         self.connection.close()
 
 def main():
@@ -1,17 +1,237 @@
 import sqlite3
 import re
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import quote
+
+from sql_fingerprint import VerdictCache, analyze, result_fingerprint
+
+DEFAULT_ALLOWED_COMMANDS = frozenset({'SELECT', 'PRAGMA', 'EXPLAIN', 'VALUES'})
+
+# PRAGMAs de consulta que admiten argumento: la forma ``PRAGMA nombre(valor)``
+# de cualquier otro cambia la configuración igual que ``PRAGMA nombre = valor``
+INTROSPECTION_PRAGMAS = frozenset({
+    'table_info', 'table_xinfo', 'table_list', 'index_list', 'index_info', 'index_xinfo',
+    'foreign_key_list', 'foreign_key_check', 'integrity_check', 'quick_check',
+    'database_list', 'collation_list', 'function_list', 'module_list', 'pragma_list', 'compile_options',
+})
+# PRAGMAs que actúan aunque se escriban sin argumento
+ACTION_PRAGMAS = frozenset({'optimize', 'shrink_memory', 'wal_checkpoint', 'incremental_vacuum'})
+
+def _pragma_call(normalized):
+    """(nombre, tiene argumento) de una sentencia PRAGMA ya normalizada."""
+    tokens = normalized.split(" ")[1:]
+    if len(tokens) > 2 and tokens[1] == ".":
+        tokens = tokens[2:]  # esquema.nombre
+    name = tokens[0].strip('"') if tokens else ""
+    return name, len(tokens) > 1 and tokens[1] == "("
+
+def check_query(query, allowed_commands=DEFAULT_ALLOWED_COMMANDS):
+    """
+    Control de seguridad previo a la ejecución, con el análisis del lexer
+    (memorizado por consulta y compartido con la huella de las cachés).
+    Devuelve None si la consulta se puede ejecutar o el motivo del rechazo.
+    """
+    analysis = analyze(query)
+    if analysis.statement_count == 0:
+        return "la consulta está vacía."
+    if analysis.statement_count > 1:
+        return "solo se permite una sentencia por consulta."
+    if analysis.has_comments:
+        return "no se permiten comentarios SQL."
+    if analysis.malformed:
+        return "hay una cadena, identificador o comentario sin cerrar."
+    if analysis.statement_type not in allowed_commands:
+        return "solo se permiten consultas de lectura (SELECT)."
+    if analysis.statement_type == "PRAGMA":
+        name, has_argument = _pragma_call(analysis.normalized)
+        if (
+            analysis.assigns
+            or (has_argument and name not in INTROSPECTION_PRAGMAS)
+            or name in ACTION_PRAGMAS
+        ):
+            return "no se permite cambiar la configuración con PRAGMA."
+    return None
+
+class PoolExhausted(RuntimeError):
+    """No quedó ninguna conexión libre en el tiempo de espera del pool."""
+
+class ConnectionPool:
+    """
+    Pool de conexiones SQLite de solo lectura reutilizables entre consultas.
+    Cada conexión se abre con la URI ``mode=ro`` y caché de página compartida,
+    y conserva su caché de sentencias preparadas entre usos.
+    """
+
+    def __init__(self, db_path, size=4, statement_cache_size=256, shared_cache=True, timeout=5.0):
+        self.db_path = db_path
+        self.size = size
+        self.statement_cache_size = statement_cache_size
+        self.shared_cache = shared_cache
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _uri(self):
+        uri = f"file:{quote(str(self.db_path))}?mode=ro"
+        if self.shared_cache:
+            uri += "&cache=shared"
+        return uri
+
+    def _connect(self):
+        return sqlite3.connect(
+            self._uri(),
+            uri=True,
+            check_same_thread=False,
+            cached_statements=self.statement_cache_size,
+            timeout=self.timeout,
+        )
+
+    def _acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("El pool de conexiones está cerrado.")
+            if self._created < self.size:
+                self._created += 1
+                create = True
+            else:
+                create = False
+        if create:
+            try:
+                return self._connect()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+        # Pool lleno: esperar a que se libere una conexión
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise PoolExhausted(
+                f"no hay conexiones libres tras esperar {self.timeout} s"
+            ) from None
+
+    def _release(self, conn):
+        if self._closed:
+            conn.close()
+        else:
+            self._idle.put(conn)
+
+    @contextmanager
+    def connection(self):
+        """Presta una conexión del pool durante el bloque ``with``."""
+        conn = self._acquire()
+        try:
+            yield conn
+        finally:
+            self._release(conn)
+
+    def close(self):
+        """Cierra todas las conexiones inactivas y las que se devuelvan después."""
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+class QueryBudget:
+    """
+    Presupuesto de una consulta: tiempo de reloj e instrucciones de la VM de
+    SQLite. Se comprueba desde el progress handler cada ``check_every``
+    instrucciones; devolver un valor verdadero interrumpe la consulta.
+    """
+
+    def __init__(self, time_limit, max_instructions, check_every=1000):
+        self.time_limit = time_limit
+        self.max_instructions = max_instructions
+        self.check_every = check_every
+        self.steps = 0
+        self.exceeded = None
+        self.started = time.perf_counter()
+
+    def __call__(self):
+        self.steps += self.check_every
+        if self.max_instructions and self.steps > self.max_instructions:
+            self.exceeded = "instructions"
+            return 1
+        if self.time_limit and time.perf_counter() - self.started > self.time_limit:
+            self.exceeded = "timeout"
+            return 1
+        return 0
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.started
 
 class SQLExecutor:
     """
     Clase para ejecutar consultas SQL de usuarios de forma segura y controlada.
     Utiliza SQLite como backend por su integración nativa con Python[4].
+    Las consultas se ejecutan sobre un pool de conexiones de solo lectura
+    propiedad del ejecutor, seguro para uso concurrente desde varios hilos.
+    Cada consulta tiene un presupuesto de tiempo, de instrucciones de la VM
+    y de filas devueltas; los límites alcanzados se cuentan en ``metrics``.
+    Los resultados correctos se guardan por huella de la consulta, así que
+    un reenvío equivalente se responde sin tocar la base de datos (las
+    conexiones son de solo lectura; ``clear_cache`` si los datos cambian).
     """
 
-    # Lista blanca de comandos permitidos (solo SELECT y consultas de lectura)
-    ALLOWED_COMMANDS = {'SELECT', 'PRAGMA', 'EXPLAIN', 'WITH'}
+    # Lista blanca de comandos permitidos (solo SELECT y consultas de lectura).
+    # Un WITH se clasifica por su sentencia principal (WITH ... SELECT es SELECT).
+    ALLOWED_COMMANDS = DEFAULT_ALLOWED_COMMANDS
+
+    # Mensajes para las consultas interrumpidas por presupuesto
+    BUSY_MESSAGE = "El servidor está ocupado. Vuelve a enviar tu consulta en unos segundos."
+
+    LIMIT_MESSAGES = {
+        "timeout": "La consulta superó el tiempo máximo de {time_limit} s y fue cancelada.",
+        "instructions": "La consulta superó el máximo de {max_instructions} instrucciones y fue cancelada.",
+    }
 
-    def __init__(self, db_path):
+    def __init__(self, db_path, pool_size=4, statement_cache_size=256, shared_cache=True,
+                 time_limit=2.0, max_instructions=50_000_000, max_rows=1000, fetch_size=200,
+                 result_cache_size=256):
         self.db_path = db_path
+        self.pool = ConnectionPool(
+            db_path,
+            size=pool_size,
+            statement_cache_size=statement_cache_size,
+            shared_cache=shared_cache,
+        )
+        self.time_limit = time_limit
+        self.max_instructions = max_instructions
+        self.max_rows = max_rows
+        self.fetch_size = fetch_size
+        self.results = VerdictCache(result_cache_size, key=result_fingerprint) if result_cache_size else None
+        self.metrics = {"queries": 0, "timeout": 0, "instructions": 0, "truncated": 0, "cache_hits": 0, "busy": 0}
+        self._metrics_lock = threading.Lock()
+
+    def _count(self, key):
+        with self._metrics_lock:
+            self.metrics[key] += 1
+
+    def _fetch_limited(self, cursor, max_rows):
+        """
+        Lee filas en bloques con ``fetchmany`` hasta ``max_rows``.
+        Devuelve (filas, truncado).
+        """
+        rows = []
+        while True:
+            batch = cursor.fetchmany(min(self.fetch_size, max_rows + 1 - len(rows)))
+            if not batch:
+                return rows, False
+            rows.extend(batch)
+            if len(rows) > max_rows:
+                return rows[:max_rows], True
 
     def is_safe_query(self, query):
         """
@@ -19,44 +239,79 @@ class SQLExecutor:
         - Solo permite comandos en la lista blanca.
         - No permite múltiples sentencias ni comentarios.
         """
-        # Elimina espacios iniciales y finales
-        stripped = query.strip().upper()
-        # Extrae el primer comando SQL
-        first_word = stripped.split()[0]
-        # Verifica si el comando está permitido
-        if first_word not in self.ALLOWED_COMMANDS:
-            return False
-        # No permite punto y coma fuera del final (evita múltiples sentencias)
-        if ';' in stripped[:-1]:
-            return False
-        # No permite comentarios SQL
-        if '--' in stripped or '/*' in stripped or '*/' in stripped:
-            return False
-        return True
+        return check_query(query, self.ALLOWED_COMMANDS) is None
 
     def execute_query(self, query):
         """
         Ejecuta la consulta SQL si es segura.
         Devuelve los resultados o un mensaje de error controlado.
         """
-        if not self.is_safe_query(query):
+        reason = check_query(query, self.ALLOWED_COMMANDS)
+        if reason is not None:
             return {
                 "success": False,
-                "error": "Consulta no permitida. Solo se permiten consultas de lectura (SELECT)."
+                "error": f"Consulta no permitida: {reason}"
             }
+        if self.results is not None:
+            cached = self.results.get(query)
+            if cached is not None:
+                self._count("cache_hits")
+                return dict(cached, rows=list(cached["rows"]))
+        self._count("queries")
+        budget = QueryBudget(self.time_limit, self.max_instructions)
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.connection() as conn:
+                conn.set_progress_handler(budget, budget.check_every)
                 cursor = conn.cursor()
-                cursor.execute(query)
-                columns = [desc[0] for desc in cursor.description] if cursor.description else []
-                rows = cursor.fetchall()
+                try:
+                    cursor.execute(query)
+                    columns = [desc[0] for desc in cursor.description] if cursor.description else []
+                    rows, truncated = self._fetch_limited(cursor, self.max_rows)
+                finally:
+                    cursor.close()
+                    conn.set_progress_handler(None, 0)
+            if truncated:
+                self._count("truncated")
+            result = {
+                "success": True,
+                "columns": columns,
+                "rows": rows,
+                "truncated": truncated,
+                "max_rows": self.max_rows,
+                "stats": {"elapsed": budget.elapsed, "vm_steps": budget.steps},
+            }
+            if self.results is not None:
+                self.results.put(query, result)
+            return dict(result, rows=list(rows))
+        except PoolExhausted:
+            self._count("busy")
+            return {"success": False, "busy": True, "error": self.BUSY_MESSAGE}
+        except sqlite3.OperationalError as e:
+            if budget.exceeded:
+                self._count(budget.exceeded)
                 return {
-                    "success": True,
-                    "columns": columns,
-                    "rows": rows
+                    "success": False,
+                    "limit": budget.exceeded,
+                    "error": self.LIMIT_MESSAGES[budget.exceeded].format(
+                        time_limit=self.time_limit, max_instructions=self.max_instructions
+                    ),
+                    "stats": {"elapsed": budget.elapsed, "vm_steps": budget.steps},
                 }
+            return {
+                "success": False,
+                "error": f"Error al ejecutar la consulta: {str(e)}"
+            }
         except Exception as e:
             return {
                 "success": False,
                 "error": f"Error al ejecutar la consulta: {str(e)}"
-            }
\ No newline at end of file
+            }
+
+    def clear_cache(self):
+        """Olvida los resultados guardados (por ejemplo, tras cambiar los datos)."""
+        if self.results is not None:
+            self.results.invalidate()
+
+    def close(self):
+        """Libera las conexiones del pool."""
+        self.pool.close()
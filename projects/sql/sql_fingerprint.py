@@ -0,0 +1,295 @@
+"""
+Módulo: sql_fingerprint.py
+
+Análisis, normalización y huella de consultas SQL, y caché de veredictos por reto.
+
+El lexer recorre la consulta una sola vez y separa espacios, comentarios,
+cadenas, identificadores, números y operadores. En esa misma pasada se
+obtiene una forma canónica (sin espacios ni comentarios, palabras en
+minúsculas, números con formato único y sin ``;`` final), cuya huella sirve
+para reconocer reenvíos casi idénticos sin volver a ejecutarlos, y se
+clasifican las sentencias para el control de seguridad de SQLExecutor.
+
+La forma canónica no distingue ``AS Nombre`` de ``AS nombre``, pero SQLite
+sí: el nombre de cada columna del resultado es su alias o el texto literal
+de la expresión. Por eso el análisis guarda también el texto de las
+columnas de cada SELECT, y las cachés que devuelven nombres de columna
+usan ``result_fingerprint``, que lo incluye.
+"""
+
+import hashlib
+import math
+import re
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Callable, Dict, Hashable, Iterator, List, NamedTuple, Optional, Tuple
+
+_TOKEN_RE = re.compile(r"""
+    (?P<space>\s+)
+  | (?P<comment>--[^\n]*|/\*.*?(?:\*/|\Z))
+  | (?P<blob>[xX]'[0-9a-fA-F]*')
+  | (?P<string>'(?:[^']|'')*')
+  | (?P<quoted>"(?:[^"]|"")*"|`(?:[^`]|``)*`|\[[^\]]*\])
+  | (?P<unterminated>['"`\[].*)
+  | (?P<number>0[xX][0-9a-fA-F]+|(?:\d+(?:\.\d*)?|\.\d+)(?:[eE][+-]?\d+)?)
+  | (?P<word>[^\W\d][\w$]*)
+  | (?P<param>\?\d*|[:@$][^\W\d]\w*)
+  | (?P<op>\|\||<<|>>|<=|>=|==|!=|<>|->>|->|[-+*/%&|~<>=(),.;])
+  | (?P<error>.)
+""", re.S | re.X)
+
+# Tokens que no afectan al significado de la consulta
+IGNORED = frozenset({"space", "comment"})
+
+class Token(NamedTuple):
+    kind: str
+    text: str
+
+def tokenize(sql: str) -> Iterator[Token]:
+    """Divide la consulta en tokens en una sola pasada (incluye espacios y comentarios)."""
+    for match in _TOKEN_RE.finditer(sql):
+        yield Token(match.lastgroup, match.group())
+
+def _canonical_number(text: str) -> str:
+    if text[:2] in ("0x", "0X"):
+        return str(int(text, 16))
+    if any(c in text for c in ".eE"):
+        value = float(text)
+        if math.isinf(value):
+            # Desbordado: repr daría 'inf', igual que el identificador inf
+            return text.lower()
+        return repr(value)
+    return str(int(text))
+
+def _canonical_quoted(text: str) -> str:
+    inner = text[1:-1]
+    if text[0] == '"':
+        inner = inner.replace('""', '"')
+    elif text[0] == "`":
+        inner = inner.replace("``", "`")
+    return '"' + inner.replace('"', '""') + '"'
+
+# Sentencias que no modifican datos ni esquema
+READ_ONLY_STATEMENTS = frozenset({"SELECT", "VALUES", "EXPLAIN", "PRAGMA"})
+# Sentencia principal que puede seguir a las CTE de un WITH
+_WITH_TARGETS = frozenset({"SELECT", "VALUES", "INSERT", "UPDATE", "DELETE", "REPLACE"})
+# Palabras clave que cierran la lista de columnas de un SELECT
+_SELECT_LIST_END = frozenset({
+    "FROM", "WHERE", "GROUP", "HAVING", "WINDOW", "ORDER", "LIMIT", "UNION", "INTERSECT", "EXCEPT",
+})
+_SELECT_QUANTIFIER_RE = re.compile(r"^(?:distinct|all)\b\s*", re.I)
+
+def _digest(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+class _SelectList:
+    """Columnas de un SELECT en curso, con su texto original."""
+
+    def __init__(self, depth: int):
+        self.depth = depth
+        self.columns: List[str] = []
+        self.current: List[str] = []
+
+    def next_column(self):
+        column = "".join(self.current).strip()
+        if not self.columns:
+            column = _SELECT_QUANTIFIER_RE.sub("", column, count=1)
+        self.columns.append(column)
+        self.current = []
+
+class QueryAnalysis(NamedTuple):
+    """Resultado de analizar una consulta con una sola pasada del lexer."""
+    normalized: str
+    fingerprint: str
+    statement_type: Optional[str]   # tipo de la primera sentencia; WITH se resuelve a su sentencia principal
+    statement_types: Tuple[str, ...]
+    statement_count: int
+    has_comments: bool
+    malformed: bool                 # cadena o comentario sin cerrar, o carácter no reconocido
+    assigns: bool                   # hay un '=' fuera de paréntesis (p. ej. PRAGMA x = valor)
+    result_columns: Tuple[str, ...] = ()  # texto original de las columnas de cada SELECT
+    result_fingerprint: str = ""    # huella que además distingue los nombres de columna
+
+    @property
+    def read_only(self) -> bool:
+        return bool(self.statement_types) and all(t in READ_ONLY_STATEMENTS for t in self.statement_types)
+
+@lru_cache(maxsize=4096)
+def analyze(sql: str) -> QueryAnalysis:
+    """
+    Analiza la consulta en una sola pasada: forma canónica y huella, tipo y
+    número de sentencias, comentarios y literales sin cerrar, y texto de las
+    columnas de cada SELECT. Los ``;``, ``--`` y ``/*`` dentro de cadenas o
+    identificadores entre comillas no cuentan. El resultado se memoriza por
+    texto de la consulta.
+    """
+    parts: List[str] = []
+    result_columns: List[str] = []
+    select_lists: List[_SelectList] = []   # SELECT abiertos, el más interno al final
+    statement_types: List[str] = []
+    has_comments = malformed = assigns = False
+    current: Optional[str] = None   # tipo de la sentencia en curso
+    in_with = False
+    depth = 0
+    for kind, text in tokenize(sql):
+        if select_lists:
+            # Texto original de las columnas (antes de pasarlo a minúsculas)
+            inner = select_lists[-1]
+            if (
+                (kind == "word" and depth == inner.depth and text.upper() in _SELECT_LIST_END)
+                or (text == ")" and depth == inner.depth)
+            ):
+                inner.next_column()
+                result_columns.extend(select_lists.pop().columns)
+            elif text == ";":
+                for select_list in reversed(select_lists):
+                    select_list.next_column()
+                    result_columns.extend(select_list.columns)
+                select_lists.clear()
+            elif text == "," and depth == inner.depth:
+                inner.next_column()
+            else:
+                for select_list in select_lists:
+                    select_list.current.append(text)
+        if kind == "word" and text.upper() == "SELECT":
+            select_lists.append(_SelectList(depth))
+        if kind == "space":
+            continue
+        if kind == "comment":
+            has_comments = True
+            if text.startswith("/*") and not text.endswith("*/"):
+                malformed = True
+            continue
+        if kind in ("unterminated", "error"):
+            malformed = True
+        if kind == "word":
+            text = text.lower()
+            if current is None:
+                current = text.upper()
+                in_with = current == "WITH"
+            elif in_with and depth == 0 and text.upper() in _WITH_TARGETS:
+                current = text.upper()
+                in_with = False
+        elif kind == "number":
+            text = _canonical_number(text)
+        elif kind == "quoted":
+            text = _canonical_quoted(text)
+        elif kind == "blob":
+            text = "x'" + text[2:-1].lower() + "'"
+        elif kind == "op":
+            if text == ";":
+                if current is not None:
+                    statement_types.append(current)
+                current, in_with, depth = None, False, 0
+            elif text == "(":
+                depth += 1
+            elif text == ")":
+                depth -= 1
+            elif text == "=" and depth == 0:
+                assigns = True
+        if current is None and kind not in ("word", "op"):
+            # La sentencia empieza por algo que no es una palabra clave
+            current = kind.upper()
+        parts.append(text)
+    if current is not None:
+        statement_types.append(current)
+    for select_list in reversed(select_lists):
+        select_list.next_column()
+        result_columns.extend(select_list.columns)
+    while parts and parts[-1] == ";":
+        parts.pop()
+    normalized = " ".join(parts)
+    return QueryAnalysis(
+        normalized=normalized,
+        fingerprint=_digest(normalized),
+        statement_type=statement_types[0] if statement_types else None,
+        statement_types=tuple(statement_types),
+        statement_count=len(statement_types),
+        has_comments=has_comments,
+        malformed=malformed,
+        assigns=assigns,
+        result_columns=tuple(result_columns),
+        result_fingerprint=_digest("\0".join((normalized, *result_columns))),
+    )
+
+def normalize(sql: str) -> str:
+    """
+    Forma canónica de una consulta: tokens separados por un espacio, palabras
+    clave e identificadores sin comillas en minúsculas, números con un único
+    formato, identificadores entre comillas con comillas dobles y sin ``;``
+    finales. Las cadenas se conservan tal cual (distinguen mayúsculas).
+    """
+    return analyze(sql).normalized
+
+def fingerprint(sql: str) -> str:
+    """Huella de la forma canónica de la consulta."""
+    return analyze(sql).fingerprint
+
+def result_fingerprint(sql: str) -> str:
+    """
+    Huella de la forma canónica y del texto de las columnas: dos consultas
+    con la misma huella devuelven las mismas filas con los mismos nombres de
+    columna.
+    """
+    return analyze(sql).result_fingerprint
+
+_MISSING = object()
+
+class VerdictCache:
+    """
+    Caché LRU de veredictos por reto: huella de la consulta -> resultado de
+    la calificación. Cada reto tiene su propia LRU de ``max_entries``
+    entradas. Es segura para uso desde varios hilos.
+
+    ``key`` calcula la huella de cada consulta; las cachés que guardan
+    nombres de columna deben usar ``result_fingerprint``.
+    """
+
+    def __init__(self, max_entries: int = 256, key: Callable[[str], str] = fingerprint):
+        self.max_entries = max_entries
+        self.key = key
+        self._entries: Dict[Hashable, "OrderedDict[str, Any]"] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, query: str, challenge_id: Hashable = None, default: Any = None) -> Any:
+        key = self.key(query)
+        with self._lock:
+            entries = self._entries.get(challenge_id)
+            if entries is not None and key in entries:
+                entries.move_to_end(key)
+                self.hits += 1
+                return entries[key]
+            self.misses += 1
+            return default
+
+    def put(self, query: str, verdict: Any, challenge_id: Hashable = None):
+        key = self.key(query)
+        with self._lock:
+            entries = self._entries.setdefault(challenge_id, OrderedDict())
+            entries[key] = verdict
+            entries.move_to_end(key)
+            if len(entries) > self.max_entries:
+                entries.popitem(last=False)
+
+    def get_or_grade(self, query: str, grade: Callable[[str], Any], challenge_id: Hashable = None) -> Any:
+        """Devuelve el veredicto guardado o lo calcula con ``grade(query)`` y lo guarda."""
+        verdict = self.get(query, challenge_id, _MISSING)
+        if verdict is _MISSING:
+            verdict = grade(query)
+            self.put(query, verdict, challenge_id)
+        return verdict
+
+    def invalidate(self, challenge_id: Hashable = _MISSING):
+        """Olvida los veredictos de un reto (o de todos si no se indica)."""
+        with self._lock:
+            if challenge_id is _MISSING:
+                self._entries.clear()
+            else:
+                self._entries.pop(challenge_id, None)
+
+    def stats(self) -> Tuple[int, int]:
+        """(aciertos, fallos) de la caché."""
+        return self.hits, self.misses
@@ -1,13 +1,31 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
 import pandas as pd
 import sqlalchemy
 from sqlalchemy import create_engine
-from typing import Any, Dict, Tuple
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+# Máximo de resultados de soluciones memorizados
+SOLUTION_CACHE_SIZE = 256
+
+_engines: Dict[Hashable, sqlalchemy.engine.Engine] = {}
+_solution_cache: "OrderedDict[Tuple, pd.DataFrame]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+def _config_key(db_config: Dict[str, Any]) -> Hashable:
+    """Clave hashable e independiente del orden para una configuración."""
+    return tuple(sorted((k, str(v)) for k, v in db_config.items()))
 
 def get_db_engine(db_config: Dict[str, Any]) -> sqlalchemy.engine.Engine:
     """
     Crea un engine de SQLAlchemy para conectarse a la base de datos.
-    db_config debe contener: user, password, host, port, database, driver.
+    db_config debe contener: user, password, host, port, database, driver,
+    o bien una 'url' de SQLAlchemy completa (por ejemplo, sqlite:///retos.db).
     """
+    if "url" in db_config:
+        return create_engine(db_config["url"])
     # Ejemplo para SQL Server con pyodbc
     conn_str = (
         f"mssql+pyodbc://{db_config['user']}:{db_config['password']}@"
@@ -16,6 +34,63 @@ def get_db_engine(db_config: Dict[str, Any]) -> sqlalchemy.engine.Engine:
     )
     return create_engine(conn_str)
 
+def get_cached_engine(db_config: Dict[str, Any]) -> sqlalchemy.engine.Engine:
+    """
+    Devuelve el engine asociado a db_config, creándolo solo la primera vez.
+    Así se reutiliza también su pool de conexiones entre validaciones.
+    """
+    key = _config_key(db_config)
+    with _cache_lock:
+        engine = _engines.get(key)
+        if engine is None:
+            engine = _engines[key] = get_db_engine(db_config)
+        return engine
+
+def get_solution_result(
+    db_config: Dict[str, Any],
+    solution_query: str,
+    challenge_id: Optional[Hashable] = None,
+    dataset_version: Optional[Hashable] = None,
+) -> pd.DataFrame:
+    """
+    Devuelve el resultado de la consulta de referencia, ejecutándola solo si
+    no está memorizado para (base de datos, reto, consulta, versión de datos).
+    """
+    key = (_config_key(db_config), challenge_id, solution_query, dataset_version)
+    with _cache_lock:
+        cached = _solution_cache.get(key)
+        if cached is not None:
+            _solution_cache.move_to_end(key)
+            return cached
+    result = execute_query(get_cached_engine(db_config), solution_query)
+    with _cache_lock:
+        _solution_cache[key] = result
+        if len(_solution_cache) > SOLUTION_CACHE_SIZE:
+            _solution_cache.popitem(last=False)
+    return result
+
+def invalidate_dataset(db_config: Dict[str, Any], challenge_id: Optional[Hashable] = None) -> None:
+    """
+    Descarta las soluciones memorizadas de una base de datos (o solo de un
+    reto) cuando cambian sus datos.
+    """
+    config_key = _config_key(db_config)
+    with _cache_lock:
+        stale = [
+            key for key in _solution_cache
+            if key[0] == config_key and (challenge_id is None or key[1] == challenge_id)
+        ]
+        for key in stale:
+            del _solution_cache[key]
+
+def clear_caches() -> None:
+    """Vacía la memoria de soluciones y libera todos los engines."""
+    with _cache_lock:
+        _solution_cache.clear()
+        for engine in _engines.values():
+            engine.dispose()
+        _engines.clear()
+
 def execute_query(engine: sqlalchemy.engine.Engine, query: str) -> pd.DataFrame:
     """
     Ejecuta una consulta SQL y devuelve el resultado como DataFrame.
@@ -23,47 +98,124 @@ def execute_query(engine: sqlalchemy.engine.Engine, query: str) -> pd.DataFrame:
     with engine.connect() as conn:
         return pd.read_sql_query(query, conn)
 
-def normalize_df(df: pd.DataFrame) -> pd.DataFrame:
+def _canonical(df: pd.DataFrame, columns, float_decimals: Optional[int]) -> pd.DataFrame:
     """
-    Normaliza el DataFrame para comparación:
-    - Ordena columnas alfabéticamente
-    - Ordena filas por todas las columnas
-    - Resetea índices
-    - Convierte todos los valores a string para evitar problemas de tipos
+    Prepara las columnas para el hash: mismo orden de columnas, valores
+    numéricos como float64 (1 y 1.0 se consideran iguales) y, si se indica,
+    redondeo de decimales para tolerar diferencias de coma flotante.
     """
-    df = df.copy()
-    df = df[sorted(df.columns)]
-    df = df.sort_values(by=list(df.columns)).reset_index(drop=True)
-    return df.astype(str)
+    df = df[columns] if columns is not None else df
+    out = {}
+    for i, col in enumerate(df.columns):
+        series = df.iloc[:, i]
+        if pd.api.types.is_bool_dtype(series) or pd.api.types.is_numeric_dtype(series):
+            series = series.astype("float64")
+            if float_decimals is not None:
+                # + 0.0 convierte -0.0 (p. ej. -0.001 redondeado) en 0.0, que tiene otro hash
+                series = series.round(float_decimals) + 0.0
+        else:
+            series = series.astype(str)
+        out[i] = series.reset_index(drop=True)
+    return pd.DataFrame(out)
 
-def compare_results(user_df: pd.DataFrame, solution_df: pd.DataFrame) -> Tuple[bool, str]:
+def row_hashes(df: pd.DataFrame) -> pd.Series:
+    """Hash de 64 bits por fila, calculado de forma vectorizada."""
+    return pd.util.hash_pandas_object(df, index=False)
+
+def _diff_sample(hashes_a: pd.Series, hashes_b: pd.Series, rows_a: pd.DataFrame, limit: int) -> pd.DataFrame:
+    """Filas de A que sobran respecto a B (contando repeticiones), como mucho ``limit``."""
+    surplus = hashes_a.value_counts().sub(hashes_b.value_counts(), fill_value=0)
+    surplus = surplus[surplus > 0]
+    if surplus.empty:
+        return rows_a.iloc[0:0]
+    mask = hashes_a.isin(surplus.index).to_numpy()
+    return rows_a[mask].head(limit)
+
+def compare_results(
+    user_df: pd.DataFrame,
+    solution_df: pd.DataFrame,
+    order_sensitive: bool = False,
+    float_decimals: Optional[int] = None,
+    max_diff_rows: int = 10,
+) -> Tuple[bool, str]:
     """
-    Compara dos DataFrames normalizados.
+    Compara el resultado del usuario con el de la solución.
+
+    - Sale en cuanto el número de filas/columnas o los nombres de columna no coinciden.
+    - Compara un hash de 64 bits por fila como multiconjunto (o en orden si
+      order_sensitive=True), sin ordenar ni convertir todo a texto.
+    - float_decimals redondea los valores numéricos antes de comparar.
+    - Solo si hay diferencias se construye una muestra de hasta max_diff_rows filas.
+
     Devuelve (True, "") si son iguales, (False, mensaje de error) si no.
     """
-    user_norm = normalize_df(user_df)
-    sol_norm = normalize_df(solution_df)
-    if user_norm.equals(sol_norm):
-        return True, ""
+    if user_df.shape[1] != solution_df.shape[1] or sorted(map(str, user_df.columns)) != sorted(map(str, solution_df.columns)):
+        return False, (
+            f"Las columnas no coinciden.\n"
+            f"Esperadas: {list(solution_df.columns)}\n"
+            f"Obtenidas: {list(user_df.columns)}"
+        )
+    if len(user_df) != len(solution_df):
+        return False, (
+            f"Número de filas distinto: se esperaban {len(solution_df)} "
+            f"y la consulta devolvió {len(user_df)}."
+        )
+
+    # Alinear el orden de columnas del usuario con el de la solución
+    columns = list(solution_df.columns) if user_df.columns.is_unique else None
+    user_canon = _canonical(user_df, columns, float_decimals)
+    sol_canon = _canonical(solution_df, None, float_decimals)
+    user_hashes = row_hashes(user_canon)
+    sol_hashes = row_hashes(sol_canon)
+
+    if order_sensitive:
+        equal = (user_hashes.to_numpy() == sol_hashes.to_numpy()).all()
     else:
-        diff_user = user_norm[~user_norm.apply(tuple, 1).isin(sol_norm.apply(tuple, 1))]
-        diff_sol = sol_norm[~sol_norm.apply(tuple, 1).isin(user_norm.apply(tuple, 1))]
-        msg = (
-            f"Diferencias encontradas:\n"
-            f"En respuesta del usuario y no en la solución:\n{diff_user}\n\n"
-            f"En la solución y no en la respuesta del usuario:\n{diff_sol}"
+        equal = (np.sort(user_hashes.to_numpy()) == np.sort(sol_hashes.to_numpy())).all()
+    if equal:
+        return True, ""
+
+    if order_sensitive:
+        mismatch = np.flatnonzero(user_hashes.to_numpy() != sol_hashes.to_numpy())
+        first = int(mismatch[0])
+        if np.array_equal(np.sort(user_hashes.to_numpy()), np.sort(sol_hashes.to_numpy())):
+            return False, (
+                f"Las filas son correctas pero el orden no: la primera diferencia está en la fila {first}."
+            )
+        return False, (
+            f"Diferencias encontradas a partir de la fila {first}:\n"
+            f"Respuesta del usuario:\n{user_df.iloc[mismatch[:max_diff_rows]]}\n\n"
+            f"Solución:\n{solution_df.iloc[mismatch[:max_diff_rows]]}"
         )
-        return False, msg
+
+    user_rows = user_df[columns] if columns is not None else user_df
+    diff_user = _diff_sample(user_hashes, sol_hashes, user_rows.reset_index(drop=True), max_diff_rows)
+    diff_sol = _diff_sample(sol_hashes, user_hashes, solution_df.reset_index(drop=True), max_diff_rows)
+    msg = (
+        f"Diferencias encontradas:\n"
+        f"En respuesta del usuario y no en la solución:\n{diff_user}\n\n"
+        f"En la solución y no en la respuesta del usuario:\n{diff_sol}"
+    )
+    return False, msg
 
 def validate_sql_answer(
     db_config: Dict[str, Any],
     user_query: str,
-    solution_query: str
+    solution_query: str,
+    challenge_id: Optional[Hashable] = None,
+    dataset_version: Optional[Hashable] = None,
+    order_sensitive: bool = False,
+    float_decimals: Optional[int] = None,
 ) -> Tuple[bool, str]:
     """
     Valida la respuesta SQL del usuario comparando el resultado con la solución esperada.
+    El engine y el resultado de la solución se reutilizan entre llamadas, por lo
+    que en cada validación solo se ejecuta la consulta del usuario. Cambiar
+    dataset_version (o llamar a invalidate_dataset) fuerza a recalcular la solución.
     """
-    engine = get_db_engine(db_config)
+    engine = get_cached_engine(db_config)
+    solution_df = get_solution_result(db_config, solution_query, challenge_id, dataset_version)
     user_df = execute_query(engine, user_query)
-    solution_df = execute_query(engine, solution_query)
-    return compare_results(user_df, solution_df)
\ No newline at end of file
+    return compare_results(
+        user_df, solution_df, order_sensitive=order_sensitive, float_decimals=float_decimals
+    )
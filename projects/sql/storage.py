@@ -1,21 +1,103 @@
+import atexit
 import json
 import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_PROGRESS = {"levels_completed": [], "points": 0, "achievements": []}
 
 class ProgressStorage:
-    def __init__(self, storage_file="progress.json"):
+    """
+    Guarda el progreso de cada jugador en una fila propia de SQLite.
+
+    Las escrituras se acumulan en un buffer (una entrada por jugador) y se
+    vuelcan juntas con un upsert en una sola transacción cuando el buffer
+    alcanza ``batch_size`` o han pasado ``flush_interval`` segundos. La base
+    de datos usa WAL para que varios procesos lean mientras otro escribe.
+    Si existe un ``progress.json`` antiguo, se importa la primera vez.
+    """
+
+    def __init__(self, storage_file="progress.db", batch_size=64, flush_interval=2.0, legacy_file="progress.json"):
         self.storage_file = storage_file
-        if not os.path.exists(self.storage_file):
-            with open(self.storage_file, "w") as f:
-                json.dump({}, f)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._pending = {}
+        self._last_flush = time.monotonic()
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(storage_file, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+        CREATE TABLE IF NOT EXISTS player_progress (
+            player_id TEXT PRIMARY KEY,
+            progress TEXT NOT NULL,
+            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+        """)
+        self._conn.commit()
+        if legacy_file and os.path.exists(legacy_file):
+            self._import_legacy(legacy_file)
+        atexit.register(self.close)
+
+    def _import_legacy(self, legacy_file):
+        """Importa progress.json si la tabla aún está vacía."""
+        if self._conn.execute("SELECT 1 FROM player_progress LIMIT 1").fetchone():
+            return
+        try:
+            with open(legacy_file, "r") as f:
+                data, _ = json.JSONDecoder().raw_decode(f.read())
+        except (OSError, json.JSONDecodeError):
+            return
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO player_progress (player_id, progress) VALUES (?, ?)",
+                [(str(pid), json.dumps(progress)) for pid, progress in data.items()],
+            )
 
     def save_progress(self, player_id: int, progress: dict):
-        with open(self.storage_file, "r+") as f:
-            data = json.load(f)
-            data[str(player_id)] = progress
-            f.seek(0)
-            json.dump(data, f, indent=4)
+        with self._lock:
+            self._pending[str(player_id)] = json.dumps(progress)
+            if len(self._pending) >= self.batch_size or time.monotonic() - self._last_flush >= self.flush_interval:
+                self.flush()
+
+    def flush(self):
+        """Escribe en disco todo el progreso pendiente en una única transacción."""
+        with self._lock:
+            if self._pending:
+                with self._conn:
+                    self._conn.executemany(
+                        """
+                        INSERT INTO player_progress (player_id, progress, updated_at)
+                        VALUES (?, ?, CURRENT_TIMESTAMP)
+                        ON CONFLICT(player_id) DO UPDATE SET
+                            progress = excluded.progress,
+                            updated_at = excluded.updated_at
+                        """,
+                        list(self._pending.items()),
+                    )
+                self._pending.clear()
+            self._last_flush = time.monotonic()
 
     def load_progress(self, player_id: int) -> dict:
-        with open(self.storage_file, "r") as f:
-            data = json.load(f)
-            return data.get(str(player_id), {"levels_completed": [], "points": 0, "achievements": []})
\ No newline at end of file
+        key = str(player_id)
+        with self._lock:
+            pending = self._pending.get(key)
+            if pending is not None:
+                return json.loads(pending)
+            row = self._conn.execute(
+                "SELECT progress FROM player_progress WHERE player_id = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return {k: (list(v) if isinstance(v, list) else v) for k, v in DEFAULT_PROGRESS.items()}
+        return json.loads(row[0])
+
+    def close(self):
+        """Vuelca el buffer y cierra la conexión."""
+        with self._lock:
+            if self._conn is None:
+                return
+            self.flush()
+            self._conn.close()
+            self._conn = None
+        atexit.unregister(self.close)
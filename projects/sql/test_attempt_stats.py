@@ -0,0 +1,132 @@
+import contextlib
+import io
+import sqlite3
+import unittest
+
+from attempt_stats import (
+    all_challenge_stats,
+    challenge_stats,
+    median_attempts_to_solve,
+    median_time_to_solve,
+    success_rate,
+    user_progress,
+)
+from db_schema import create_tables, refresh_challenge_stats
+from difficulty_adjuster import DifficultyAdjuster
+
+# (usuario, reto, correcto, fecha)
+ATTEMPTS = [
+    (1, 10, 0, "2024-01-01 10:00:00"),
+    (1, 10, 0, "2024-01-01 10:01:00"),
+    (1, 10, 1, "2024-01-01 10:05:00"),
+    (1, 10, 1, "2024-01-01 10:06:00"),
+    (2, 10, 1, "2024-01-01 11:00:00"),
+    (3, 10, 0, "2024-01-01 12:00:00"),
+    (3, 10, 1, "2024-01-01 12:00:30"),
+    (4, 10, 0, "2024-01-01 13:00:00"),
+    (2, 20, 0, "2024-01-02 09:00:00"),
+]
+
+class TestAttemptStats(unittest.TestCase):
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        with contextlib.redirect_stdout(io.StringIO()):
+            create_tables(self.conn)
+        self.conn.executemany(
+            "INSERT INTO user_attempts (user_id, challenge_id, submitted_query, is_correct, attempt_time) "
+            "VALUES (?, ?, 'SELECT 1', ?, ?)",
+            ATTEMPTS,
+        )
+
+    def tearDown(self):
+        self.conn.close()
+
+    def test_triggers_keep_stats_up_to_date(self):
+        stats = challenge_stats(self.conn, 10)
+        self.assertEqual((stats["attempts"], stats["correct_attempts"]), (8, 4))
+        self.assertEqual(stats["last_attempt_time"], "2024-01-01 13:00:00")
+        self.assertAlmostEqual(success_rate(self.conn, 10), 0.5)
+
+        self.conn.execute("UPDATE user_attempts SET is_correct = 1 WHERE user_id = 4")
+        self.conn.execute("UPDATE user_attempts SET challenge_id = 20 WHERE user_id = 3 AND is_correct = 0")
+        self.conn.execute("DELETE FROM user_attempts WHERE user_id = 1 AND is_correct = 0")
+        self.assertEqual(challenge_stats(self.conn, 10)["attempts"], 5)
+        self.assertEqual(challenge_stats(self.conn, 10)["correct_attempts"], 5)
+        self.assertEqual(challenge_stats(self.conn, 20)["attempts"], 2)
+
+    def test_last_attempt_time_follows_moves_and_deletes(self):
+        # El último intento del reto 10 (usuario 4, 13:00) pasa al reto 20
+        self.conn.execute("UPDATE user_attempts SET challenge_id = 20 WHERE user_id = 4")
+        self.assertEqual(challenge_stats(self.conn, 10)["last_attempt_time"], "2024-01-01 12:00:30")
+        self.assertEqual(challenge_stats(self.conn, 20)["last_attempt_time"], "2024-01-02 09:00:00")
+        self.conn.execute("DELETE FROM user_attempts WHERE challenge_id = 20 AND user_id = 2")
+        self.assertEqual(challenge_stats(self.conn, 20)["last_attempt_time"], "2024-01-01 13:00:00")
+        self.conn.execute("UPDATE user_attempts SET attempt_time = '2024-01-03 08:00:00' WHERE user_id = 1 AND is_correct = 0")
+        self.assertEqual(challenge_stats(self.conn, 10)["last_attempt_time"], "2024-01-03 08:00:00")
+        self.conn.execute("DELETE FROM user_attempts WHERE challenge_id = 20")
+        self.assertIsNone(challenge_stats(self.conn, 20)["last_attempt_time"])
+        incremental = all_challenge_stats(self.conn)
+        refresh_challenge_stats(self.conn)
+        self.assertEqual({k: v for k, v in incremental.items() if v["intentos"]}, all_challenge_stats(self.conn))
+
+    def test_materialized_stats_match_refresh(self):
+        self.conn.execute("DELETE FROM user_attempts WHERE user_id = 2")
+        incremental = all_challenge_stats(self.conn)
+        refresh_challenge_stats(self.conn)
+        recomputed = all_challenge_stats(self.conn)
+        self.assertEqual(
+            {k: v for k, v in incremental.items() if v["intentos"]},
+            recomputed,
+        )
+
+    def test_unknown_challenge_has_zero_stats(self):
+        self.assertEqual(challenge_stats(self.conn, 99)["attempts"], 0)
+        self.assertEqual(success_rate(self.conn, 99), 0.0)
+        self.assertIsNone(median_attempts_to_solve(self.conn, 99))
+
+    def test_medians(self):
+        # Intentos hasta el primer acierto: 3, 1, 2 -> mediana 2
+        self.assertEqual(median_attempts_to_solve(self.conn, 10), 2)
+        # Segundos hasta el primer acierto: 300, 0, 30 -> mediana 30
+        self.assertAlmostEqual(median_time_to_solve(self.conn, 10), 30, places=3)
+        self.conn.execute(
+            "INSERT INTO user_attempts (user_id, challenge_id, submitted_query, is_correct, attempt_time) "
+            "VALUES (4, 10, 'SELECT 1', 1, '2024-01-01 13:01:00')"
+        )
+        # Intentos 3, 1, 2, 2 -> mediana 2; segundos 300, 0, 30, 60 -> mediana 45
+        self.assertEqual(median_attempts_to_solve(self.conn, 10), 2)
+        self.assertAlmostEqual(median_time_to_solve(self.conn, 10), 45, places=3)
+
+    def test_user_progress(self):
+        progress = user_progress(self.conn, 2)
+        self.assertEqual([p["challenge_id"] for p in progress], [10, 20])
+        self.assertTrue(progress[0]["solved"])
+        self.assertFalse(progress[1]["solved"])
+        self.assertEqual(user_progress(self.conn, 99), [])
+
+    def test_queries_use_indexes(self):
+        plan = " ".join(
+            row[-1] for row in self.conn.execute(
+                "EXPLAIN QUERY PLAN SELECT * FROM user_attempts WHERE user_id = 1 ORDER BY attempt_time"
+            )
+        )
+        self.assertIn("idx_user_attempts_user_time", plan)
+        plan = " ".join(
+            row[-1] for row in self.conn.execute(
+                "EXPLAIN QUERY PLAN SELECT * FROM user_attempts WHERE challenge_id = 10 ORDER BY attempt_time"
+            )
+        )
+        self.assertIn("idx_user_attempts_challenge_time", plan)
+
+    def test_difficulty_adjuster_reads_materialized_stats(self):
+        retos = [
+            {"id": 10, "dificultad": 3, "aciertos": 0, "intentos": 0},
+            {"id": 20, "dificultad": 3, "aciertos": 0, "intentos": 0},
+        ]
+        ajustador = DifficultyAdjuster(retos)
+        ajustador.recalibrar_desde_bd(self.conn)
+        self.assertEqual((retos[0]["aciertos"], retos[0]["intentos"]), (4, 8))
+        self.assertEqual((retos[1]["aciertos"], retos[1]["intentos"]), (0, 1))
+
+if __name__ == "__main__":
+    unittest.main()
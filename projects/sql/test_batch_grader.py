@@ -0,0 +1,133 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from batch_grader import regrade_attempts
+from db_schema import create_tables
+
+class TestBatchGrader(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.attempts_db = os.path.join(self.tmpdir.name, "sqlgame.db")
+        self.challenge_db = os.path.join(self.tmpdir.name, "retos.db")
+
+        conn = sqlite3.connect(self.challenge_db)
+        conn.execute("CREATE TABLE canciones (titulo TEXT, reproducciones INTEGER)")
+        conn.executemany("INSERT INTO canciones VALUES (?, ?)",
+                         [("Imagine", 150), ("Yesterday", 200), ("Hey Jude", 180)])
+        conn.commit()
+        conn.close()
+
+        conn = sqlite3.connect(self.attempts_db)
+        create_tables(conn)
+        queries = [
+            "SELECT titulo FROM canciones WHERE reproducciones > 160",
+            "SELECT titulo FROM canciones WHERE reproducciones > 100",
+            "DELETE FROM canciones",
+            "SELECT titulo FROM canciones WHERE reproducciones >= 180 ORDER BY titulo",
+            "SELEC mal escrito",
+        ] * 40
+        conn.executemany(
+            "INSERT INTO user_attempts (user_id, challenge_id, submitted_query, is_correct) VALUES (1, 2, ?, NULL)",
+            [(q,) for q in queries],
+        )
+        conn.execute("INSERT INTO user_attempts (user_id, challenge_id, submitted_query) VALUES (1, 99, 'SELECT 1')")
+        conn.commit()
+        conn.close()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_regrade_writes_back_results(self):
+        solutions = {2: "SELECT titulo FROM canciones WHERE reproducciones > 160"}
+        summary = regrade_attempts(self.attempts_db, self.challenge_db, solutions,
+                                   workers=2, chunk_size=16, write_batch=50)
+        self.assertEqual(summary["graded"], 200)
+        self.assertEqual(summary["correct"], 80)
+        self.assertEqual(summary["skipped"], 1)
+
+        conn = sqlite3.connect(self.attempts_db)
+        verdicts = dict(conn.execute(
+            "SELECT submitted_query, MIN(is_correct) FROM user_attempts WHERE challenge_id = 2 GROUP BY submitted_query"
+        ).fetchall())
+        conn.close()
+        self.assertEqual(verdicts["SELECT titulo FROM canciones WHERE reproducciones > 160"], 1)
+        self.assertEqual(verdicts["SELECT titulo FROM canciones WHERE reproducciones >= 180 ORDER BY titulo"], 1)
+        self.assertEqual(verdicts["DELETE FROM canciones"], 0)
+        self.assertEqual(verdicts["SELEC mal escrito"], 0)
+
+        # El DELETE no tocó la base de datos del reto
+        conn = sqlite3.connect(self.challenge_db)
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM canciones").fetchone()[0], 3)
+        conn.close()
+
+    def test_only_selected_challenges_are_regraded(self):
+        summary = regrade_attempts(self.attempts_db, self.challenge_db, {99: "SELECT 1"},
+                                   challenge_ids=[99], workers=1)
+        self.assertEqual(
+            summary,
+            {"graded": 1, "correct": 1, "changed": 1, "skipped": 0, "errors": 0, "solution_errors": {}},
+        )
+
+    def _insert_attempts(self, challenge_id, queries):
+        conn = sqlite3.connect(self.attempts_db)
+        conn.executemany(
+            "INSERT INTO user_attempts (user_id, challenge_id, submitted_query) VALUES (1, ?, ?)",
+            [(challenge_id, q) for q in queries],
+        )
+        conn.commit()
+        conn.close()
+
+    def _verdicts(self, challenge_id):
+        conn = sqlite3.connect(self.attempts_db)
+        verdicts = conn.execute(
+            "SELECT submitted_query, is_correct FROM user_attempts WHERE challenge_id = ? ORDER BY id",
+            (challenge_id,),
+        ).fetchall()
+        conn.close()
+        return verdicts
+
+    def test_attempt_cannot_disable_read_only_snapshot(self):
+        self._insert_attempts(7, ["PRAGMA query_only=0", "PRAGMA query_only(0)", "DELETE FROM canciones",
+                                   "SELECT titulo FROM canciones"])
+        summary = regrade_attempts(self.attempts_db, self.challenge_db, {7: "SELECT titulo FROM canciones"},
+                                   challenge_ids=[7], workers=1, chunk_size=1)
+        self.assertEqual(summary["correct"], 1)
+        self.assertEqual([v for _, v in self._verdicts(7)], [0, 0, 0, 1])
+
+    def test_broken_solution_is_reported_per_challenge(self):
+        self._insert_attempts(7, ["SELECT titulo FROM canciones"])
+        self._insert_attempts(8, ["SELECT titulo FROM canciones"])
+        solutions = {7: "SELECT titulo FROM no_existe", 8: "SELECT titulo FROM canciones"}
+        summary = regrade_attempts(self.attempts_db, self.challenge_db, solutions,
+                                   challenge_ids=[7, 8], workers=1)
+        self.assertEqual((summary["graded"], summary["correct"], summary["errors"]), (1, 1, 1))
+        self.assertIn("no_existe", summary["solution_errors"][7])
+        self.assertEqual(self._verdicts(7), [("SELECT titulo FROM canciones", None)])
+
+    def test_column_names_must_match(self):
+        self._insert_attempts(7, ["SELECT titulo AS nombre FROM canciones", "SELECT titulo FROM canciones"])
+        regrade_attempts(self.attempts_db, self.challenge_db, {7: "SELECT titulo FROM canciones"},
+                         challenge_ids=[7], workers=1)
+        self.assertEqual([v for _, v in self._verdicts(7)], [0, 1])
+
+    def test_results_over_max_rows_are_not_compared_truncated(self):
+        self._insert_attempts(7, ["SELECT titulo FROM canciones WHERE reproducciones > 160"])
+        self._insert_attempts(8, ["SELECT titulo FROM canciones ORDER BY titulo"])
+        solutions = {
+            7: "SELECT titulo FROM canciones WHERE reproducciones > 160 ORDER BY titulo",
+            8: "SELECT titulo FROM canciones WHERE reproducciones > 160 ORDER BY titulo",
+        }
+        summary = regrade_attempts(self.attempts_db, self.challenge_db, solutions,
+                                   challenge_ids=[7, 8], workers=1, max_rows=2)
+        self.assertEqual((summary["graded"], summary["correct"]), (2, 1))
+        self.assertEqual([v for _, v in self._verdicts(8)], [0])
+
+        summary = regrade_attempts(self.attempts_db, self.challenge_db, {7: "SELECT titulo FROM canciones"},
+                                   challenge_ids=[7], workers=1, max_rows=2)
+        self.assertEqual(summary["errors"], 1)
+        self.assertIn("2 filas", summary["solution_errors"][7])
+
+if __name__ == '__main__':
+    unittest.main()
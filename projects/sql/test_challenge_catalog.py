@@ -0,0 +1,73 @@
+import json
+import os
+import tempfile
+import unittest
+
+from challenge_catalog import FORMAT_VERSION, ChallengeCatalog, build_entries, extract_keywords, load_catalog
+from levels import get_sql_levels
+from utils import mostrar_ejemplo
+
+class TestChallengeCatalog(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "catalog.json")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_indexes_cover_every_source(self):
+        catalog = ChallengeCatalog(build_entries())
+        self.assertEqual(catalog.get("levels", 7).title, "JOIN básico")
+        self.assertEqual(catalog.get("retos", 2).level, 2)
+        self.assertIsNotNone(catalog.get("tipos", "Subconsultas"))
+        self.assertEqual(len(catalog.source("practica")), 3)
+        self.assertEqual({e.uid for e in catalog.level(4)}, {"levels:7", "levels:8"})
+        self.assertIn("levels:6", {e.uid for e in catalog.keyword("group by")})
+        self.assertTrue(all(e.difficulty == "Difícil" for e in catalog.level(5)))
+
+    def test_prefix_search_ignores_case_and_accents(self):
+        catalog = ChallengeCatalog(build_entries())
+        self.assertEqual([e.uid for e in catalog.search("join b")], ["levels:7"])
+        self.assertEqual([e.uid for e in catalog.search("DETECCION")], ["tipos:Detección de duplicados"])
+        self.assertEqual(len(catalog.search("con", limit=2)), 2)
+
+    def test_catalog_is_immutable(self):
+        catalog = ChallengeCatalog(build_entries())
+        with self.assertRaises(TypeError):
+            catalog.by_level[99] = ()
+        with self.assertRaises(AttributeError):
+            catalog.get("levels", 1).title = "otro"
+
+    def test_compiled_form_is_reused_until_sources_change(self):
+        built = load_catalog(self.path)
+        with open(self.path, encoding="utf-8") as f:
+            data = json.load(f)
+        self.assertEqual(data["version"], FORMAT_VERSION)
+        self.assertEqual(list(load_catalog(self.path)), list(built))
+
+        data["source_hash"] = "obsoleto"
+        data["entries"] = data["entries"][:1]
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        self.assertEqual(len(load_catalog(self.path)), len(built))
+
+    def test_keywords_and_helpers(self):
+        self.assertEqual(extract_keywords("select a from t group by a order by a"), ("GROUP BY", "ORDER BY", "SELECT"))
+        self.assertIs(get_sql_levels()[0], get_sql_levels()[0])
+        self.assertEqual(mostrar_ejemplo("Eliminación de duplicados"), "SELECT DISTINCT propietario FROM mascota;")
+        self.assertIsNone(mostrar_ejemplo("No existe"))
+
+    def test_shared_levels_cannot_be_mutated(self):
+        level = get_sql_levels()[0]
+        challenge = level.challenges[0]
+        with self.assertRaises(AttributeError):
+            level.challenges.append(challenge)
+        with self.assertRaises(AttributeError):
+            challenge.hints.append("otra pista")
+        with self.assertRaises(TypeError):
+            challenge.required_sql[0] = "DELETE"
+        self.assertEqual(len(get_sql_levels()[0].challenges), len(level.challenges))
+        self.assertEqual(hash(level), hash(get_sql_levels()[0]))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import sqlite3
+import unittest
+from collections import Counter
+
+from data_generator import generate_dataset
+
+def _dump(conn):
+    return [
+        conn.execute(f"SELECT * FROM {table} ORDER BY id").fetchall()
+        for table in ("departments", "employees", "projects", "employee_projects")
+    ]
+
+class TestDataGenerator(unittest.TestCase):
+    def _generate(self, seed=7, **kwargs):
+        conn = sqlite3.connect(":memory:")
+        params = dict(employees=2000, departments=10, projects=50, seed=seed)
+        params.update(kwargs)
+        counts = generate_dataset(conn, **params)
+        return conn, counts
+
+    def test_same_seed_same_data(self):
+        a, _ = self._generate(seed=3)
+        b, _ = self._generate(seed=3)
+        c, _ = self._generate(seed=4)
+        self.assertEqual(_dump(a), _dump(b))
+        self.assertNotEqual(_dump(a), _dump(c))
+
+    def test_counts_and_foreign_keys(self):
+        conn, counts = self._generate()
+        self.assertEqual(counts["employees"], 2000)
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM departments").fetchone()[0], 10)
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM employee_projects").fetchone()[0], counts["employee_projects"])
+        orphans = conn.execute("""
+            SELECT COUNT(*) FROM employee_projects ep
+            LEFT JOIN employees e ON e.id = ep.employee_id
+            LEFT JOIN projects p ON p.id = ep.project_id
+            WHERE e.id IS NULL OR p.id IS NULL
+        """).fetchone()[0]
+        self.assertEqual(orphans, 0)
+        indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        self.assertIn("idx_employees_department", indexes)
+
+    def test_departments_are_skewed(self):
+        conn, _ = self._generate(skew=1.2)
+        sizes = Counter(dict(conn.execute(
+            "SELECT department_id, COUNT(*) FROM employees WHERE department_id IS NOT NULL GROUP BY department_id"
+        ).fetchall()))
+        largest = sizes.most_common(1)[0][1]
+        self.assertGreater(largest, 3 * sum(sizes.values()) / len(sizes) / 2)
+
+    def test_appends_after_existing_rows(self):
+        conn, _ = self._generate(employees=100)
+        counts = generate_dataset(conn, employees=100, departments=2, projects=5, seed=1)
+        self.assertEqual(counts["employees"], 100)
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM employees").fetchone()[0], 200)
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM departments").fetchone()[0], 12)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+import contextlib
+import io
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from dataset_loader import PARQUET_AVAILABLE, infer_type, load_csv, load_file
+from db_schema import create_tables
+
+class TestDatasetLoader(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.conn = sqlite3.connect(":memory:")
+        with contextlib.redirect_stdout(io.StringIO()):
+            create_tables(self.conn)
+
+    def tearDown(self):
+        self.conn.close()
+        self.tmp.cleanup()
+
+    def write(self, name, text):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            f.write(text)
+        return path
+
+    def test_infer_type(self):
+        self.assertEqual(infer_type(["1", "", "-3"]), "INTEGER")
+        self.assertEqual(infer_type(["1", "2.5"]), "REAL")
+        self.assertEqual(infer_type(["1.5", "2"]), "REAL")
+        self.assertEqual(infer_type(["1", "x"]), "TEXT")
+        self.assertEqual(infer_type(["28001", "08001"]), "TEXT")
+        self.assertEqual(infer_type(["", ""]), "TEXT")
+        self.assertEqual(infer_type(["1e3", ".5", "-2."]), "REAL")
+        for value in ("1_000", "nan", "inf", "-Infinity", " 1 ", "1 "):
+            self.assertEqual(infer_type(["1", value]), "TEXT", value)
+
+    def test_loads_into_existing_schema(self):
+        path = self.write(
+            "employees.csv",
+            "first_name,last_name,department_id,hire_date,salary\n"
+            "Ana,García,1,2022-01-15,25000\n"
+            "Luis,Pérez,,2021-09-01,32000.5\n",
+        )
+        report = load_csv(self.conn, path)
+        self.assertEqual((report.table, report.rows), ("employees", 2))
+        self.assertGreater(report.rows_per_second, 0)
+        rows = self.conn.execute(
+            "SELECT first_name, department_id, typeof(salary), salary FROM employees ORDER BY id"
+        ).fetchall()
+        self.assertEqual(rows, [("Ana", 1, "real", 25000.0), ("Luis", None, "real", 32000.5)])
+
+    def test_creates_table_with_inferred_types(self):
+        path = self.write("ventas.csv", "id,cp,importe,nota\n1,08001,10,\n2,28001,12.5,urgente\n")
+        load_file(self.conn, path, infer_rows=1)
+        types = {row[1]: row[2] for row in self.conn.execute("PRAGMA table_info(ventas)")}
+        self.assertEqual(types, {"id": "INTEGER", "cp": "TEXT", "importe": "INTEGER", "nota": "TEXT"})
+        self.assertEqual(
+            self.conn.execute("SELECT cp, importe, nota FROM ventas ORDER BY id").fetchall(),
+            [("08001", 10, None), ("28001", 12.5, "urgente")],
+        )
+
+    def test_indexes_are_recreated_after_load(self):
+        self.conn.execute("CREATE INDEX idx_projects_start ON projects(start_date)")
+        path = self.write("projects.csv", "name,start_date\n" + "".join(f"p{i},2024-01-{i % 28 + 1:02d}\n" for i in range(500)))
+        report = load_csv(self.conn, path, batch_size=64, indexes=["CREATE INDEX idx_projects_name ON projects(name)"])
+        self.assertEqual(report.rows, 500)
+        names = {row[0] for row in self.conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        self.assertTrue({"idx_projects_start", "idx_projects_name"} <= names)
+        self.assertEqual(self.conn.execute("PRAGMA integrity_check").fetchone()[0], "ok")
+
+    def test_failed_load_rolls_back(self):
+        self.conn.execute("CREATE INDEX idx_projects_start ON projects(start_date)")
+        self.conn.commit()
+        path = self.write("projects.csv", "name,start_date\nuno,2024-01-01\n,2024-01-02\n")
+        with self.assertRaises(sqlite3.IntegrityError):
+            load_csv(self.conn, path)
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM projects").fetchone()[0], 0)
+        names = {row[0] for row in self.conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        self.assertIn("idx_projects_start", names)
+
+    def test_unknown_columns_are_rejected(self):
+        path = self.write("departments.csv", "name,budget\nVentas,100\n")
+        with self.assertRaises(ValueError):
+            load_csv(self.conn, path)
+
+    def test_unsupported_extension(self):
+        with self.assertRaises(ValueError):
+            load_file(self.conn, self.write("datos.json", "{}"))
+
+    @unittest.skipUnless(PARQUET_AVAILABLE, "pyarrow no está instalado")
+    def test_parquet(self):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        path = os.path.join(self.tmp.name, "medidas.parquet")
+        pq.write_table(pa.table({"id": [1, 2, 3], "valor": [1.5, None, 3.0], "etiqueta": ["a", "b", None]}), path)
+        report = load_file(self.conn, path, batch_size=2)
+        self.assertEqual(report.rows, 3)
+        self.assertEqual(
+            self.conn.execute("SELECT * FROM medidas ORDER BY id").fetchall(),
+            [(1, 1.5, "a"), (2, None, "b"), (3, 3.0, None)],
+        )
+
+if __name__ == "__main__":
+    unittest.main()
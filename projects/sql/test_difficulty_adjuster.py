@@ -1,21 +1,111 @@
+import contextlib
+import io
+import random
+import sqlite3
+import unittest
+
+from db_schema import create_tables
 from difficulty_adjuster import DifficultyAdjuster
 
-# Simulación de retos con resultados de pruebas iniciales
-retos = [
-    {'id': 1, 'dificultad': 2, 'aciertos': 18, 'intentos': 20},
-    {'id': 2, 'dificultad': 3, 'aciertos': 5, 'intentos': 20},
-    {'id': 3, 'dificultad': 4, 'aciertos': 10, 'intentos': 20},
-    {'id': 4, 'dificultad': 1, 'aciertos': 1, 'intentos': 20},
-    {'id': 5, 'dificultad': 5, 'aciertos': 19, 'intentos': 20},
-]
-
-ajustador = DifficultyAdjuster(retos)
-ajustador.ajustar_dificultad()
-
-print("Retos ajustados:")
-for reto in ajustador.obtener_retos():
-    print(f"Reto {reto['id']}: dificultad {reto['dificultad']} (aciertos: {reto['aciertos']}, intentos: {reto['intentos']})")
-
-# Ejemplo de selección de reto para un jugador de nivel 3
-reto_para_jugador = ajustador.seleccionar_reto_para_jugador(3)
-print(f"\nReto sugerido para jugador de nivel 3: {reto_para_jugador}")
\ No newline at end of file
+def _retos():
+    # Simulación de retos con resultados de pruebas iniciales
+    return [
+        {'id': 1, 'dificultad': 2, 'aciertos': 18, 'intentos': 20},
+        {'id': 2, 'dificultad': 3, 'aciertos': 5, 'intentos': 20},
+        {'id': 3, 'dificultad': 4, 'aciertos': 10, 'intentos': 20},
+        {'id': 4, 'dificultad': 1, 'aciertos': 1, 'intentos': 20},
+        {'id': 5, 'dificultad': 5, 'aciertos': 19, 'intentos': 20},
+    ]
+
+def _seleccion_original(retos, nivel_jugador):
+    """Selección de referencia: recorrido lineal y min() sobre la lista."""
+    exactos = [r for r in retos if r['dificultad'] == nivel_jugador]
+    if exactos:
+        return exactos
+    return [min(retos, key=lambda r: abs(r['dificultad'] - nivel_jugador))]
+
+class TestDifficultyAdjuster(unittest.TestCase):
+    def assertIndexConsistent(self, ajustador):
+        for reto in ajustador.obtener_retos():
+            cubeta = ajustador._cubetas[reto['dificultad']]
+            self.assertIs(cubeta[ajustador._posicion[reto['id']]], reto)
+        self.assertEqual(ajustador._niveles, sorted({r['dificultad'] for r in ajustador.obtener_retos()}))
+        self.assertEqual(sum(len(c) for c in ajustador._cubetas.values()), len(ajustador.obtener_retos()))
+
+    def test_adjustment_moves_challenges_between_buckets(self):
+        ajustador = DifficultyAdjuster(_retos())
+        ajustador.ajustar_dificultad()
+        dificultades = {r['id']: r['dificultad'] for r in ajustador.obtener_retos()}
+        self.assertEqual(dificultades, {1: 3, 2: 2, 3: 4, 4: 1, 5: 5})
+        self.assertEqual(ajustador._niveles, [1, 2, 3, 4, 5])
+        self.assertEqual([r['id'] for r in ajustador._cubetas[3]], [1])
+        self.assertIndexConsistent(ajustador)
+
+    def test_only_challenges_with_new_attempts_are_reevaluated(self):
+        ajustador = DifficultyAdjuster(_retos())
+        ajustador.ajustar_dificultad()
+        # Un cambio a mano sin intento registrado no se reevalúa
+        ajustador._por_id[3]['aciertos'] = 20
+        ajustador.ajustar_dificultad()
+        self.assertEqual(ajustador._por_id[3]['dificultad'], 4)
+        ajustador.registrar_intento(3, True)
+        self.assertEqual(ajustador._por_id[3]['intentos'], 21)
+        ajustador.ajustar_dificultad()
+        self.assertEqual(ajustador._por_id[3]['dificultad'], 5)
+        self.assertEqual(ajustador._niveles, [1, 2, 3, 5])
+        self.assertIndexConsistent(ajustador)
+
+    def test_random_rerating_keeps_index_consistent(self):
+        rng = random.Random(3)
+        retos = [{'id': i, 'dificultad': rng.randint(1, 5), 'aciertos': 0, 'intentos': 0} for i in range(60)]
+        ajustador = DifficultyAdjuster(retos)
+        for _ in range(2000):
+            ajustador.registrar_intento(rng.randrange(60), rng.random() < rng.random())
+            if rng.random() < 0.05:
+                ajustador.ajustar_dificultad()
+                self.assertIndexConsistent(ajustador)
+
+    def test_nearest_level_selection_matches_original(self):
+        retos = [
+            {'id': 1, 'dificultad': 5, 'aciertos': 0, 'intentos': 0},
+            {'id': 2, 'dificultad': 1, 'aciertos': 0, 'intentos': 0},
+            {'id': 3, 'dificultad': 5, 'aciertos': 0, 'intentos': 0},
+            {'id': 4, 'dificultad': 1, 'aciertos': 0, 'intentos': 0},
+        ]
+        ajustador = DifficultyAdjuster(retos)
+        # Empate entre 1 y 5 para el nivel 3: gana el primero de la lista (nivel 5)
+        self.assertEqual(ajustador.seleccionar_reto_para_jugador(3)['id'], 1)
+        self.assertEqual(ajustador.seleccionar_reto_para_jugador(2)['id'], 2)
+        self.assertEqual(ajustador.seleccionar_reto_para_jugador(9)['id'], 1)
+        self.assertIn(ajustador.seleccionar_reto_para_jugador(1)['id'], (2, 4))
+        for nivel in range(0, 8):
+            self.assertIn(ajustador.seleccionar_reto_para_jugador(nivel), _seleccion_original(retos, nivel))
+
+    def test_empty_adjuster_raises(self):
+        with self.assertRaises(ValueError):
+            DifficultyAdjuster([]).seleccionar_reto_para_jugador(1)
+
+    def test_incremental_counters_match_recalibration(self):
+        conn = sqlite3.connect(":memory:")
+        with contextlib.redirect_stdout(io.StringIO()):
+            create_tables(conn)
+        incremental = DifficultyAdjuster(_retos())
+        desde_bd = DifficultyAdjuster(_retos())
+        for reto in incremental.obtener_retos():
+            reto['aciertos'] = reto['intentos'] = 0
+        rng = random.Random(11)
+        for _ in range(300):
+            reto_id, correcto = rng.randint(1, 5), rng.random() < 0.5
+            incremental.registrar_intento(reto_id, correcto)
+            conn.execute(
+                "INSERT INTO user_attempts (user_id, challenge_id, submitted_query, is_correct) VALUES (1, ?, 'SELECT 1', ?)",
+                (reto_id, correcto),
+            )
+        incremental.ajustar_dificultad()
+        desde_bd.recalibrar_desde_bd(conn)
+        conn.close()
+        self.assertEqual(incremental.obtener_retos(), desde_bd.obtener_retos())
+        self.assertIndexConsistent(desde_bd)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import asyncio
+import threading
+import unittest
+
+from grading_service import (
+    CORRECT, ERROR, INCORRECT, REJECTED, UNKNOWN_CHALLENGE, ChallengeSpec, GradingService,
+    challenges_from_retos,
+)
+
+SETUP = ("CREATE TABLE n (x INTEGER); INSERT INTO n VALUES (1), (2), (3);",)
+
+class TestGradingService(unittest.TestCase):
+    def setUp(self):
+        self.service = GradingService(
+            {
+                1: ChallengeSpec(SETUP, solution_query="SELECT x FROM n WHERE x > 1"),
+                2: ChallengeSpec(SETUP, expected_rows=((1,), (2,), (3,)), ordered=True),
+            },
+            workers=2,
+            use_processes=False,
+        )
+
+    def tearDown(self):
+        self.service.close()
+
+    def test_structured_results(self):
+        ok = self.service.grade_sync(1, "SELECT x FROM n WHERE x >= 2 ORDER BY x DESC", "s1")
+        self.assertEqual((ok.status, ok.correct, ok.session_id, ok.columns), (CORRECT, True, "s1", ["x"]))
+        self.assertEqual(self.service.grade_sync(2, "SELECT x FROM n ORDER BY x DESC").status, INCORRECT)
+        self.assertEqual(self.service.grade_sync(1, "SELEC x").status, ERROR)
+        self.assertEqual(self.service.grade_sync(9, "SELECT 1").status, UNKNOWN_CHALLENGE)
+
+    def test_sandbox_is_private_and_read_only(self):
+        self.assertEqual(self.service.grade_sync(2, "DELETE FROM n").status, ERROR)
+        self.assertEqual(self.service.grade_sync(2, "SELECT x FROM n ORDER BY x").status, CORRECT)
+
+    def test_write_statements_are_refused_before_the_pool(self):
+        result = self.service.grade_sync(2, "WITH t AS (SELECT 1) DELETE FROM n")
+        self.assertEqual(result.status, ERROR)
+        self.assertIn("lectura", result.feedback)
+        self.assertEqual(self.service.stats()["refused"], 1)
+        self.assertEqual(self.service.stats()["graded"], 0)
+
+    def test_equivalent_submission_is_cached(self):
+        self.service.grade_sync(1, "SELECT x FROM n WHERE x > 1")
+        again = self.service.grade_sync(1, "select x from N where x > 1;")
+        self.assertTrue(again.cached)
+        self.assertEqual(self.service.stats()["graded"], 1)
+        renamed = self.service.grade_sync(1, "SELECT x AS X FROM n WHERE x > 1")
+        self.assertFalse(renamed.cached)
+        self.assertEqual(renamed.columns, ["X"])
+
+    def test_admission_control_rejects_when_queue_is_full(self):
+        gate = threading.Event()
+        service = GradingService({1: ChallengeSpec(SETUP, solution_query="SELECT 1")},
+                                 workers=1, max_queue=2, use_processes=False)
+        service._pool.submit(gate.wait)
+        futures = [service.submit(1, f"SELECT {i}") for i in range(4)]
+        rejected = [f.result().status for f in futures[2:]]
+        gate.set()
+        self.assertEqual(rejected, [REJECTED, REJECTED])
+        self.assertEqual([f.result().status for f in futures[:2]], [INCORRECT, CORRECT])
+        self.assertEqual(service.stats()["pending"], 0)
+        service.close()
+
+    def test_asyncio_front_end(self):
+        async def run():
+            return await asyncio.gather(*(self.service.grade(1, f"SELECT x FROM n WHERE x > {i}") for i in range(3)))
+
+        statuses = [r.status for r in asyncio.run(run())]
+        self.assertEqual(statuses, [INCORRECT, CORRECT, INCORRECT])
+
+class TestProcessPool(unittest.TestCase):
+    def test_retos_challenges_in_process_pool(self):
+        service = GradingService(challenges_from_retos(), workers=2)
+        try:
+            result = service.grade_sync(2, "SELECT * FROM Canciones WHERE reproducciones > 160")
+            self.assertEqual(result.status, CORRECT)
+        finally:
+            service.close()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import os
+import random
+import tempfile
+import unittest
+
+from game_mechanics import Player
+from leaderboard import Leaderboard, RankedSkipList
+
+class TestRankedSkipList(unittest.TestCase):
+    def test_matches_sorted_list_under_random_operations(self):
+        rng = random.Random(7)
+        skiplist = RankedSkipList(seed=1)
+        reference = []
+        for _ in range(2000):
+            if reference and rng.random() < 0.4:
+                key = rng.choice(reference)
+                skiplist.remove(key)
+                reference.remove(key)
+            else:
+                key = (rng.randint(-50, 0), f"u{rng.randint(0, 10_000)}")
+                if key in reference:
+                    continue
+                skiplist.insert(key)
+                reference.append(key)
+            reference.sort()
+        self.assertEqual(len(skiplist), len(reference))
+        self.assertEqual(skiplist.slice(0, len(reference)), reference)
+        for i, key in enumerate(reference):
+            self.assertEqual(skiplist.rank(key), i)
+            self.assertEqual(skiplist[i], key)
+
+    def test_from_sorted_supports_updates(self):
+        skiplist = RankedSkipList.from_sorted(range(0, 100, 2), seed=3)
+        skiplist.insert(51)
+        skiplist.remove(0)
+        self.assertEqual(skiplist.rank(51), 25)
+        self.assertEqual(skiplist.slice(24, 27), [50, 51, 52])
+        with self.assertRaises(KeyError):
+            skiplist.rank(0)
+
+class TestLeaderboard(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db = os.path.join(self.tmpdir.name, "leaderboard.db")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_rank_top_and_around(self):
+        board = Leaderboard(self.db)
+        for i, name in enumerate("abcdefg"):
+            board.update(name, i * 10)
+        board.update("b", 100)
+        self.assertEqual(board.rank("b"), 1)
+        self.assertEqual(board.rank("g"), 2)
+        self.assertEqual([e["username"] for e in board.top(3)], ["b", "g", "f"])
+        self.assertEqual([e["rank"] for e in board.around("e", 1)], [3, 4, 5])
+        self.assertIsNone(board.rank("zz"))
+        board.close()
+
+    def test_ties_are_ordered_by_username_and_persisted(self):
+        board = Leaderboard(self.db, batch_size=100)
+        board.update("zoe", 5, level=2)
+        board.update("ana", 5, level=3)
+        board.close()
+        reloaded = Leaderboard(self.db)
+        self.assertEqual(reloaded.top(2), [
+            {"rank": 1, "username": "ana", "points": 5, "level": 3},
+            {"rank": 2, "username": "zoe", "points": 5, "level": 2},
+        ])
+        reloaded.close()
+
+    def test_player_publishes_points_and_level(self):
+        board = Leaderboard(self.db)
+        player = Player("ana", leaderboard=board)
+        player.add_points(30)
+        player.level_up()
+        self.assertEqual(board.top(1)[0], {"rank": 1, "username": "ana", "points": 30, "level": 2})
+        board.close()
+
+if __name__ == "__main__":
+    unittest.main()
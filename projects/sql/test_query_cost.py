@@ -0,0 +1,93 @@
+import sqlite3
+import unittest
+
+from levels import get_sql_levels
+from query_cost import (
+    CORRELATED_SUBQUERY, FULL_SCAN, TEMP_BTREE, analyze_plan, grade_query_cost, profile_query,
+)
+
+class TestQueryCost(unittest.TestCase):
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        self.conn.executescript("""
+            CREATE TABLE usuarios (id INTEGER PRIMARY KEY, nombre TEXT, pais TEXT, pais_id INTEGER);
+            CREATE INDEX idx_usuarios_pais ON usuarios(pais);
+            CREATE TABLE productos (id INTEGER PRIMARY KEY, precio REAL);
+        """)
+        self.conn.executemany(
+            "INSERT INTO usuarios (nombre, pais, pais_id) VALUES (?, ?, ?)",
+            [(f"u{i}", "España" if i % 50 == 0 else "Chile", i % 7) for i in range(5000)],
+        )
+        self.conn.executemany("INSERT INTO productos (precio) VALUES (?)", [(i % 97,) for i in range(2000)])
+
+    def tearDown(self):
+        self.conn.close()
+
+    def test_analyze_plan_flags(self):
+        flags = analyze_plan([
+            "SCAN t", "SCAN t USING COVERING INDEX ia", "USE TEMP B-TREE FOR ORDER BY",
+            "CORRELATED SCALAR SUBQUERY 1", "SEARCH u USING INDEX iu (x=?)",
+        ])
+        self.assertEqual(flags[FULL_SCAN], ["t"])
+        self.assertEqual(flags[TEMP_BTREE], ["ORDER BY"])
+        self.assertIn(CORRELATED_SUBQUERY, flags)
+
+    def test_constant_rows_are_not_full_scans(self):
+        self.assertEqual(analyze_plan(["SCAN CONSTANT ROW", "SCAN 2 CONSTANT ROWS"]), {})
+        self.assertNotIn(FULL_SCAN, profile_query(self.conn, "SELECT 1").flags)
+        self.assertNotIn(FULL_SCAN, profile_query(self.conn, "VALUES (1), (2)").flags)
+
+    def test_writes_are_rejected_and_data_is_untouched(self):
+        result = grade_query_cost(self.conn, "DELETE FROM usuarios", "SELECT * FROM usuarios WHERE pais = 'España'")
+        self.assertEqual(result["points"], 0)
+        self.assertIn("no permitida", result["messages"][0])
+        with self.assertRaises(ValueError):
+            profile_query(self.conn, "UPDATE usuarios SET pais = 'Chile'")
+        with self.assertRaises(ValueError):
+            profile_query(self.conn, "PRAGMA query_only = 0")
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM usuarios").fetchone()[0], 5000)
+
+    def test_connection_is_read_only_only_while_profiling(self):
+        profile_query(self.conn, "SELECT COUNT(*) FROM usuarios")
+        self.assertEqual(self.conn.execute("PRAGMA query_only").fetchone()[0], 0)
+        self.conn.execute("PRAGMA query_only = ON")
+        grade_query_cost(self.conn, "SELECT 1", "SELECT 1")
+        self.assertEqual(self.conn.execute("PRAGMA query_only").fetchone()[0], 1)
+
+    def test_profile_counts_rows_and_steps(self):
+        profile = profile_query(self.conn, "SELECT * FROM usuarios WHERE pais = 'España';")
+        self.assertEqual(profile.rows, 100)
+        self.assertNotIn(FULL_SCAN, profile.flags)
+
+    def test_indexed_query_gets_full_points(self):
+        query = "SELECT * FROM usuarios WHERE pais = 'España'"
+        result = grade_query_cost(self.conn, query, query)
+        self.assertEqual(result["points"], result["max_points"])
+        self.assertEqual(result["flags"], [])
+
+    def test_scan_and_correlated_subquery_are_penalized(self):
+        scan = grade_query_cost(
+            self.conn,
+            "SELECT * FROM usuarios WHERE pais || '' = 'España'",
+            "SELECT * FROM usuarios WHERE pais = 'España'",
+        )
+        self.assertIn(FULL_SCAN, scan["flags"])
+        self.assertLess(scan["points"], scan["max_points"])
+        self.assertGreater(scan["ratio"], 1)
+
+        correlated = grade_query_cost(
+            self.conn,
+            "SELECT * FROM productos p WHERE precio > (SELECT AVG(precio) FROM productos WHERE id != p.id - 100000)",
+            "SELECT * FROM productos WHERE precio > (SELECT AVG(precio) FROM productos)",
+        )
+        self.assertIn(CORRELATED_SUBQUERY, correlated["flags"])
+        self.assertEqual(correlated["points"], 0)
+        self.assertTrue(correlated["messages"])
+
+    def test_level_challenge_uses_example_query_as_reference(self):
+        challenge = get_sql_levels()[0].challenges[1]
+        result = challenge.score_efficiency(self.conn, "SELECT * FROM usuarios WHERE pais = 'España'")
+        self.assertEqual(result["points"], challenge.efficiency_points)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+import sqlite3
+import unittest
+
+from result_pager import LazyResult
+
+class CountingCursor:
+    def __init__(self, cursor):
+        self.cursor = cursor
+        self.description = cursor.description
+        self.fetched = 0
+
+    def fetchmany(self, size):
+        rows = self.cursor.fetchmany(size)
+        self.fetched += len(rows)
+        return rows
+
+class TestLazyResult(unittest.TestCase):
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        self.conn.execute("CREATE TABLE n (x INTEGER)")
+        self.conn.executemany("INSERT INTO n VALUES (?)", [(i,) for i in range(1000)])
+
+    def tearDown(self):
+        self.conn.close()
+
+    def test_pages_are_fetched_on_demand(self):
+        cursor = CountingCursor(self.conn.execute("SELECT x FROM n ORDER BY x"))
+        result = LazyResult(cursor, page_size=100)
+        self.assertEqual(result.columns, ["x"])
+        self.assertEqual(cursor.fetched, 0)
+        self.assertEqual(result.page(2)[0], (200,))
+        self.assertEqual(cursor.fetched, 300)
+        self.assertEqual(result.page(0)[-1], (99,))
+        self.assertEqual(cursor.fetched, 300)
+        self.assertFalse(result.exhausted)
+
+    def test_end_of_result(self):
+        result = LazyResult(self.conn.execute("SELECT x FROM n WHERE x < 150"), page_size=100)
+        self.assertTrue(result.has_page(1))
+        self.assertFalse(result.has_page(2))
+        self.assertEqual(len(result.page(1)), 50)
+        self.assertTrue(result.exhausted)
+        self.assertEqual(result.fetch_more(), 0)
+
+    def test_from_rows(self):
+        result = LazyResult.from_rows(["a", "b"], iter([(1, 2), [3, 4]]), page_size=1)
+        self.assertEqual(result.window(0, 5), [(1, 2), (3, 4)])
+        self.assertTrue(result.exhausted)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import random
+import unittest
+
+from mechanics import SQLChallenge
+from result_signature import CHECKPOINT_EVERY, ResultSignature
+
+class TestResultSignature(unittest.TestCase):
+    def test_ordered_signature_matches_python_equality(self):
+        rows = [(i, f"n{i}", i * 1.5, None) for i in range(1000)]
+        signature = ResultSignature.from_rows(rows)
+        self.assertTrue(signature.matches(list(rows)))
+        self.assertTrue(signature.matches([(float(a), b, c, d) for a, b, c, d in rows]))
+        self.assertFalse(signature.matches(rows[::-1]))
+        self.assertFalse(signature.matches(rows[:-1]))
+        self.assertFalse(signature.matches(rows + [rows[0]]))
+
+    def test_unordered_signature_ignores_order_but_not_multiplicity(self):
+        rows = [(i % 7, "x") for i in range(100)]
+        signature = ResultSignature.from_rows(rows, ordered=False)
+        shuffled = rows[:]
+        random.Random(1).shuffle(shuffled)
+        self.assertTrue(signature.matches(shuffled))
+        self.assertFalse(signature.matches(rows[:-1] + [(99, "x")]))
+
+    def test_early_exit_on_type_and_checkpoint(self):
+        signature = ResultSignature.from_rows([(i,) for i in range(10 * CHECKPOINT_EVERY)])
+        matcher = signature.matcher()
+        self.assertFalse(matcher.feed(("texto",)))
+
+        consumed = []
+
+        def learner_rows():
+            for i in range(10 * CHECKPOINT_EVERY):
+                consumed.append(i)
+                yield (i + 1,)
+
+        self.assertFalse(signature.matches(learner_rows()))
+        self.assertEqual(len(consumed), CHECKPOINT_EVERY)
+
+    def test_empty_result(self):
+        signature = ResultSignature.from_rows([])
+        self.assertTrue(signature.matches([]))
+        self.assertFalse(signature.matches([(1,)]))
+
+class TestCheckSolutionSignatures(unittest.TestCase):
+    def setUp(self):
+        self.setup = ["CREATE TABLE u (id INTEGER, nombre TEXT); "
+                      "INSERT INTO u VALUES (1, 'Ana'), (2, 'Luis'), (3, 'Carlos');"]
+
+    def test_ordered_and_unordered_cases(self):
+        ordered = SQLChallenge("Orden", "SELECT nombre FROM u ORDER BY id",
+                               [{"input": None, "expected_output": [("Ana",), ("Luis",), ("Carlos",)]}],
+                               setup_sql=self.setup)
+        self.assertTrue(ordered.check_solution("SELECT nombre FROM u ORDER BY id"))
+        self.assertFalse(ordered.check_solution("SELECT nombre FROM u ORDER BY nombre"))
+
+        unordered = SQLChallenge("Sin orden", "SELECT nombre FROM u",
+                                 [{"input": None, "expected_output": [("Carlos",), ("Ana",), ("Luis",)], "ordered": False}],
+                                 setup_sql=self.setup)
+        self.assertTrue(unordered.check_solution("SELECT nombre FROM u ORDER BY nombre DESC"))
+        self.assertFalse(unordered.check_solution("SELECT id FROM u"))
+
+if __name__ == "__main__":
+    unittest.main()
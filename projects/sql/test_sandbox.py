@@ -0,0 +1,57 @@
+import threading
+import unittest
+
+from mechanics import SQLChallenge as MechanicsChallenge
+from retos import obtener_retos_iniciales
+from sandbox import DatabaseTemplate
+
+class TestSandbox(unittest.TestCase):
+    def test_scripts_run_once_and_sessions_are_isolated(self):
+        calls = []
+
+        def builder(conn):
+            calls.append(1)
+            conn.execute("CREATE TABLE t (x INTEGER)")
+            conn.execute("INSERT INTO t VALUES (1), (2)")
+
+        template = DatabaseTemplate(builder=builder)
+        a, b = template.clone(), template.clone()
+        a.execute("DELETE FROM t")
+        self.assertEqual(a.execute("SELECT COUNT(*) FROM t").fetchone()[0], 0)
+        self.assertEqual(b.execute("SELECT COUNT(*) FROM t").fetchone()[0], 2)
+        self.assertEqual(len(calls), 1)
+
+    def test_clones_from_several_threads(self):
+        template = DatabaseTemplate(["CREATE TABLE t (x INTEGER); INSERT INTO t VALUES (7);"])
+        results = []
+
+        def worker():
+            conn = template.clone()
+            results.append(conn.execute("SELECT x FROM t").fetchone()[0])
+            conn.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(results, [7] * 8)
+
+    def test_retos_session_contains_initial_data(self):
+        reto = obtener_retos_iniciales()[1]
+        conn = reto.crear_sesion()
+        rows = conn.execute("SELECT titulo, reproducciones FROM Canciones WHERE reproducciones > 160").fetchall()
+        self.assertEqual(len(rows), len(reto.solucion_esperada))
+
+    def test_mechanics_check_solution_uses_private_session(self):
+        challenge = MechanicsChallenge(
+            description="Nombres",
+            solution_query="SELECT nombre FROM usuarios",
+            test_cases=[{'input': None, 'expected_output': [('Ana',), ('Luis',)]}],
+            setup_sql=["CREATE TABLE usuarios (nombre TEXT); INSERT INTO usuarios VALUES ('Ana'), ('Luis');"],
+        )
+        self.assertFalse(challenge.check_solution("DELETE FROM usuarios"))
+        self.assertTrue(challenge.check_solution("SELECT nombre FROM usuarios"))
+
+if __name__ == '__main__':
+    unittest.main()
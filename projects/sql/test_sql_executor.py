@@ -0,0 +1,173 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import unittest
+
+from sql_executor import SQLExecutor
+
+class TestSQLExecutorPool(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, "game.db")
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT)")
+        conn.executemany("INSERT INTO users (name) VALUES (?)", [("Ana",), ("Luis",), ("Carlos",)])
+        conn.commit()
+        conn.close()
+        self.executor = SQLExecutor(self.db_path, pool_size=2)
+
+    def tearDown(self):
+        self.executor.close()
+        self.tmpdir.cleanup()
+
+    def test_select_returns_columns_and_rows(self):
+        result = self.executor.execute_query("SELECT name FROM users ORDER BY id")
+        self.assertTrue(result["success"])
+        self.assertEqual(result["columns"], ["name"])
+        self.assertEqual(result["rows"], [("Ana",), ("Luis",), ("Carlos",)])
+
+    def test_connections_are_reused(self):
+        for _ in range(10):
+            self.executor.execute_query("SELECT COUNT(*) FROM users")
+        self.assertLessEqual(self.executor.pool._created, 2)
+
+    def test_connections_are_read_only(self):
+        with self.executor.pool.connection() as conn:
+            with self.assertRaises(sqlite3.OperationalError):
+                conn.execute("INSERT INTO users (name) VALUES ('Eve')")
+
+    def test_concurrent_submitters(self):
+        # Sin caché de resultados, para que cada consulta saque una conexión del pool
+        executor = SQLExecutor(self.db_path, pool_size=2, result_cache_size=0)
+        self.addCleanup(executor.close)
+        errors = []
+
+        def worker():
+            for _ in range(50):
+                result = executor.execute_query("SELECT COUNT(*) FROM users")
+                if not result["success"] or result["rows"] != [(3,)]:
+                    errors.append(result)
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(executor.metrics["queries"], 400)
+        self.assertEqual(executor.metrics["cache_hits"], 0)
+        self.assertLessEqual(executor.pool._created, 2)
+
+    def test_pragma_settings_do_not_leak_across_the_pool(self):
+        executor = SQLExecutor(self.db_path, pool_size=1)
+        try:
+            self.assertFalse(executor.execute_query("PRAGMA case_sensitive_like(1)")["success"])
+            self.assertEqual(executor.execute_query("SELECT 'a' LIKE 'A'")["rows"], [(1,)])
+        finally:
+            executor.close()
+
+    def test_exhausted_pool_reports_busy(self):
+        self.executor.pool.timeout = 0.05
+        with self.executor.pool.connection(), self.executor.pool.connection():
+            result = self.executor.execute_query("SELECT name FROM users WHERE id = 3")
+        self.assertFalse(result["success"])
+        self.assertTrue(result["busy"])
+        self.assertIn("ocupado", result["error"])
+        self.assertEqual(self.executor.metrics["busy"], 1)
+        self.assertTrue(self.executor.execute_query("SELECT name FROM users WHERE id = 3")["success"])
+
+    def test_equivalent_resubmission_is_served_from_cache(self):
+        first = self.executor.execute_query("SELECT name FROM users WHERE id = 1;")
+        again = self.executor.execute_query("select   name\nfrom USERS where id = 1")
+        self.assertEqual(again["rows"], first["rows"])
+        self.assertEqual(self.executor.metrics["queries"], 1)
+        self.assertEqual(self.executor.metrics["cache_hits"], 1)
+        self.executor.clear_cache()
+        self.executor.execute_query("SELECT name FROM users WHERE id = 1")
+        self.assertEqual(self.executor.metrics["queries"], 2)
+
+    def test_cached_result_keeps_column_names(self):
+        self.assertEqual(self.executor.execute_query("SELECT name AS Nombre FROM users")["columns"], ["Nombre"])
+        self.assertEqual(self.executor.execute_query("SELECT name AS nombre FROM users")["columns"], ["nombre"])
+        self.assertEqual(self.executor.execute_query("SELECT upper(name) FROM users")["columns"], ["upper(name)"])
+        self.assertEqual(self.executor.execute_query("SELECT UPPER(name) FROM users")["columns"], ["UPPER(name)"])
+        self.assertEqual(self.executor.metrics["cache_hits"], 0)
+
+    def test_safety_check_honors_literals_and_statement_type(self):
+        is_safe = self.executor.is_safe_query
+        self.assertTrue(is_safe("SELECT name FROM users WHERE name = 'a;b -- c /* d'"))
+        self.assertTrue(is_safe("WITH t AS (SELECT 1) SELECT * FROM t;"))
+        self.assertFalse(is_safe("WITH t AS (SELECT 1) DELETE FROM users"))
+        self.assertFalse(is_safe("SELECT 1; DROP TABLE users"))
+        self.assertFalse(is_safe("SELECT 1 -- comentario"))
+        self.assertFalse(is_safe("SELECT 'sin cerrar"))
+        self.assertFalse(is_safe("PRAGMA journal_mode = DELETE"))
+        self.assertFalse(is_safe("PRAGMA case_sensitive_like(1)"))
+        self.assertFalse(is_safe("PRAGMA query_only(0)"))
+        self.assertFalse(is_safe("PRAGMA journal_mode(DELETE)"))
+        self.assertFalse(is_safe("PRAGMA reverse_unordered_selects(1)"))
+        self.assertFalse(is_safe("PRAGMA main.cache_size(10)"))
+        self.assertFalse(is_safe("PRAGMA optimize"))
+        self.assertTrue(is_safe("PRAGMA table_info(users)"))
+        self.assertTrue(is_safe('PRAGMA main."index_list"(users)'))
+        self.assertTrue(is_safe("PRAGMA journal_mode"))
+        self.assertFalse(is_safe("   "))
+        result = self.executor.execute_query("SELECT name FROM users WHERE name = 'Ana;'")
+        self.assertTrue(result["success"])
+        self.assertIn("una sentencia", self.executor.execute_query("SELECT 1; SELECT 2")["error"])
+
+class TestSQLExecutorBudgets(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, "game.db")
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("CREATE TABLE n (x INTEGER)")
+        conn.executemany("INSERT INTO n VALUES (?)", [(i,) for i in range(2000)])
+        conn.commit()
+        conn.close()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_row_cap_truncates_result(self):
+        executor = SQLExecutor(self.db_path, max_rows=150, fetch_size=64)
+        result = executor.execute_query("SELECT x FROM n")
+        executor.close()
+        self.assertTrue(result["success"])
+        self.assertTrue(result["truncated"])
+        self.assertEqual(len(result["rows"]), 150)
+        self.assertEqual(executor.metrics["truncated"], 1)
+
+    def test_small_result_is_not_truncated(self):
+        executor = SQLExecutor(self.db_path, max_rows=5000)
+        result = executor.execute_query("SELECT x FROM n")
+        executor.close()
+        self.assertFalse(result["truncated"])
+        self.assertEqual(len(result["rows"]), 2000)
+
+    def test_instruction_limit_cancels_cross_join(self):
+        executor = SQLExecutor(self.db_path, max_instructions=100_000, time_limit=None)
+        result = executor.execute_query("SELECT COUNT(*) FROM n a, n b, n c")
+        executor.close()
+        self.assertFalse(result["success"])
+        self.assertEqual(result["limit"], "instructions")
+        self.assertEqual(executor.metrics["instructions"], 1)
+
+    def test_time_limit_cancels_long_query(self):
+        executor = SQLExecutor(self.db_path, max_instructions=None, time_limit=0.05)
+        result = executor.execute_query("SELECT COUNT(*) FROM n a, n b, n c")
+        executor.close()
+        self.assertFalse(result["success"])
+        self.assertEqual(result["limit"], "timeout")
+        self.assertEqual(executor.metrics["timeout"], 1)
+
+    def test_connection_is_usable_after_cancellation(self):
+        executor = SQLExecutor(self.db_path, pool_size=1, max_instructions=100_000)
+        executor.execute_query("SELECT COUNT(*) FROM n a, n b")
+        result = executor.execute_query("SELECT COUNT(*) FROM n")
+        executor.close()
+        self.assertEqual(result["rows"], [(2000,)])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import unittest
+
+from feedback_system import FeedbackSystem
+from mechanics import SQLChallenge
+from sql_fingerprint import VerdictCache, analyze, fingerprint, normalize, result_fingerprint, tokenize
+
+class TestNormalize(unittest.TestCase):
+    def test_whitespace_case_comments_and_semicolons(self):
+        self.assertEqual(
+            normalize("SELECT  nombre\n FROM Usuarios -- todos\n WHERE id = 01.50 ;;"),
+            "select nombre from usuarios where id = 1.5",
+        )
+        self.assertEqual(fingerprint("select * from t"), fingerprint("SELECT *\tFROM T;"))
+
+    def test_literals_keep_meaning(self):
+        self.assertNotEqual(fingerprint("SELECT 'Ana'"), fingerprint("SELECT 'ana'"))
+        self.assertNotEqual(fingerprint("SELECT 1"), fingerprint("SELECT 1.0"))
+        self.assertEqual(fingerprint("SELECT 0x10"), fingerprint("SELECT 16"))
+        self.assertNotEqual(fingerprint("SELECT 1e400"), fingerprint("SELECT inf"))
+        self.assertEqual(normalize("SELECT 1E400"), "select 1e400")
+        self.assertEqual(normalize("SELECT '--no es comentario;'"), "select '--no es comentario;'")
+
+    def test_quoted_identifiers_are_canonical(self):
+        self.assertEqual(normalize('SELECT `a b`, [c] FROM "t"'), 'select "a b" , "c" from "t"')
+
+    def test_unterminated_literal_is_one_token(self):
+        kinds = [t.kind for t in tokenize("SELECT 'abc; DROP TABLE t") if t.kind != "space"]
+        self.assertEqual(kinds, ["word", "unterminated"])
+
+class TestAnalyze(unittest.TestCase):
+    def test_result_columns_keep_original_text(self):
+        self.assertEqual(
+            analyze("SELECT DISTINCT nombre AS Nombre, count( * ) FROM u GROUP BY 1").result_columns,
+            ("nombre AS Nombre", "count( * )"),
+        )
+        self.assertEqual(analyze("SELECT * FROM (SELECT a AS A FROM t)").result_columns, ("*", "a AS A"))
+        self.assertEqual(fingerprint("SELECT a AS Nombre FROM t"), fingerprint("SELECT a AS nombre FROM t"))
+        self.assertNotEqual(result_fingerprint("SELECT a AS Nombre FROM t"), result_fingerprint("SELECT a AS nombre FROM t"))
+        self.assertEqual(result_fingerprint("SELECT a  FROM t;"), result_fingerprint("select a\nFROM T"))
+
+    def test_statement_classification(self):
+        self.assertEqual(analyze("WITH RECURSIVE c(n) AS (SELECT 1) SELECT n FROM c").statement_type, "SELECT")
+        self.assertEqual(analyze("with x as (select 1) update t set a = 1").statement_type, "UPDATE")
+        self.assertEqual(analyze("SELECT ';'; DELETE FROM t;").statement_types, ("SELECT", "DELETE"))
+        self.assertEqual(analyze("SELECT 1;;").statement_count, 1)
+
+    def test_comments_and_literals(self):
+        self.assertFalse(analyze("SELECT '--', \"/*\" FROM t").has_comments)
+        self.assertTrue(analyze("SELECT 1 /* nota */").has_comments)
+        self.assertTrue(analyze("SELECT 1 /* sin cerrar").malformed)
+        self.assertTrue(analyze("SELECT 'sin cerrar").malformed)
+
+    def test_analysis_is_shared_with_fingerprint(self):
+        query = "SELECT  *  FROM t"
+        self.assertIs(analyze(query), analyze(query))
+        self.assertEqual(fingerprint(query), analyze(query).fingerprint)
+
+class TestVerdictCache(unittest.TestCase):
+    def test_lru_per_challenge(self):
+        cache = VerdictCache(max_entries=2)
+        calls = []
+
+        def grade(query):
+            calls.append(query)
+            return len(calls)
+
+        self.assertEqual(cache.get_or_grade("SELECT 1", grade, challenge_id=1), 1)
+        self.assertEqual(cache.get_or_grade("select 1;", grade, challenge_id=1), 1)
+        self.assertEqual(cache.get_or_grade("SELECT 1", grade, challenge_id=2), 2)
+        cache.get_or_grade("SELECT 2", grade, challenge_id=1)
+        cache.get_or_grade("SELECT 3", grade, challenge_id=1)
+        self.assertIsNone(cache.get("SELECT 1", challenge_id=1))
+        self.assertEqual(cache.get("SELECT 1", challenge_id=2), 2)
+        cache.invalidate(2)
+        self.assertIsNone(cache.get("SELECT 1", challenge_id=2))
+
+class TestIntegration(unittest.TestCase):
+    def test_feedback_ignores_formatting(self):
+        feedback = FeedbackSystem("SELECT * FROM usuarios;")
+        self.assertTrue(feedback.check_answer("select *\n  from USUARIOS")["correct"])
+        self.assertFalse(feedback.check_answer("SELECT nombre FROM usuarios")["correct"])
+
+    def test_check_solution_reuses_verdict(self):
+        challenge = SQLChallenge(
+            "Nombres", "SELECT nombre FROM u", [{"input": None, "expected_output": [("Ana",)]}],
+            setup_sql=["CREATE TABLE u (nombre TEXT); INSERT INTO u VALUES ('Ana');"],
+        )
+        self.assertTrue(challenge.check_solution("SELECT nombre FROM u"))
+        self.assertTrue(challenge.check_solution("select NOMBRE from U;"))
+        self.assertEqual(challenge.verdicts.stats(), (1, 1))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import pandas as pd
+
+import sql_validation
+from sql_validation import compare_results, invalidate_dataset, validate_sql_answer
+
+SOLUTION = "SELECT nombre FROM empleados WHERE edad > 30"
+
+class TestValidationCaches(unittest.TestCase):
+    def setUp(self):
+        sql_validation.clear_caches()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        path = os.path.join(self.tmpdir.name, "retos.db")
+        conn = sqlite3.connect(path)
+        conn.execute("CREATE TABLE empleados (nombre TEXT, edad INTEGER)")
+        conn.executemany("INSERT INTO empleados VALUES (?, ?)", [("Juan", 30), ("Pedro", 40), ("Ana", 35)])
+        conn.commit()
+        conn.close()
+        self.db_config = {"url": f"sqlite:///{path}"}
+
+    def tearDown(self):
+        sql_validation.clear_caches()
+        self.tmpdir.cleanup()
+
+    def test_engine_is_created_once(self):
+        with patch.object(sql_validation, "get_db_engine", wraps=sql_validation.get_db_engine) as factory:
+            for _ in range(3):
+                validate_sql_answer(self.db_config, SOLUTION, SOLUTION, challenge_id=1)
+        self.assertEqual(factory.call_count, 1)
+
+    def test_solution_runs_once_per_dataset_version(self):
+        with patch.object(sql_validation, "execute_query", wraps=sql_validation.execute_query) as run:
+            validate_sql_answer(self.db_config, SOLUTION, SOLUTION, challenge_id=1, dataset_version=1)
+            validate_sql_answer(self.db_config, SOLUTION, SOLUTION, challenge_id=1, dataset_version=1)
+            self.assertEqual(run.call_count, 3)  # 1 solución + 2 usuarios
+            validate_sql_answer(self.db_config, SOLUTION, SOLUTION, challenge_id=1, dataset_version=2)
+            self.assertEqual(run.call_count, 5)
+
+    def test_invalidate_dataset_recomputes_solution(self):
+        ok, _ = validate_sql_answer(self.db_config, SOLUTION, SOLUTION, challenge_id=1)
+        self.assertTrue(ok)
+        conn = sqlite3.connect(self.db_config["url"][len("sqlite:///"):])
+        conn.execute("INSERT INTO empleados VALUES ('Luis', 50)")
+        conn.commit()
+        conn.close()
+        invalidate_dataset(self.db_config, challenge_id=1)
+        ok, _ = validate_sql_answer(self.db_config, SOLUTION, SOLUTION, challenge_id=1)
+        self.assertTrue(ok)
+
+class TestCompareResults(unittest.TestCase):
+    def setUp(self):
+        self.solution = pd.DataFrame({"nombre": ["Ana", "Luis", "Ana"], "edad": [30, 40, 30]})
+
+    def test_same_rows_in_other_order_and_column_order(self):
+        user = pd.DataFrame({"edad": [40, 30, 30], "nombre": ["Luis", "Ana", "Ana"]})
+        self.assertEqual(compare_results(user, self.solution), (True, ""))
+
+    def test_duplicates_are_counted(self):
+        user = pd.DataFrame({"nombre": ["Ana", "Luis", "Luis"], "edad": [30, 40, 40]})
+        ok, msg = compare_results(user, self.solution)
+        self.assertFalse(ok)
+        self.assertIn("Luis", msg)
+
+    def test_early_exit_on_shape_and_columns(self):
+        ok, msg = compare_results(self.solution.head(2), self.solution)
+        self.assertFalse(ok)
+        self.assertIn("filas", msg)
+        ok, msg = compare_results(self.solution.rename(columns={"edad": "age"}), self.solution)
+        self.assertFalse(ok)
+        self.assertIn("columnas", msg)
+
+    def test_order_sensitive(self):
+        solution = pd.DataFrame({"nombre": ["Ana", "Luis", "Pedro"], "edad": [30, 40, 50]})
+        user = solution.iloc[::-1].reset_index(drop=True)
+        self.assertTrue(compare_results(user, solution)[0])
+        self.assertTrue(compare_results(solution.copy(), solution, order_sensitive=True)[0])
+        ok, msg = compare_results(user, solution, order_sensitive=True)
+        self.assertFalse(ok)
+        self.assertIn("orden", msg)
+
+    def test_float_tolerance(self):
+        solution = pd.DataFrame({"media": [0.1 + 0.2, 2.0]})
+        user = pd.DataFrame({"media": [0.3, 2]})
+        self.assertFalse(compare_results(user, solution)[0])
+        self.assertTrue(compare_results(user, solution, float_decimals=6)[0])
+
+    def test_rounding_to_negative_zero(self):
+        user = pd.DataFrame({"x": [-0.001, 1.0]})
+        solution = pd.DataFrame({"x": [0.0, 1.0]})
+        self.assertTrue(compare_results(user, solution, float_decimals=2)[0])
+
+    def test_diff_sample_is_bounded(self):
+        solution = pd.DataFrame({"x": range(1000)})
+        user = pd.DataFrame({"x": range(1000, 2000)})
+        ok, msg = compare_results(user, solution, max_diff_rows=3)
+        self.assertFalse(ok)
+        self.assertNotIn("1003", msg)
+
+if __name__ == '__main__':
+    unittest.main()
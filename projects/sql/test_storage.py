@@ -0,0 +1,58 @@
+import json
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from storage import ProgressStorage
+
+class TestProgressStorage(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db = os.path.join(self.tmpdir.name, "progress.db")
+        self.legacy = os.path.join(self.tmpdir.name, "progress.json")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _rows(self):
+        conn = sqlite3.connect(self.db)
+        rows = conn.execute("SELECT COUNT(*) FROM player_progress").fetchone()[0]
+        conn.close()
+        return rows
+
+    def test_default_progress_for_unknown_player(self):
+        storage = ProgressStorage(self.db, legacy_file=None)
+        self.assertEqual(storage.load_progress(1), {"levels_completed": [], "points": 0, "achievements": []})
+        storage.close()
+
+    def test_write_behind_buffer_is_readable_and_flushed_in_batches(self):
+        storage = ProgressStorage(self.db, batch_size=3, flush_interval=3600, legacy_file=None)
+        storage.save_progress(1, {"points": 10})
+        storage.save_progress(1, {"points": 20})
+        storage.save_progress(2, {"points": 5})
+        self.assertEqual(storage.load_progress(1), {"points": 20})
+        self.assertEqual(self._rows(), 0)
+        storage.save_progress(3, {"points": 1})
+        self.assertEqual(self._rows(), 3)
+        storage.close()
+
+    def test_upsert_keeps_one_row_per_player(self):
+        storage = ProgressStorage(self.db, batch_size=1, legacy_file=None)
+        for points in range(5):
+            storage.save_progress(7, {"points": points})
+        storage.close()
+        self.assertEqual(self._rows(), 1)
+        reopened = ProgressStorage(self.db, legacy_file=None)
+        self.assertEqual(reopened.load_progress(7), {"points": 4})
+        reopened.close()
+
+    def test_legacy_json_with_trailing_garbage_is_imported(self):
+        with open(self.legacy, "w") as f:
+            f.write(json.dumps({"1": {"points": 30}}) + "\n}}  restos")
+        storage = ProgressStorage(self.db, legacy_file=self.legacy)
+        self.assertEqual(storage.load_progress(1), {"points": 30})
+        storage.close()
+
+if __name__ == '__main__':
+    unittest.main()
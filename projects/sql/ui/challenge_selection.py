@@ -1,14 +1,11 @@
 from PyQt5.QtWidgets import (
     QWidget, QLabel, QPushButton, QVBoxLayout, QListWidget
 )
+from challenge_catalog import get_catalog
 from ui.editor import SQLEditorWindow
 
-# Simulación de retos
-CHALLENGES = [
-    {"id": 1, "title": "Selecciona todos los usuarios", "description": "Escribe una consulta para seleccionar todos los usuarios de la tabla users."},
-    {"id": 2, "title": "Cuenta los productos", "description": "Cuenta cuántos productos hay en la tabla products."},
-    {"id": 3, "title": "Filtra por edad", "description": "Selecciona los usuarios mayores de 18 años de la tabla users."}
-]
+# Retos de práctica, tomados del catálogo de retos
+CHALLENGES = [entry.as_dict() for entry in get_catalog().source("practica")]
 
 class ChallengeSelectionWindow(QWidget):
     def __init__(self):
@@ -29,6 +29,7 @@ class SQLEditorWindow(QWidget):
     def __init__(self, challenge):
         super().__init__()
         self.challenge = challenge
+        self.conn = None
         self.setWindowTitle(f"SQL Game - {challenge['title']}")
         self.setFixedSize(600, 400)
         self.init_ui()
@@ -49,18 +50,24 @@ class SQLEditorWindow(QWidget):
 
     def run_query(self):
         query = self.editor.toPlainText()
-        conn = sqlite3.connect(DB_FILE)
-        c = conn.cursor()
+        # La conexión sigue abierta mientras la tabla lee el resultado por páginas
+        if self.conn is not None:
+            self.result_area.show_message("")
+            self.conn.close()
+        self.conn = sqlite3.connect(DB_FILE)
+        c = self.conn.cursor()
         try:
             c.execute(query)
-            if query.strip().lower().startswith("select"):
-                rows = c.fetchall()
-                headers = [desc[0] for desc in c.description]
-                self.result_area.show_results(headers, rows)
+            if c.description is not None:
+                self.result_area.show_cursor(c)
             else:
-                conn.commit()
+                self.conn.commit()
                 self.result_area.show_message("Consulta ejecutada correctamente.")
         except Exception as e:
             self.result_area.show_message(f"Error: {e}")
-        finally:
-            conn.close()
\ No newline at end of file
+
+    def closeEvent(self, event):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+        super().closeEvent(event)
\ No newline at end of file
@@ -1,27 +1,80 @@
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLabel, QTableWidget, QTableWidgetItem
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, Qt
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLabel, QTableView
+
+from result_pager import LazyResult
+
+class ResultTableModel(QAbstractTableModel):
+    """
+    Modelo de tabla sobre un LazyResult: la vista solo pide las celdas
+    visibles y, al llegar al final del desplazamiento, Qt llama a fetchMore
+    para traer la siguiente página del cursor.
+    """
+
+    def __init__(self, result: LazyResult, parent=None):
+        super().__init__(parent)
+        self.result = result
+        self.result.fetch_more()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.result)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.result.columns)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole or not index.isValid():
+            return None
+        return str(self.result.rows[index.row()][index.column()])
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self.result.columns[section]
+        return str(section + 1)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self.result.exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+        batch = self.result.read_batch()
+        if batch:
+            start = len(self.result)
+            self.beginInsertRows(QModelIndex(), start, start + len(batch) - 1)
+            self.result.rows.extend(batch)
+            self.endInsertRows()
+
+    def close(self):
+        self.result.close()
 
 class ResultArea(QWidget):
     def __init__(self):
         super().__init__()
         self.layout = QVBoxLayout()
         self.msg_label = QLabel("")
-        self.table = QTableWidget()
+        self.table = QTableView()
+        self.model = None
         self.layout.addWidget(self.msg_label)
         self.layout.addWidget(self.table)
         self.setLayout(self.layout)
 
+    def _set_model(self, model):
+        if self.model is not None:
+            self.model.close()
+        self.model = model
+        self.table.setModel(model)
+
+    def show_cursor(self, cursor):
+        """Muestra el resultado de un cursor abierto, leyéndolo por páginas."""
+        self.msg_label.setText("")
+        self._set_model(ResultTableModel(LazyResult(cursor)))
+
     def show_results(self, headers, rows):
         self.msg_label.setText("")
-        self.table.clear()
-        self.table.setColumnCount(len(headers))
-        self.table.setRowCount(len(rows))
-        self.table.setHorizontalHeaderLabels(headers)
-        for row_idx, row in enumerate(rows):
-            for col_idx, value in enumerate(row):
-                self.table.setItem(row_idx, col_idx, QTableWidgetItem(str(value)))
+        self._set_model(ResultTableModel(LazyResult.from_rows(headers, rows)))
 
     def show_message(self, msg):
         self.msg_label.setText(msg)
-        self.table.clear()
-        self.table.setRowCount(0)
-        self.table.setColumnCount(0)
\ No newline at end of file
+        self._set_model(None)
@@ -1,22 +1,21 @@
+from challenge_catalog import get_catalog
+
 def listar_tipos_ejercicios():
     """
     Devuelve una lista de los tipos de ejercicios SQL definidos para el juego.
     """
-    from exercise_types import EXERCISE_TYPES
     return [
         {
-            "nombre": tipo["nombre"],
-            "descripcion": tipo["descripcion"]
+            "nombre": tipo.title,
+            "descripcion": tipo.description
         }
-        for tipo in EXERCISE_TYPES
+        for tipo in get_catalog().source("tipos")
     ]
 
 def mostrar_ejemplo(tipo_nombre):
     """
     Dado el nombre de un tipo de ejercicio, muestra un ejemplo SQL asociado.
+    La búsqueda es directa en el índice del catálogo.
     """
-    from exercise_types import EXERCISE_TYPES
-    for tipo in EXERCISE_TYPES:
-        if tipo["nombre"] == tipo_nombre:
-            return tipo["ejemplo"]
-    return None
\ No newline at end of file
+    tipo = get_catalog().get("tipos", tipo_nombre)
+    return tipo.example if tipo else None
@@ -7,11 +7,14 @@ docstrings, and type hints.
 """
 
 import ast
+import hashlib
 import inspect
 import importlib
+import json
 import os
 import re
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple, Union
 import logging
@@ -27,31 +30,139 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Bump when the shape of the extracted module info changes
+CACHE_VERSION = 1
+CACHE_FILENAME = ".test_generator_cache.json"
+
+# Below this many changed files, process start-up costs more than it saves
+MIN_PARALLEL_FILES = 8
+
+
+def file_digest(content: bytes) -> str:
+    """Return the content hash used as the cache key for a module."""
+    return hashlib.sha256(content).hexdigest()
+
+
+def _returns_annotation(node: Union[ast.FunctionDef, ast.AsyncFunctionDef]) -> str:
+    """Return the return annotation of a function as a string ('Any' if missing)."""
+    if isinstance(node.returns, ast.Name):
+        return node.returns.id
+    if isinstance(node.returns, ast.Constant):
+        return str(node.returns.value)
+    return "Any"
+
+
+def _function_info(node: Union[ast.FunctionDef, ast.AsyncFunctionDef]) -> Dict:
+    return {
+        "name": node.name,
+        "args": [arg.arg for arg in node.args.args],
+        "returns": _returns_annotation(node),
+        "docstring": ast.get_docstring(node) or "",
+    }
+
+
+def _is_private(name: str) -> bool:
+    """Private names start with an underscore; dunder methods are kept."""
+    return name.startswith("_") and not name.startswith("__")
+
+
+def analyze_source(content: str, filename: str = "<unknown>") -> Dict:
+    """Extract the public top-level functions and classes of a module.
+
+    Only the module body is inspected, so methods and nested functions are
+    not reported as top-level functions.
+
+    Args:
+        content: Source code of the module
+        filename: File name used in syntax error messages
+
+    Returns:
+        Dictionary with "functions" and "classes" lists
+
+    Raises:
+        SyntaxError: If the source cannot be parsed
+    """
+    tree = ast.parse(content, filename=filename)
+    functions = []
+    classes = []
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            if not _is_private(node.name):
+                functions.append(_function_info(node))
+        elif isinstance(node, ast.ClassDef):
+            # Skip private classes
+            if node.name.startswith("_"):
+                continue
+            classes.append({
+                "name": node.name,
+                "methods": [
+                    _function_info(item)
+                    for item in node.body
+                    if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)) and not _is_private(item.name)
+                ],
+                "docstring": ast.get_docstring(node) or "",
+            })
+    return {"functions": functions, "classes": classes}
+
+
+def analyze_file(file_path: str) -> Tuple[str, str, Optional[Dict], Optional[str]]:
+    """Read, hash and analyze a module. Runs in worker processes.
+
+    Args:
+        file_path: Path to the Python file
+
+    Returns:
+        Tuple of (file_path, content hash, module info or None, error message or None)
+    """
+    with open(file_path, "rb") as f:
+        content = f.read()
+    digest = file_digest(content)
+    try:
+        return file_path, digest, analyze_source(content.decode("utf-8"), file_path), None
+    except (SyntaxError, ValueError) as e:
+        return file_path, digest, None, str(e)
+
 
 class TestGenerator:
     """Generates test cases for Python modules and functions."""
 
-    def __init__(self, target_path: str, output_dir: str = "tests"):
+    def __init__(
+        self,
+        target_path: str,
+        output_dir: str = "tests",
+        jobs: int = 1,
+        use_cache: bool = True,
+    ):
         """Initialize the TestGenerator.
         
         Args:
             target_path: Path to the Python module or package to generate tests for
             output_dir: Directory to save generated test files (default: 'tests')
+            jobs: Number of worker processes used to analyze modules (default: 1)
+            use_cache: Skip modules whose content has not changed since the last run
         """
         self.target_path = Path(target_path).resolve()
         self.output_dir = Path(output_dir).resolve()
         self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.jobs = max(1, jobs)
+        self.use_cache = use_cache
+        self.cache_path = self.output_dir / CACHE_FILENAME
         
         # Dictionary to store information about the target module
         self.module_info: Dict = {}
         
+        # Cached module info by file path: {"hash", "size", "mtime_ns", "info"}
+        self.cache: Dict[str, Dict] = self._load_cache() if use_cache else {}
+        
+        # Counters for the last run
+        self.stats = {"analyzed": 0, "unchanged": 0, "written": 0, "errors": 0}
+        
         # Configure test file template
-        self.test_file_template = """""""
-# Generated by Vibe Coding Test Generator
+        self.test_file_template = '''# Generated by Vibe Coding Test Generator
 # Date: {generation_date}
 # Target: {target_module}
 
-""""Test cases for {target_module}"""
+"""Test cases for {target_module}"""
 
 import pytest
 import sys
@@ -64,7 +175,7 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 {imports}
 
 {test_cases}
-""""""
+'''
 
     def generate_tests(self) -> None:
         """Generate test cases for the target module."""
@@ -72,14 +183,19 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
         
         # Check if the target is a file or directory
         if self.target_path.is_file():
-            self._process_file(self.target_path)
+            self._process_files([self.target_path])
         elif self.target_path.is_dir():
             self._process_directory(self.target_path)
         else:
             logger.error(f"Target path does not exist: {self.target_path}")
             return
         
-        logger.info("Test generation complete")
+        if self.use_cache:
+            self._save_cache()
+        logger.info(
+            "Test generation complete: {analyzed} analyzed, {unchanged} unchanged, "
+            "{written} test files written, {errors} errors".format(**self.stats)
+        )
     
     def _process_directory(self, directory: Path) -> None:
         """Process all Python files in a directory.
@@ -89,11 +205,77 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
         """
         logger.info(f"Processing directory: {directory}")
         
-        for file_path in directory.glob("**/*.py"):
+        file_paths = [
+            file_path
+            for file_path in sorted(directory.glob("**/*.py"))
             # Skip __init__.py and test files
-            if file_path.name == "__init__.py" or file_path.name.startswith("test_"):
+            if file_path.name != "__init__.py" and not file_path.name.startswith("test_")
+        ]
+        self._process_files(file_paths)
+        
+        # Forget modules that no longer exist under this directory
+        seen = {str(file_path) for file_path in file_paths}
+        prefix = str(directory) + os.sep
+        for key in [k for k in self.cache if k.startswith(prefix) and k not in seen]:
+            del self.cache[key]
+    
+    def _process_files(self, file_paths: List[Path]) -> None:
+        """Analyze changed files (in parallel if configured) and regenerate their tests.
+        
+        Args:
+            file_paths: Python files to process
+        """
+        changed = [file_path for file_path in file_paths if not self._is_unchanged(file_path)]
+        self.stats["unchanged"] += len(file_paths) - len(changed)
+        if not changed:
+            return
+        
+        paths = [str(file_path) for file_path in changed]
+        if self.jobs > 1 and len(paths) >= MIN_PARALLEL_FILES:
+            with ProcessPoolExecutor(max_workers=self.jobs) as pool:
+                chunksize = max(1, len(paths) // (self.jobs * 4))
+                results = list(pool.map(analyze_file, paths, chunksize=chunksize))
+        else:
+            results = [analyze_file(path) for path in paths]
+        
+        for file_path, (path, digest, info, error) in zip(changed, results):
+            stat = file_path.stat()
+            entry = self.cache.get(path)
+            if entry is not None and entry["hash"] == digest and self._has_test_file(file_path, entry):
+                # Touched but not modified: only refresh the stat shortcut
+                entry.update(size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+                self.stats["unchanged"] += 1
+                continue
+            self.stats["analyzed"] += 1
+            if error is not None:
+                logger.error(f"Error parsing {path}: {error}")
+                self.stats["errors"] += 1
+                self.cache.pop(path, None)
                 continue
-            self._process_file(file_path)
+            has_tests = self._register_module(file_path, info)
+            self.cache[path] = {
+                "hash": digest,
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "has_tests": has_tests,
+                "info": info,
+            }
+    
+    def _is_unchanged(self, file_path: Path) -> bool:
+        """Cheap check: same size and mtime as the cached entry and its test file still exists."""
+        entry = self.cache.get(str(file_path))
+        if entry is None:
+            return False
+        stat = file_path.stat()
+        return (
+            entry["size"] == stat.st_size
+            and entry["mtime_ns"] == stat.st_mtime_ns
+            and self._has_test_file(file_path, entry)
+        )
+    
+    def _has_test_file(self, file_path: Path, entry: Dict) -> bool:
+        """Modules without testable code never get a test file, so nothing is missing."""
+        return not entry["has_tests"] or (self.output_dir / f"test_{file_path.stem}.py").exists()
     
     def _process_file(self, file_path: Path) -> None:
         """Process a single Python file and generate tests for it.
@@ -102,117 +284,62 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
             file_path: Path to the Python file to process
         """
         logger.info(f"Processing file: {file_path}")
+        self._process_files([file_path])
+    
+    def _register_module(self, file_path: Path, info: Dict) -> bool:
+        """Store the extracted info of a module and generate its test file.
         
-        # Parse the file to extract function and class information
-        with open(file_path, "r", encoding="utf-8") as f:
-            content = f.read()
-        
-        try:
-            tree = ast.parse(content)
-        except SyntaxError as e:
-            logger.error(f"Error parsing {file_path}: {e}")
-            return
-        
-        # Extract module information
+        Args:
+            file_path: Path to the Python file
+            info: Module info returned by analyze_source
+            
+        Returns:
+            True if a test file was written
+        """
         module_name = file_path.stem
         self.module_info[module_name] = {
             "path": file_path,
             "import_path": self._get_import_path(file_path),
-            "functions": [],
-            "classes": [],
+            "functions": info["functions"],
+            "classes": info["classes"],
         }
         
-        # Analyze the AST to find functions and classes
-        for node in ast.walk(tree):
-            if isinstance(node, ast.FunctionDef):
-                self._process_function(node, module_name)
-            elif isinstance(node, ast.ClassDef):
-                self._process_class(node, module_name)
-        
         # Generate test file
-        self._generate_test_file(module_name)
+        return self._generate_test_file(module_name)
     
-    def _process_function(self, node: ast.FunctionDef, module_name: str) -> None:
-        """Process a function definition and extract relevant information.
-        
-        Args:
-            node: The AST node for the function definition
-            module_name: Name of the module containing the function
-        """
-        # Skip private and dunder methods
-        if node.name.startswith("_") and not node.name.startswith("__"):
-            return
-        
-        # Extract function information
-        func_info = {
-            "name": node.name,
-            "args": [arg.arg for arg in node.args.args],
-            "returns": "Any",  # Default return type
-            "docstring": ast.get_docstring(node) or "",
-        }
-        
-        # Try to get return type annotation
-        if node.returns:
-            if isinstance(node.returns, ast.Name):
-                func_info["returns"] = node.returns.id
-            elif isinstance(node.returns, ast.Constant):
-                func_info["returns"] = str(node.returns.value)
-        
-        # Add to module info
-        self.module_info[module_name]["functions"].append(func_info)
+    def _load_cache(self) -> Dict[str, Dict]:
+        """Load the module info cache from the output directory."""
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if data.get("version") != CACHE_VERSION:
+            return {}
+        return data.get("modules", {})
     
-    def _process_class(self, node: ast.ClassDef, module_name: str) -> None:
-        """Process a class definition and extract relevant information.
-        
-        Args:
-            node: The AST node for the class definition
-            module_name: Name of the module containing the class
-        """
-        # Skip private classes
-        if node.name.startswith("_"):
-            return
-        
-        class_info = {
-            "name": node.name,
-            "methods": [],
-            "docstring": ast.get_docstring(node) or "",
-        }
-        
-        # Process methods
-        for item in node.body:
-            if isinstance(item, ast.FunctionDef):
-                # Skip private methods
-                if item.name.startswith("_") and not item.name.startswith("__"):
-                    continue
-                
-                method_info = {
-                    "name": item.name,
-                    "args": [arg.arg for arg in item.args.args],
-                    "returns": "Any",
-                    "docstring": ast.get_docstring(item) or "",
-                }
-                
-                # Get return type annotation if available
-                if item.returns:
-                    if isinstance(item.returns, ast.Name):
-                        method_info["returns"] = item.returns.id
-                    elif isinstance(item.returns, ast.Constant):
-                        method_info["returns"] = str(item.returns.value)
-                
-                class_info["methods"].append(method_info)
-        
-        # Add to module info
-        self.module_info[module_name]["classes"].append(class_info)
+    def _save_cache(self) -> None:
+        """Write the module info cache atomically."""
+        tmp_path = self.output_dir / f"{CACHE_FILENAME}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": CACHE_VERSION, "modules": self.cache}, f)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            logger.warning(f"Could not write cache {self.cache_path}: {e}")
     
-    def _generate_test_file(self, module_name: str) -> None:
+    def _generate_test_file(self, module_name: str) -> bool:
         """Generate a test file for the specified module.
         
         Args:
             module_name: Name of the module to generate tests for
+            
+        Returns:
+            True if a test file was written
         """
         if module_name not in self.module_info:
             logger.warning(f"No module info found for {module_name}")
-            return
+            return False
         
         module_info = self.module_info[module_name]
         test_cases = []
@@ -235,7 +362,7 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
         # If no test cases were generated, skip creating the file
         if not test_cases:
             logger.info(f"No testable functions/classes found in {module_name}")
-            return
+            return False
         
         # Create the test file content
         test_file_content = self.test_file_template.format(
@@ -251,6 +378,8 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
             f.write(test_file_content)
         
         logger.info(f"Generated test file: {test_file_path}")
+        self.stats["written"] += 1
+        return True
     
     def _generate_function_test_case(self, module_name: str, func_info: Dict) -> str:
         """Generate a test case for a function.
@@ -270,8 +399,8 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
         test_func_name = f"test_{func_info['name']}"
         
         # Generate test case
-        test_case = f"def {test_func_name}():\
-    \"\"\"Test for {func_info['name']} function.\"\"\"
+        test_case = f'''def {test_func_name}():
+    """Test for {func_info['name']} function."""
     
     # TODO: Add test implementation
     # Example:
@@ -280,7 +409,7 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
     
     # For now, just pass
     assert True
-"
+'''
         return test_case
     
     def _generate_class_test_cases(self, module_name: str, class_info: Dict) -> List[str]:
@@ -301,8 +430,8 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
         
         # Generate test class
         test_class_name = f"Test{class_info['name']}"
-        test_class = f"class {test_class_name}:\
-    \"\"\"Test cases for {class_info['name']} class.\"\"\"
+        test_class = f'''class {test_class_name}:
+    """Test cases for {class_info['name']} class."""
     
     # TODO: Add setup/teardown methods if needed
     # def setup_method(self):
@@ -310,7 +439,7 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
     # 
     # def teardown_method(self):
     #     pass
-"
+'''
         
         # Generate test methods
         test_methods = []
@@ -320,8 +449,8 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
                 continue
                 
             test_method_name = f"test_{method['name']}"
-            test_method = f"    def {test_method_name}(self):\
-        \"\"\"Test for {method['name']} method.\"\"\"
+            test_method = f'''    def {test_method_name}(self):
+        """Test for {method['name']} method."""
         
         # TODO: Add test implementation
         # Example:
@@ -330,7 +459,7 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
         
         # For now, just pass
         assert True
-"
+'''
             test_methods.append(test_method)
         
         # If no testable methods, don't generate the test class
@@ -381,6 +510,17 @@ def main():
         default="tests",
         help="Directory to save generated test files (default: 'tests')"
     )
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Worker processes used to analyze modules (default: number of CPUs)"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Re-analyze every module and rewrite every test file"
+    )
     parser.add_argument(
         "-v", "--verbose",
         action="store_true",
@@ -394,7 +534,7 @@ def main():
         logger.setLevel(logging.DEBUG)
     
     # Generate tests
-    generator = TestGenerator(args.target, args.output_dir)
+    generator = TestGenerator(args.target, args.output_dir, jobs=args.jobs, use_cache=not args.no_cache)
     generator.generate_tests()
 
 
@@ -0,0 +1,95 @@
+"""
+Tests for the GPS marker spatial index, checked against brute force.
+"""
+import random
+
+import pytest
+from gps_index import MarkerIndex, haversine_km
+
+
+@pytest.fixture(scope="module")
+def points():
+    rng = random.Random(1234)
+    pts = [(rng.uniform(-89.9, 89.9), rng.uniform(-180, 180)) for _ in range(2000)]
+    # Puntos agrupados en una ciudad y cerca del antimeridiano
+    pts += [(40.4 + rng.gauss(0, 0.05), -3.7 + rng.gauss(0, 0.05)) for _ in range(500)]
+    pts += [(rng.uniform(-10, 10), rng.choice([179.95, -179.95])) for _ in range(100)]
+    return pts
+
+
+@pytest.fixture(scope="module")
+def index(points):
+    idx = MarkerIndex(cell_size=0.5)
+    for lat, lon in points:
+        idx.insert(lat, lon)
+    return idx
+
+
+@pytest.mark.parametrize("box", [
+    (40.0, -4.0, 41.0, -3.0),
+    (-10.0, -50.0, 10.0, 50.0),
+    (-10.0, 179.0, 10.0, -179.0),
+    (-90.0, -180.0, 90.0, 180.0),
+])
+def test_bbox_matches_brute_force(points, index, box):
+    """Test viewport queries, including one crossing the antimeridian."""
+    south, west, north, east = box
+    if west <= east:
+        expected = [i for i, (lat, lon) in enumerate(points)
+                    if south <= lat <= north and west <= lon <= east]
+    else:
+        expected = [i for i, (lat, lon) in enumerate(points)
+                    if south <= lat <= north and (lon >= west or lon <= east)]
+    assert index.query_bbox(south, west, north, east) == expected
+
+
+@pytest.mark.parametrize("center,radius", [
+    ((40.4, -3.7), 5.0),
+    ((0.0, 179.9), 300.0),
+    ((89.0, 0.0), 500.0),
+    ((-20.0, 30.0), 2500.0),
+])
+def test_radius_matches_brute_force(points, index, center, radius):
+    """Test haversine radius search against a full scan."""
+    lat0, lon0 = center
+    expected = sorted(i for i, (lat, lon) in enumerate(points)
+                      if haversine_km(lat0, lon0, lat, lon) <= radius)
+    got = index.query_radius(lat0, lon0, radius)
+    assert sorted(pos for _, pos in got) == expected
+    assert [d for d, _ in got] == sorted(d for d, _ in got)
+
+
+@pytest.mark.parametrize("center,k", [
+    ((40.4, -3.7), 10),
+    ((0.0, -179.99), 5),
+    ((-75.0, 120.0), 3),
+])
+def test_nearest_matches_brute_force(points, index, center, k):
+    """Test k-nearest-neighbours against a full scan."""
+    lat0, lon0 = center
+    brute = sorted(haversine_km(lat0, lon0, lat, lon) for lat, lon in points)[:k]
+    got = [d for d, _ in index.nearest(lat0, lon0, k)]
+    assert got == pytest.approx(brute)
+
+
+def test_gps_logic_queries_use_index(tmp_path):
+    """Test that GPSLogic keeps the index in sync on add_marker."""
+    from gps_logic import GPSLogic
+
+    gps = GPSLogic(markers_file=str(tmp_path / "markers.json"))
+    gps.add_marker("Sol", 40.4168, -3.7038)
+    gps.add_marker("Retiro", 40.4153, -3.6845)
+    gps.add_marker("Barcelona", 41.3874, 2.1686)
+
+    nearest = gps.get_nearest_markers(40.4170, -3.7000, k=2)
+    assert [m["name"] for m in nearest] == ["Sol", "Retiro"]
+    assert [m["name"] for m in gps.get_markers_within(40.4168, -3.7038, 5)] == ["Sol", "Retiro"]
+    assert [m["name"] for m in gps.get_markers_in_bounds(41, 2, 42, 3)] == ["Barcelona"]
+
+
+def test_aggregate_preserves_counts(points, index):
+    """Test that heat-map aggregation keeps every point exactly once."""
+    positions = index.query_bbox(30, -20, 50, 20)
+    cells = index.aggregate(positions, cell_size=1.0)
+    assert sum(n for _, _, n in cells) == len(positions)
+    assert len(cells) < len(positions)
@@ -37,3 +37,31 @@ def test_create_map():
     # Verify map was created
     assert map_obj is not None
     assert "folium.folium.Map" in str(type(map_obj))
+
+def test_create_map_viewport_and_dense_modes(tmp_path):
+    """Test viewport filtering and the clustered/heat-map fallbacks."""
+    gps = GPSLogic(markers_file=str(tmp_path / "markers.json"))
+    gps.add_marker("Dentro", 40.41, -3.70)
+    gps.add_marker("Fuera", 48.85, 2.35)
+
+    html = gps.create_map(center=(40.41, -3.70), bounds=(40, -4, 41, -3)).get_root().render()
+    assert "Dentro" in html
+    assert "Fuera" not in html
+
+    clustered = gps.create_map(center=(40.41, -3.70), marker_limit=1).get_root().render()
+    assert "FastMarkerCluster" in clustered or "markerClusterGroup" in clustered
+
+    heat = gps.create_map(center=(40.41, -3.70), marker_limit=0, heatmap_threshold=1)
+    assert "heatLayer" in heat.get_root().render()
+
+def test_marker_names_are_escaped_in_map_html(tmp_path):
+    """Test that marker names cannot inject HTML into popups or tooltips."""
+    gps = GPSLogic(markers_file=str(tmp_path / "markers.json"))
+    payload = "<img src=x onerror=alert(1)>"
+    gps.add_marker(payload, 40.41, -3.70, payload)
+    gps.add_marker("Otro", 40.42, -3.71)
+
+    for marker_limit in (500, 1):
+        html = gps.create_map(center=(40.41, -3.70), marker_limit=marker_limit).get_root().render()
+        assert "<img src=x" not in html
+        assert "lt;img src=x onerror=alert(1)" in html
@@ -0,0 +1,88 @@
+"""
+Tests for the append-only marker store and bulk import/export.
+"""
+import json
+
+from marker_store import MarkerStore
+
+
+def _store(tmp_path):
+    return MarkerStore(tmp_path / "markers.jsonl", tmp_path / "markers.json")
+
+
+def test_legacy_markers_json_is_loaded(tmp_path):
+    """Test backward compatibility with the old markers.json file."""
+    legacy = [{"name": "A", "latitude": 1.0, "longitude": 2.0, "description": ""}]
+    (tmp_path / "markers.json").write_text(json.dumps(legacy))
+
+    store = _store(tmp_path)
+    assert store.load() == legacy
+    store.append({"name": "B", "latitude": 3.0, "longitude": 4.0, "description": ""})
+    assert [m["name"] for m in _store(tmp_path).load()] == ["A", "B"]
+
+
+def test_append_does_not_rewrite_existing_lines(tmp_path):
+    """Test that appends only add a line at the end of the log."""
+    store = _store(tmp_path)
+    store.append({"name": "A", "latitude": 1.0, "longitude": 2.0, "description": ""})
+    before = (tmp_path / "markers.jsonl").read_text()
+    store.append({"name": "B", "latitude": 3.0, "longitude": 4.0, "description": ""})
+    after = (tmp_path / "markers.jsonl").read_text()
+    assert after.startswith(before)
+    assert after.count("\n") == 2
+
+
+def test_append_after_torn_write_keeps_new_marker(tmp_path):
+    """Test that a partial last line is dropped before appending."""
+    store = _store(tmp_path)
+    store.append({"name": "A", "latitude": 1.0, "longitude": 2.0, "description": ""})
+    with open(tmp_path / "markers.jsonl", "a", encoding="utf-8") as f:
+        f.write('{"name": "roto", "latit')
+    assert [m["name"] for m in store.load()] == ["A"]
+
+    store.append({"name": "B", "latitude": 3.0, "longitude": 4.0, "description": ""})
+    assert [m["name"] for m in _store(tmp_path).load()] == ["A", "B"]
+
+    # Un registro que solo contiene una línea a medias queda vacío
+    (tmp_path / "markers.jsonl").write_text('{"name": "C"')
+    store.append({"name": "D", "latitude": 5.0, "longitude": 6.0, "description": ""})
+    assert [m["name"] for m in _store(tmp_path).load()] == ["D"]
+
+
+def test_csv_import_validates_and_chunks(tmp_path):
+    """Test chunked CSV import with invalid rows rejected."""
+    src = tmp_path / "pois.csv"
+    lines = ["name,lat,lng,description"]
+    lines += [f"P{i},{i % 80},{i % 170},poi" for i in range(25)]
+    lines += ["SinCoords,,,", "Lejos,95,0,", ",10,10,"]
+    src.write_text("\n".join(lines) + "\n")
+
+    chunks = []
+    report = _store(tmp_path).import_file(src, chunk_size=10, on_chunk=lambda c: chunks.append(len(c)))
+    assert report["imported"] == 25
+    assert report["rejected"] == 3
+    assert chunks == [10, 10, 5]
+    assert len(_store(tmp_path).load()) == 25
+
+
+def test_geojson_round_trip(tmp_path):
+    """Test streaming GeoJSON export followed by a streaming import."""
+    markers = [
+        {"name": f"P{i}", "latitude": (i % 1800) / 20 - 45, "longitude": -(i % 3600) / 20, "description": "x" * 50}
+        for i in range(3000)
+    ]
+    out = tmp_path / "export.geojson"
+    MarkerStore.export_geojson(markers, out)
+    assert json.loads(out.read_text())["type"] == "FeatureCollection"
+
+    target = MarkerStore(tmp_path / "other.jsonl", None)
+    report = target.import_file(out, chunk_size=1000)
+    assert report == {"imported": 3000, "rejected": 0, "errors": []}
+    assert target.load() == markers
+
+
+def test_csv_export(tmp_path):
+    """Test CSV export writes a header and one row per marker."""
+    out = tmp_path / "export.csv"
+    MarkerStore.export_csv([{"name": "A", "latitude": 1.0, "longitude": 2.0, "description": ""}], out)
+    assert out.read_text().splitlines() == ["name,latitude,longitude,description", "A,1.0,2.0,"]
@@ -0,0 +1,47 @@
+"""
+Unit tests for the dashboard time-series downsampling helpers.
+"""
+from components.downsampling import lttb_indices, minmax_indices
+
+
+def _spiky_series(n: int = 10000):
+    xs = list(range(n))
+    ys = [float(i % 7) for i in range(n)]
+    ys[1234] = 500.0
+    ys[8765] = -300.0
+    return xs, ys
+
+
+def test_lttb_respects_max_points_and_endpoints() -> None:
+    """Test that LTTB keeps at most the target points and both endpoints."""
+    xs, ys = _spiky_series()
+    idx = lttb_indices(xs, ys, 200)
+    assert len(idx) <= 200
+    assert idx[0] == 0
+    assert idx[-1] == len(xs) - 1
+    assert idx == sorted(idx)
+
+
+def test_lttb_keeps_spikes() -> None:
+    """Test that isolated spikes survive LTTB downsampling."""
+    xs, ys = _spiky_series()
+    idx = set(lttb_indices(xs, ys, 200))
+    assert 1234 in idx
+    assert 8765 in idx
+
+
+def test_minmax_keeps_extremes() -> None:
+    """Test that min/max downsampling keeps the global extremes."""
+    _, ys = _spiky_series()
+    idx = minmax_indices(ys, 100)
+    assert len(idx) <= 100
+    kept = [ys[i] for i in idx]
+    assert max(kept) == max(ys)
+    assert min(kept) == min(ys)
+
+
+def test_short_series_is_untouched() -> None:
+    """Test that series below the threshold are returned as-is."""
+    xs, ys = list(range(10)), [1.0] * 10
+    assert lttb_indices(xs, ys, 50) == list(range(10))
+    assert minmax_indices(ys, 50) == list(range(10))
@@ -0,0 +1,106 @@
+"""
+Unit tests for the incremental test generator script.
+"""
+import importlib
+import os
+import textwrap
+
+import pytest
+
+
+MODULE_SOURCE = textwrap.dedent('''
+    def top_level(x):
+        """A documented top-level function."""
+        def nested():
+            """Nested functions are not part of the module API."""
+        return nested
+
+
+    async def fetch(url):
+        """A documented coroutine."""
+
+
+    class Client:
+        """A documented class."""
+
+        def send(self, payload):
+            """Send a payload."""
+            def helper():
+                """Helper inside a method."""
+''')
+
+
+@pytest.fixture
+def generate_tests(tmp_path, monkeypatch):
+    """Import the script from a temporary working directory.
+
+    The script configures a log file in the working directory at import time,
+    and resolves import paths relative to it.
+    """
+    monkeypatch.chdir(tmp_path)
+    return importlib.import_module("scripts.generate_tests")
+
+
+@pytest.fixture
+def package(tmp_path):
+    """Create a small package with two modules."""
+    src = tmp_path / "pkg"
+    src.mkdir()
+    (src / "client.py").write_text(MODULE_SOURCE, encoding="utf-8")
+    (src / "other.py").write_text('def ping():\n    """Ping."""\n', encoding="utf-8")
+    return src
+
+
+def test_only_top_level_functions_are_reported(generate_tests) -> None:
+    """Test that methods and nested functions are not top-level, but coroutines are."""
+    info = generate_tests.analyze_source(MODULE_SOURCE)
+    assert [f["name"] for f in info["functions"]] == ["top_level", "fetch"]
+    assert [c["name"] for c in info["classes"]] == ["Client"]
+    assert [m["name"] for m in info["classes"][0]["methods"]] == ["send"]
+
+
+def test_second_run_skips_unchanged_modules(generate_tests, package, tmp_path) -> None:
+    """Test that a second run neither re-analyzes nor rewrites unchanged modules."""
+    out = tmp_path / "generated"
+    first = generate_tests.TestGenerator(str(package), str(out))
+    first.generate_tests()
+    assert first.stats["analyzed"] == 2
+    assert first.stats["written"] == 2
+
+    test_file = out / "test_client.py"
+    content = test_file.read_text(encoding="utf-8")
+    mtime_ns = test_file.stat().st_mtime_ns
+
+    second = generate_tests.TestGenerator(str(package), str(out))
+    second.generate_tests()
+    assert second.stats == {"analyzed": 0, "unchanged": 2, "written": 0, "errors": 0}
+    assert test_file.read_text(encoding="utf-8") == content
+    assert test_file.stat().st_mtime_ns == mtime_ns
+
+
+def test_changed_module_is_regenerated(generate_tests, package, tmp_path) -> None:
+    """Test that only the edited module is analyzed again."""
+    out = tmp_path / "generated"
+    generate_tests.TestGenerator(str(package), str(out)).generate_tests()
+
+    (package / "other.py").write_text('def pong():\n    """Pong."""\n', encoding="utf-8")
+    generator = generate_tests.TestGenerator(str(package), str(out))
+    generator.generate_tests()
+    assert generator.stats["analyzed"] == 1
+    assert generator.stats["unchanged"] == 1
+    assert "def test_pong" in (out / "test_other.py").read_text(encoding="utf-8")
+
+
+def test_deleted_test_file_is_regenerated(generate_tests, package, tmp_path) -> None:
+    """Test that removing a generated test file forces its regeneration."""
+    out = tmp_path / "generated"
+    generate_tests.TestGenerator(str(package), str(out)).generate_tests()
+
+    os.remove(out / "test_client.py")
+    generator = generate_tests.TestGenerator(str(package), str(out))
+    generator.generate_tests()
+    assert generator.stats["written"] == 1
+    assert generator.stats["unchanged"] == 1
+    content = (out / "test_client.py").read_text(encoding="utf-8")
+    assert "def test_fetch" in content
+    assert "def test_nested" not in content
@@ -0,0 +1,106 @@
+"""
+Unit tests for the incremental metric rollups used by the dashboard.
+"""
+import random
+from datetime import datetime, timedelta
+
+from components.metrics_rollup import MetricRollup, QuantileSketch
+
+
+NOW = datetime(2025, 7, 4, 12, 30, 0)
+
+
+def test_minute_and_hour_buckets_match_raw_events() -> None:
+    """Test that per-minute and per-hour aggregates match the raw values."""
+    rollup = MetricRollup()
+    values = [1.0, 3.0, 2.0, 10.0]
+    for i, value in enumerate(values):
+        rollup.add("model_latency", value, NOW - timedelta(seconds=10 * i))
+
+    hourly = rollup.series("model_latency", "hour", hours=1, now=NOW)
+    assert len(hourly) == 1
+    bucket = hourly[0][1]
+    assert bucket.count == 4
+    assert bucket.sum == sum(values)
+    assert bucket.min == 1.0
+    assert bucket.max == 10.0
+
+    minutes = rollup.series("model_latency", "minute", hours=1, now=NOW)
+    assert sum(b.count for _, b in minutes) == 4
+    assert [start for start, _ in minutes] == sorted(start for start, _ in minutes)
+
+
+def test_summary_respects_time_window() -> None:
+    """Test that old buckets are excluded from windowed summaries."""
+    rollup = MetricRollup()
+    rollup.add("api_call", 1, NOW)
+    rollup.add("api_call", 1, NOW - timedelta(hours=5))
+
+    assert rollup.summary("api_call", hours=1, now=NOW).count == 1
+    assert rollup.summary("api_call", hours=6, now=NOW).count == 2
+
+
+def test_prune_drops_expired_minute_buckets() -> None:
+    """Test that minute buckets older than the retention are pruned."""
+    rollup = MetricRollup()
+    rollup.add("api_call", 1, NOW - timedelta(hours=100))
+    rollup.add("api_call", 1, NOW)
+    rollup.prune(NOW)
+
+    assert len(rollup.buckets["minute"]["api_call"]) == 1
+    assert len(rollup.buckets["hour"]["api_call"]) == 2
+
+
+def test_rollups_round_trip_to_disk(tmp_path) -> None:
+    """Test that rollups are persisted and reloaded."""
+    path = tmp_path / "rollups.json"
+    rollup = MetricRollup(path)
+    rollup.add("tokens_used", 150, NOW)
+    rollup.save()
+
+    reloaded = MetricRollup(path)
+    summary = reloaded.summary("tokens_used", hours=1, now=NOW)
+    assert summary.count == 1
+    assert summary.sum == 150
+    assert summary.sketch.quantile(0.5) is not None
+
+
+def test_quantile_sketch_relative_accuracy() -> None:
+    """Test that sketch quantiles stay within the configured relative error."""
+    rng = random.Random(42)
+    values = [rng.expovariate(1.0) + 0.001 for _ in range(5000)]
+    sketch = QuantileSketch(relative_accuracy=0.01)
+    for value in values:
+        sketch.add(value)
+
+    ordered = sorted(values)
+    for q in (0.5, 0.9, 0.99):
+        exact = ordered[int(q * (len(ordered) - 1))]
+        assert abs(sketch.quantile(q) - exact) <= 0.01 * exact + 1e-9
+
+
+def test_saves_are_deferred_until_flush_threshold(tmp_path) -> None:
+    """Test that events are written every flush_every events, not on each add."""
+    path = tmp_path / "rollups.json"
+    rollup = MetricRollup(path, flush_every=3, flush_interval=3600)
+    for i in range(2):
+        rollup.add("api_call", 1, NOW + timedelta(seconds=i))
+        assert not rollup.maybe_save(NOW)
+    assert not path.exists()
+
+    rollup.add("api_call", 1, NOW + timedelta(seconds=2))
+    assert rollup.maybe_save(NOW)
+    assert MetricRollup(path).events == 3
+
+    rollup.add("api_call", 1, NOW + timedelta(seconds=3))
+    rollup.flush(NOW)
+    reloaded = MetricRollup(path)
+    assert reloaded.events == 4
+    assert reloaded.summary("api_call", hours=1, now=NOW + timedelta(minutes=1)).count == 4
+
+
+def test_legacy_rollup_file_is_loaded_empty(tmp_path) -> None:
+    """Test that files without an event counter are left for a rebuild."""
+    path = tmp_path / "rollups.json"
+    path.write_text('{"minute": {"api_call": {"0": {"count": 1}}}, "hour": {}}')
+    assert MetricRollup(path).is_empty()